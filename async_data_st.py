@@ -0,0 +1,42 @@
+import asyncio
+from data_provider_st import dataProvider
+from stock_downloader_st import fetch_ticker_info
+
+maxConcurrentRequests = 8
+
+async def _run(function, *args, **kwargs):
+    return await asyncio.to_thread(function, *args, **kwargs)
+
+async def ticker_info_async(userStock) -> dict:
+    return await _run(fetch_ticker_info, userStock)
+
+async def ticker_attribute_async(userStock, name):
+    return await _run(dataProvider.ticker_attribute, userStock, name)
+
+async def holders_async(userStock) -> dict:
+    names = ['major_holders', 'institutional_holders', 'mutualfund_holders']
+    holders = await asyncio.gather(*(ticker_attribute_async(userStock, name) for name in names))
+    return dict(zip(names, holders))
+
+async def news_async(userStock) -> list:
+    return await ticker_attribute_async(userStock, 'news')
+
+async def fred_series_async(seriesId, **kwargs):
+    return await _run(dataProvider.get_series, seriesId, **kwargs)
+
+async def fred_search_async(text, **kwargs):
+    return await _run(dataProvider.search, text, **kwargs)
+
+async def gather_requests(requests, returnExceptions = False) -> dict:
+    semaphore = asyncio.Semaphore(maxConcurrentRequests)
+
+    async def bounded(request):
+        async with semaphore:
+            return await request
+
+    results = await asyncio.gather(*(bounded(request) for request in requests.values()),
+                                   return_exceptions = returnExceptions)
+    return dict(zip(requests.keys(), results))
+
+def run_requests(returnExceptions = False, **requests) -> dict:
+    return asyncio.run(gather_requests(requests, returnExceptions))
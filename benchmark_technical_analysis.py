@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from technical_analysis_st import TechnicalAnalysis as PythonAnalysis
+
+try:
+    import technical_analysis_module
+    NativeAnalysis = technical_analysis_module.TechnicalAnalysis()
+except ImportError:
+    NativeAnalysis = None
+
+SIZES = [1000, 10000, 100000, 1000000, 10000000]
+WINDOWS = [20, 200]
+BATCH_ROWS = 100
+RTOL = 1e-9
+ATOL = 1e-8
+
+def synthetic_prices(size, seed = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    logPrice = np.cumsum(rng.normal(0, 0.015, size))
+    close = 100 * np.exp(logPrice - pd.Series(logPrice).rolling(2520, min_periods = 1).mean().to_numpy())
+    high = close * (1 + rng.uniform(0, 0.02, size))
+    low = close * (1 - rng.uniform(0, 0.02, size))
+    return close, high, low
+
+def benchmark_cases(close, high, low, window, threadCounts = (0,)) -> list:
+    analysis = NativeAnalysis or PythonAnalysis
+    rows = BATCH_ROWS if len(close) >= 100 * BATCH_ROWS else 1
+    matrix, highMatrix, lowMatrix = (values[:rows * (len(close) // rows)].reshape(rows, -1) for values in (close, high, low))
+    sma = lambda: np.asarray(analysis.sma_calculations(close, window))
+    bands = lambda: [np.asarray(band) for band in analysis.bollinger_bands_calculations(close, sma(), window)]
+    channels = lambda: [np.asarray(channel) for channel in analysis.donchian_breakout_calculations(close, high, low, window)]
+
+    batchCases = [
+        ('batch_rsi', lambda: (matrix, 14)),
+        ('batch_macd', lambda: (matrix, 26, 12, 9)),
+        ('batch_sma', lambda: (matrix, window)),
+        ('batch_bollinger_bands', lambda: (matrix, np.asarray(analysis.batch_sma(matrix, window)), window)),
+        ('batch_donchian_breakout', lambda: (matrix, highMatrix, lowMatrix, window)),
+    ]
+
+    return [
+        ('rsi_calculation', lambda: (close, 14), {}),
+        ('macd_calculations', lambda: (close, 26, 12, 9), {}),
+        ('sma_calculations', lambda: (close, window), {}),
+        ('rolling_std', lambda: (close, window), {}),
+        ('bollinger_bands_calculations', lambda: (close, sma(), window), {}),
+        ('rolling_max', lambda: (close, window), {}),
+        ('rolling_min', lambda: (close, window), {}),
+        ('williams_r', lambda: (close, high, low, window), {}),
+        ('stochastic_oscillator', lambda: (close, high, low, window, 3), {}),
+        ('rolling_drawdown', lambda: (close, window), {}),
+        ('donchian_breakout_calculations', lambda: (close, high, low, window), {}),
+        ('implement_rsi', lambda: (close, np.asarray(analysis.rsi_calculation(close, 14))), {}),
+        ('implement_macd', lambda: (close, np.asarray(analysis.macd_calculations(close, 26, 12, 9))), {}),
+        ('implement_bollinger', lambda: (close, *bands()[::-1]), {}),
+        ('implement_donchian', lambda: (close, *channels()), {}),
+        ('indicator_pipeline', lambda: (close, high, low), {'bollinger_window': window, 'donchian_window': window}),
+    ] + [(function, caseArgs, {'threads': threads}) for threads in threadCounts for function, caseArgs in batchCases]
+
+def output_arrays(result) -> list:
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], list):
+        result = result[0]
+    if isinstance(result, tuple):
+        return [np.asarray(values, dtype = np.float64) for values in result]
+    return [np.asarray(result, dtype = np.float64)]
+
+def best_time(calculate, repeat) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = calculate()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def _as_frame(values, index):
+    return pd.Series(values, index = index) if values.ndim == 1 else pd.DataFrame(values.T, index = index[:values.shape[-1]])
+
+def _as_array(frame) -> np.ndarray:
+    return frame.to_numpy(dtype = np.float64) if frame.ndim == 1 else np.ascontiguousarray(frame.to_numpy(dtype = np.float64).T)
+
+def conversion_time(args, result, index, repeat) -> float:
+    frames = [_as_frame(arg, index) for arg in args if isinstance(arg, np.ndarray)]
+    convertIn, _ = best_time(lambda: [_as_array(frame) for frame in frames], repeat)
+    outputs = output_arrays(result)
+    convertOut, _ = best_time(lambda: [pd.DataFrame(values.reshape(-1, values.shape[-1]).T, index = index[:values.shape[-1]], copy = False)
+                                       for values in outputs], repeat)
+    return convertIn + convertOut
+
+def parity(native, python) -> tuple:
+    nativeArrays, pythonArrays = output_arrays(native), output_arrays(python)
+    if [values.shape for values in nativeArrays] != [values.shape for values in pythonArrays]:
+        return False, None
+
+    ok, difference = True, 0.0
+    for first, second in zip(nativeArrays, pythonArrays):
+        if first.size == 0:
+            continue
+        for firstRow, secondRow in zip(first.reshape(-1, first.shape[-1]), second.reshape(-1, second.shape[-1])):
+            missing = np.isnan(firstRow)
+            if not np.array_equal(missing, np.isnan(secondRow)):
+                return False, None
+            gap = np.abs(firstRow - secondRow)
+            gap[missing] = 0.0
+            difference = max(difference, float(gap.max()))
+            ok = ok and not np.any(gap > ATOL + RTOL * np.nan_to_num(np.abs(secondRow)))
+    return ok, difference
+
+def run_benchmarks(sizes, windows, repeat, implementations, threadCounts = (0,)) -> list:
+    results = []
+    for size in sizes:
+        close, high, low = synthetic_prices(size)
+        index = pd.date_range('2000-01-03', periods = size, freq = 'min')
+        caseRepeat = max(1, min(repeat, int(1e7 // size)))
+        for window in windows:
+            for function, caseArgs, kwargs in benchmark_cases(close, high, low, window, threadCounts):
+                outputs = {}
+                args = caseArgs()
+                timings = {}
+                for implementation, analysis in implementations.items():
+                    seconds, outputs[implementation] = best_time(lambda: getattr(analysis, function)(*args, **kwargs), caseRepeat)
+                    timings[implementation] = seconds
+
+                parityOk, difference = parity(outputs['native'], outputs['python']) if len(outputs) == 2 else (None, None)
+                conversion = conversion_time(args, next(iter(outputs.values())), index, caseRepeat)
+                for implementation, seconds in timings.items():
+                    results.append({'function': function, 'size': size, 'window': window, 'implementation': implementation,
+                                    'threads': kwargs.get('threads'), 'compute_seconds': seconds, 'conversion_seconds': conversion,
+                                    'parity_ok': parityOk, 'max_abs_difference': difference})
+                threads = f" t={kwargs['threads']}" if 'threads' in kwargs else ''
+                print(f"{function + threads:32} n={size:<9} w={window:<4} " +
+                      ' '.join(f"{implementation}={seconds * 1000:10.3f}ms" for implementation, seconds in timings.items()) +
+                      f" convert={conversion * 1000:8.3f}ms parity={parityOk}", flush = True)
+    return results
+
+def regressions(results, baseline, tolerance, minimumSeconds) -> list:
+    key = lambda entry: (entry['function'], entry['size'], entry['window'], entry['implementation'], entry.get('threads'))
+    previous = {key(entry): entry['compute_seconds'] for entry in baseline['results']}
+    slower = []
+    for entry in results:
+        before = previous.get(key(entry))
+        if before and before >= minimumSeconds and entry['compute_seconds'] > before * tolerance:
+            slower.append(dict(entry, baseline_seconds = before))
+    return slower
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description = "Benchmark the Python and native technical analysis kernels.")
+    parser.add_argument('--sizes', type = float, nargs = '+', default = SIZES)
+    parser.add_argument('--windows', type = int, nargs = '+', default = WINDOWS)
+    parser.add_argument('--repeat', type = int, default = 3)
+    parser.add_argument('--implementation', choices = ['both', 'native', 'python'], default = 'both')
+    parser.add_argument('--output', default = 'benchmark_technical_analysis.json')
+    parser.add_argument('--baseline', help = "Earlier results to compare compute times against.")
+    parser.add_argument('--tolerance', type = float, default = 1.25)
+    parser.add_argument('--threads', type = int, nargs = '+', default = [0],
+                        help = "Worker threads for the batch kernels; 0 uses every hardware thread.")
+    parser.add_argument('--min-seconds', type = float, default = 1e-3, help = "Ignore baseline timings shorter than this.")
+    args = parser.parse_args()
+
+    implementations = {'native': NativeAnalysis, 'python': PythonAnalysis}
+    implementations = {name: analysis for name, analysis in implementations.items()
+                       if analysis is not None and args.implementation in ('both', name)}
+    if not implementations:
+        parser.error("technical_analysis_module could not be imported")
+
+    results = run_benchmarks([int(size) for size in args.sizes], args.windows, args.repeat, implementations, args.threads)
+    report = {
+        'metadata': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'implementations': list(implementations),
+            'repeat': args.repeat,
+            'rtol': RTOL,
+            'atol': ATOL,
+        },
+        'results': results,
+    }
+
+    failed = [entry for entry in results if entry['parity_ok'] is False]
+    if args.baseline:
+        with open(args.baseline) as baselineFile:
+            report['regressions'] = regressions(results, json.load(baselineFile), args.tolerance, args.min_seconds)
+    with open(args.output, 'w') as outputFile:
+        json.dump(report, outputFile, indent = 2)
+
+    for entry in failed:
+        print(f"Parity failure: {entry['function']} n={entry['size']} w={entry['window']}")
+    for entry in report.get('regressions', []):
+        print(f"Regression: {entry['function']} ({entry['implementation']}) n={entry['size']} w={entry['window']} "
+              f"{entry['baseline_seconds'] * 1000:.3f}ms -> {entry['compute_seconds'] * 1000:.3f}ms")
+    return 1 if failed or report.get('regressions') else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
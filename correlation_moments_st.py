@@ -0,0 +1,158 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+STATE_FIELDS = ['shift', 'count', 'sumX', 'sumXX', 'sumXY']
+CHECKPOINT_ROWS = int(os.environ.get('ROLLING_CHECKPOINT_ROWS', 500))
+ANCHOR_WINDOWS = int(os.environ.get('ROLLING_ANCHOR_WINDOWS', 16))
+
+def first_valid(closes) -> np.ndarray:
+    firstValid = np.argmax(~np.isnan(closes), axis = 0)
+    return np.asarray(closes[firstValid, np.arange(closes.shape[1])], dtype = np.float64)
+
+def window_bounds(rows, window, step, expanding = False) -> tuple:
+    ends = list(range(min(window, rows), rows + 1, step))
+    if ends[-1] != rows:
+        ends.append(rows)
+    ends = np.array(ends)
+    starts = np.zeros_like(ends) if expanding else np.maximum(ends - window, 0)
+    return starts, ends
+
+def pair_correlation(first, second, window, expanding = False) -> np.ndarray:
+    first = np.asarray(first, dtype = np.float64)
+    second = np.asarray(second, dtype = np.float64)
+    present = ~(np.isnan(first) | np.isnan(second))
+    x = np.where(present, first - first_valid(first[:, None])[0], 0.0)
+    y = np.where(present, second - first_valid(second[:, None])[0], 0.0)
+
+    sums = np.zeros((6, len(x) + 1))
+    np.cumsum(np.vstack([present.astype(np.float64), x, y, x * x, y * y, x * y]), axis = 1, out = sums[:, 1:])
+    ends = np.arange(1, len(x) + 1)
+    starts = np.zeros_like(ends) if expanding else np.maximum(ends - window, 0)
+    count, sumX, sumY, sumXX, sumYY, sumXY = sums[:, ends] - sums[:, starts]
+
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        correlation = (count * sumXY - sumX * sumY) / np.sqrt((count * sumXX - sumX * sumX) * (count * sumYY - sumY * sumY))
+    correlation[(count < 2) | (ends < min(window, len(x)))] = np.nan
+    return np.clip(correlation, -1.0, 1.0)
+
+class CorrelationMoments:
+    def __init__(self, shift, count, sumX, sumXX, sumXY, rows = 0) -> None:
+        self.shift = shift
+        self.count = count
+        self.sumX = sumX
+        self.sumXX = sumXX
+        self.sumXY = sumXY
+        self.rows = rows
+
+    @classmethod
+    def empty(cls, columns, shift) -> 'CorrelationMoments':
+        zeros = lambda: np.zeros((columns, columns))
+        return cls(np.nan_to_num(np.asarray(shift, dtype = np.float64)), zeros(), zeros(), zeros(), zeros())
+
+    @classmethod
+    def from_closes(cls, closes, shift = None) -> 'CorrelationMoments':
+        closes = np.asarray(closes, dtype = np.float64)
+        moments = cls.empty(closes.shape[1], first_valid(closes) if shift is None else shift)
+        moments.update(closes)
+        return moments
+
+    def _block(self, closes) -> tuple:
+        present = ~np.isnan(closes)
+        mask = present.astype(np.float64)
+        shifted = np.where(present, closes - self.shift, 0.0)
+        return mask.T @ mask, shifted.T @ mask, (shifted * shifted).T @ mask, shifted.T @ shifted
+
+    def update(self, closes) -> None:
+        closes = np.asarray(closes, dtype = np.float64)
+        count, sumX, sumXX, sumXY = self._block(closes)
+        self.count += count
+        self.sumX += sumX
+        self.sumXX += sumXX
+        self.sumXY += sumXY
+        self.rows += len(closes)
+
+    def downdate(self, closes) -> None:
+        closes = np.asarray(closes, dtype = np.float64)
+        count, sumX, sumXX, sumXY = self._block(closes)
+        self.count -= count
+        self.sumX -= sumX
+        self.sumXX -= sumXX
+        self.sumXY -= sumXY
+        self.rows -= len(closes)
+
+    def correlation(self) -> np.ndarray:
+        count, sumX, sumXX = self.count, self.sumX, self.sumXX
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            covariance = count * self.sumXY - sumX * sumX.T
+            variance = count * sumXX - sumX * sumX
+            correlation = covariance / np.sqrt(variance * variance.T)
+        correlation[count < 2] = np.nan
+        return np.clip(correlation, -1.0, 1.0)
+
+    def to_arrays(self) -> dict:
+        return {field: getattr(self, field) for field in STATE_FIELDS}
+
+    @classmethod
+    def from_arrays(cls, arrays, rows) -> 'CorrelationMoments':
+        return cls(*(np.array(arrays[field]) for field in STATE_FIELDS), rows = rows)
+
+class RollingCorrelation:
+    def __init__(self, dates, tickers, closes, version, window, step, expanding = False) -> None:
+        self.dates = dates
+        self.tickers = tickers
+        self.closes = closes
+        self.version = f"{version}:{'expanding' if expanding else 'rolling'}:{window}:{step}"
+        self.starts, self.ends = window_bounds(len(dates), window, step, expanding)
+        self.shift = first_valid(closes)
+        self.checkpoints = []
+        self.lock = threading.Lock()
+        self.cursor = None
+        self.latest = None
+
+        if expanding:
+            moments = CorrelationMoments.empty(len(tickers), self.shift)
+            for row in range(CHECKPOINT_ROWS, len(dates) + 1, CHECKPOINT_ROWS):
+                moments.update(closes[moments.rows:row])
+                self.checkpoints.append(CorrelationMoments.from_arrays(moments.to_arrays(), row))
+
+    def _anchor(self, position) -> CorrelationMoments:
+        start, end = self.starts[position], self.ends[position]
+        checkpoint = end // CHECKPOINT_ROWS - 1 if start == 0 else -1
+        if checkpoint < 0 or checkpoint >= len(self.checkpoints):
+            return CorrelationMoments.from_closes(self.closes[start:end], shift = self.shift)
+
+        moments = CorrelationMoments.from_arrays(self.checkpoints[checkpoint].to_arrays(), self.checkpoints[checkpoint].rows)
+        moments.update(self.closes[moments.rows:end])
+        return moments
+
+    def moments(self, position) -> CorrelationMoments:
+        with self.lock:
+            anchor = position - position % ANCHOR_WINDOWS
+            if self.cursor is None or not anchor <= self.cursor[0] <= position:
+                self.cursor = (anchor, self._anchor(anchor))
+
+            current, moments = self.cursor
+            for following in range(current + 1, position + 1):
+                moments.update(self.closes[self.ends[following - 1]:self.ends[following]])
+                moments.downdate(self.closes[self.starts[following - 1]:self.starts[following]])
+            self.cursor = (position, moments)
+            return CorrelationMoments.from_arrays(moments.to_arrays(), moments.rows)
+
+    def matrix(self, position) -> np.ndarray:
+        latest = self.latest
+        if latest is None or latest[0] != position:
+            latest = self.latest = (position, self.moments(position).correlation().astype(np.float32))
+        return latest[1]
+
+    def end_dates(self) -> list:
+        return list(pd.DatetimeIndex(self.dates[self.ends - 1]).date)
+
+    def position(self, endDate) -> int:
+        return int(np.searchsorted(pd.DatetimeIndex(self.dates[self.ends - 1]).date, endDate))
+
+    def frame(self, position) -> pd.DataFrame:
+        df_corr = pd.DataFrame(self.matrix(position), index = self.tickers, columns = self.tickers, copy = False)
+        df_corr.attrs['version'] = f"{self.version}:{position}"
+        return df_corr
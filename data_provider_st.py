@@ -0,0 +1,156 @@
+import os
+import time
+import pickle
+import random
+import hashlib
+from abc import ABC, abstractmethod
+import yfinance as yf
+import streamlit as st
+
+FIXTURE_DIR = os.environ.get('DATA_FIXTURE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures'))
+
+class ProviderTicker:
+    def __init__(self, provider, ticker) -> None:
+        self.provider = provider
+        self.ticker = ticker
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.provider.ticker_attribute(self.ticker, name)
+
+class DataProvider(ABC):
+    @abstractmethod
+    def download(self, tickers, start = None, end = None, interval = '1d', period = None):
+        pass
+
+    @abstractmethod
+    def ticker_attribute(self, ticker, name):
+        pass
+
+    @abstractmethod
+    def get_series(self, seriesId, **kwargs):
+        pass
+
+    @abstractmethod
+    def search(self, text, **kwargs):
+        pass
+
+    def ticker(self, ticker) -> ProviderTicker:
+        return ProviderTicker(self, ticker)
+
+class LiveDataProvider(DataProvider):
+    def __init__(self) -> None:
+        self._fred = None
+
+    @property
+    def fred(self):
+        if self._fred is None:
+            from fredapi import Fred
+            self._fred = Fred(api_key = st.secrets['API_KEY'])
+        return self._fred
+
+    def download(self, tickers, start = None, end = None, interval = '1d', period = None):
+        if period is not None:
+            return yf.download(list(tickers), period = period, interval = interval, progress = False, auto_adjust = False)
+        return yf.download(list(tickers), start, end, interval = interval, progress = False, auto_adjust = False)
+
+    def ticker_attribute(self, ticker, name):
+        return getattr(yf.Ticker(ticker), name)
+
+    def get_series(self, seriesId, **kwargs):
+        return self.fred.get_series(seriesId, **kwargs)
+
+    def search(self, text, **kwargs):
+        return self.fred.search(text, **kwargs)
+
+def _fixture_path(fixtureDir, method, args, kwargs) -> str:
+    key = repr((method, [str(arg) for arg in args], sorted((name, str(value)) for name, value in kwargs.items())))
+    return os.path.join(fixtureDir, method, f"{hashlib.sha1(key.encode()).hexdigest()}.pkl")
+
+class RecordingDataProvider(DataProvider):
+    def __init__(self, provider, fixtureDir = FIXTURE_DIR) -> None:
+        self.provider = provider
+        self.fixtureDir = fixtureDir
+
+    def _record(self, method, *args, **kwargs):
+        path = _fixture_path(self.fixtureDir, method, args, kwargs)
+        try:
+            response = ('value', getattr(self.provider, method)(*args, **kwargs))
+        except Exception as error:
+            response = ('error', error)
+
+        try:
+            payload = pickle.dumps(response)
+            if response[0] == 'error':
+                pickle.loads(payload)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            if response[0] == 'value':
+                raise
+            payload = pickle.dumps(('error', RuntimeError(f"{type(response[1]).__name__}: {response[1]}")))
+
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        with open(f"{path}.tmp", 'wb') as fixtureFile:
+            fixtureFile.write(payload)
+        os.replace(f"{path}.tmp", path)
+
+        if response[0] == 'error':
+            raise response[1]
+        return response[1]
+
+    def download(self, tickers, start = None, end = None, interval = '1d', period = None):
+        return self._record('download', list(tickers), start = start, end = end, interval = interval, period = period)
+
+    def ticker_attribute(self, ticker, name):
+        return self._record('ticker_attribute', ticker, name)
+
+    def get_series(self, seriesId, **kwargs):
+        return self._record('get_series', seriesId, **kwargs)
+
+    def search(self, text, **kwargs):
+        return self._record('search', text, **kwargs)
+
+class ReplayDataProvider(DataProvider):
+    def __init__(self, fixtureDir = FIXTURE_DIR, latency = 0.0, jitter = 0.0) -> None:
+        self.fixtureDir = fixtureDir
+        self.latency = latency
+        self.jitter = jitter
+
+    def _replay(self, method, *args, **kwargs):
+        path = _fixture_path(self.fixtureDir, method, args, kwargs)
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+        try:
+            with open(path, 'rb') as fixtureFile:
+                kind, response = pickle.load(fixtureFile)
+        except FileNotFoundError:
+            raise LookupError(f"No recorded response for {method}{args} {kwargs}")
+
+        if kind == 'error':
+            raise response
+        return response
+
+    def download(self, tickers, start = None, end = None, interval = '1d', period = None):
+        return self._replay('download', list(tickers), start = start, end = end, interval = interval, period = period)
+
+    def ticker_attribute(self, ticker, name):
+        return self._replay('ticker_attribute', ticker, name)
+
+    def get_series(self, seriesId, **kwargs):
+        return self._replay('get_series', seriesId, **kwargs)
+
+    def search(self, text, **kwargs):
+        return self._replay('search', text, **kwargs)
+
+def create_data_provider(mode = None) -> DataProvider:
+    mode = mode or os.environ.get('DATA_PROVIDER', 'live')
+    if mode == 'live':
+        return LiveDataProvider()
+    if mode == 'record':
+        return RecordingDataProvider(LiveDataProvider())
+    if mode == 'replay':
+        return ReplayDataProvider(latency = float(os.environ.get('DATA_REPLAY_LATENCY', 0)),
+                                  jitter = float(os.environ.get('DATA_REPLAY_JITTER', 0)))
+    raise ValueError(f"Unknown data provider: {mode}")
+
+dataProvider = create_data_provider()
@@ -0,0 +1,47 @@
+import copy
+import numpy as np
+import streamlit as st
+
+try:
+    from technical_analysis_module import StreamingIndicators
+except ImportError:
+    from technical_analysis_st import StreamingIndicators
+
+class IndicatorStream:
+    def __init__(self, indicators, options) -> None:
+        self.stream = StreamingIndicators(list(indicators), **options)
+        self.columns = list(self.stream.columns)
+        self.buffer = np.empty((len(self.columns), 0))
+        self.size = 0
+        self.lastBar = None
+
+    def matches(self, index) -> bool:
+        return self.size < len(index) and (self.size == 0 or index[self.size - 1] == self.lastBar)
+
+    def _reserve(self, size) -> None:
+        if size > self.buffer.shape[1]:
+            buffer = np.empty((len(self.columns), max(size, 2 * self.buffer.shape[1], 512)))
+            buffer[:, :self.size] = self.buffer[:, :self.size]
+            self.buffer = buffer
+
+    def values(self, index, close, high, low) -> np.ndarray:
+        settled = len(index) - 1
+        if settled > self.size:
+            block = self.stream.update_batch(close[self.size:settled], high[self.size:settled], low[self.size:settled])
+            self._reserve(settled + 1)
+            self.buffer[:, self.size:settled] = block
+            self.size = settled
+            self.lastBar = index[settled - 1]
+
+        self._reserve(settled + 1)
+        self.buffer[:, settled:settled + 1] = copy.copy(self.stream).update_batch(close[settled:], high[settled:], low[settled:])
+        return self.buffer[:, :settled + 1]
+
+def stream_indicator_values(ticker, index, close, high, low, indicators, options) -> tuple:
+    key = f"indicator_stream_{ticker}_{index[0].isoformat()}_{'_'.join(indicators)}_{sorted(options.items())}"
+    stream = st.session_state.get(key)
+    if stream is None or not stream.matches(index):
+        stream = IndicatorStream(indicators, options)
+        st.session_state[key] = stream
+
+    return stream.values(index, close, high, low), stream.columns
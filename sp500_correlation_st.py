@@ -0,0 +1,100 @@
+import io
+import os
+import threading
+import numpy as np
+import pandas as pd
+from correlation_moments_st import CorrelationMoments, RollingCorrelation, pair_correlation
+from sp500_store_st import joinedClosesStore
+from single_flight_st import singleFlight
+from ttl_cache_st import TTLCache
+
+CORRELATION_FILENAME = 'sp500_correlation.npz'
+
+rollingCache = TTLCache(maxSize = int(os.environ.get('ROLLING_CORRELATION_CACHE_SIZE', 4)), ttl = 3600)
+pairCache = TTLCache(maxSize = 256, ttl = 3600)
+
+class CorrelationEngine:
+    def __init__(self, store) -> None:
+        self.store = store
+        self.lock = threading.Lock()
+        self.cached = None
+
+    def _local_path(self) -> str:
+        return os.path.join(self.store.storeDir, CORRELATION_FILENAME)
+
+    def _read_state(self) -> dict:
+        try:
+            with np.load(self._local_path()) as arrays:
+                return {name: arrays[name] for name in arrays.files}
+        except (FileNotFoundError, ValueError, OSError):
+            pass
+
+        remote = self.store.fs.find_one({'filename': CORRELATION_FILENAME}, sort = [('uploadDate', -1)])
+        if remote is None:
+            return None
+        with np.load(io.BytesIO(remote.read())) as arrays:
+            return {name: arrays[name] for name in arrays.files}
+
+    def _write_state(self, state) -> None:
+        buffer = io.BytesIO()
+        np.savez(buffer, **state)
+        os.makedirs(self.store.storeDir, exist_ok = True)
+        with open(f"{self._local_path()}.tmp", 'wb') as stateFile:
+            stateFile.write(buffer.getvalue())
+        os.replace(f"{self._local_path()}.tmp", self._local_path())
+
+        previous = [remote._id for remote in self.store.fs.find({'filename': CORRELATION_FILENAME})]
+        self.store.fs.put(buffer.getvalue(), filename = CORRELATION_FILENAME, metadata = {'version': str(state['version'])})
+        for fileId in previous:
+            self.store.fs.delete(fileId)
+
+    def _compute(self, dates, tickers, closes, version, state) -> dict:
+        rows = int(state['rows']) if state is not None else 0
+        reusable = (state is not None and 0 < rows <= len(dates)
+                    and np.array_equal(state['tickers'], tickers)
+                    and str(state['prefixVersion']) == self.store.version_of(dates[:rows], tickers, closes[:rows]))
+
+        if reusable:
+            moments = CorrelationMoments.from_arrays(state, rows)
+            moments.update(closes[rows:])
+        else:
+            moments = CorrelationMoments.from_closes(closes)
+
+        return dict(moments.to_arrays(), correlation = moments.correlation(), tickers = tickers,
+                    rows = np.int64(len(dates)), version = np.str_(version),
+                    prefixVersion = np.str_(self.store.version_of(dates, tickers, closes)))
+
+    def correlation_frame(self) -> pd.DataFrame:
+        dates, tickers, closes, version = self.store.load()
+
+        with self.lock:
+            if self.cached is None or self.cached[0] != version:
+                state = self._read_state()
+                if state is None or str(state['version']) != version:
+                    state = self._compute(dates, tickers, closes, version, state)
+                    self._write_state(state)
+                self.cached = (version, state['correlation'], state['tickers'])
+
+            _, correlation, stateTickers = self.cached
+
+        df_corr = pd.DataFrame(correlation, index = stateTickers, columns = stateTickers, copy = False)
+        df_corr.attrs['version'] = version
+        return df_corr
+
+    def rolling_correlation(self, window, step, expanding = False) -> RollingCorrelation:
+        dates, tickers, closes, version = self.store.load()
+        key = ('rolling_correlation', version, window, step, expanding)
+        load = lambda: RollingCorrelation(dates, tickers, closes, version, window, step, expanding)
+        return rollingCache.get_or_load(key, lambda: singleFlight.do(key, load)[0])
+
+    def pair_correlation(self, first, second, window, expanding = False) -> pd.Series:
+        dates, tickers, closes, version = self.store.load()
+        columns = {ticker: column for column, ticker in enumerate(tickers)}
+
+        def load() -> pd.Series:
+            correlation = pair_correlation(closes[:, columns[first]], closes[:, columns[second]], window, expanding)
+            return pd.Series(correlation, index = pd.DatetimeIndex(dates, name = 'Date'), name = f"{first} / {second}").dropna()
+
+        return pairCache.get_or_load((version, first, second, window, expanding), load)
+
+correlationEngine = CorrelationEngine(joinedClosesStore)
@@ -0,0 +1,98 @@
+import io
+import base64
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from PIL import Image
+from plotly.colors import sample_colorscale, unlabel_rgb
+from sklearn.cluster import AgglomerativeClustering
+from ttl_cache_st import TTLCache
+
+QUANTISE_LEVELS = 100
+
+def _colour_table(colorscale = 'RdYlGn') -> np.ndarray:
+    colours = sample_colorscale(colorscale, list(np.linspace(0, 1, 2 * QUANTISE_LEVELS + 1)))
+    table = [[*unlabel_rgb(colour), 255] for colour in colours] + [[128, 128, 128, 0]]
+    return np.round(np.array(table, dtype = np.float64)).astype(np.uint8)
+
+COLOUR_TABLE = _colour_table()
+
+class ClusteredCorrelation:
+    def __init__(self, df_corr, clusters) -> None:
+        corr = df_corr.to_numpy(dtype = np.float64)
+        clusters = max(1, min(clusters, len(corr)))
+        distance = 1.0 - np.nan_to_num(corr, nan = 0.0)
+        np.fill_diagonal(distance, 0.0)
+
+        if clusters > 1:
+            labels = AgglomerativeClustering(n_clusters = clusters, metric = 'precomputed',
+                                             linkage = 'average').fit_predict(distance)
+        else:
+            labels = np.zeros(len(corr), dtype = int)
+
+        clusterIds = sorted(np.unique(labels), key = lambda label: -np.sum(labels == label))
+        order = []
+        for label in clusterIds:
+            members = np.flatnonzero(labels == label)
+            cohesion = np.nanmean(corr[np.ix_(members, members)], axis = 1)
+            order.extend(members[np.argsort(-np.nan_to_num(cohesion, nan = -1.0), kind = 'stable')])
+
+        order = np.array(order)
+        relabel = {label: position for position, label in enumerate(clusterIds)}
+        self.order = order
+        self.tickers = np.asarray(df_corr.columns)[order]
+        self.labels = np.array([relabel[label] for label in labels[order]])
+        self.matrix = corr[np.ix_(order, order)]
+        self.boundaries = np.flatnonzero(np.diff(self.labels)) + 1
+        self.clusters = len(clusterIds)
+
+    def quantised(self) -> np.ndarray:
+        levels = np.round(np.nan_to_num(self.matrix, nan = 0.0) * QUANTISE_LEVELS).astype(np.int16) + QUANTISE_LEVELS
+        levels[np.isnan(self.matrix)] = 2 * QUANTISE_LEVELS + 1
+        return levels
+
+    def block_means(self) -> np.ndarray:
+        blocks = np.full((self.clusters, self.clusters), np.nan)
+        for row in range(self.clusters):
+            rowMembers = self.labels == row
+            for column in range(self.clusters):
+                with np.errstate(invalid = 'ignore'):
+                    blocks[row, column] = np.nanmean(self.matrix[np.ix_(rowMembers, self.labels == column)])
+        return blocks
+
+    def block_names(self) -> list:
+        return [f"Cluster {label + 1} ({np.sum(self.labels == label)})" for label in range(self.clusters)]
+
+    def image_figure(self) -> go.Figure:
+        rgba = COLOUR_TABLE[self.quantised()]
+        buffer = io.BytesIO()
+        Image.fromarray(rgba).save(buffer, format = 'PNG', optimize = True)
+        source = f"data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode()}"
+
+        fig = go.Figure(go.Image(source = source, hoverinfo = 'skip'))
+        for boundary in self.boundaries:
+            fig.add_shape(type = 'line', x0 = boundary - 0.5, x1 = boundary - 0.5, y0 = -0.5, y1 = len(self.tickers) - 0.5,
+                          line = dict(color = 'white', width = 0.5))
+            fig.add_shape(type = 'line', y0 = boundary - 0.5, y1 = boundary - 0.5, x0 = -0.5, x1 = len(self.tickers) - 0.5,
+                          line = dict(color = 'white', width = 0.5))
+        return fig
+
+    def block_figure(self) -> go.Figure:
+        names = self.block_names()
+        return go.Figure(go.Heatmap(z = np.round(self.block_means(), 2), x = names, y = names,
+                                    hovertemplate = '%{y}<br>%{x}<br>Mean Correlation: %{z}<extra></extra>',
+                                    colorscale = 'RdYlGn', zmin = -1, zmax = 1))
+
+    def detail_figure(self, rowCluster, columnCluster) -> go.Figure:
+        rows = self.labels == rowCluster
+        columns = self.labels == columnCluster
+        return go.Figure(go.Heatmap(z = np.round(self.matrix[np.ix_(rows, columns)], 3),
+                                    x = self.tickers[columns], y = self.tickers[rows],
+                                    hovertemplate = 'Stock 1: %{y}<br>Stock 2: %{x}<br>Correlation: %{z}<extra></extra>',
+                                    colorscale = 'RdYlGn', zmin = -1, zmax = 1))
+
+clusterCache = TTLCache(maxSize = 8, ttl = 3600)
+
+def clustered_correlation(df_corr, clusters) -> ClusteredCorrelation:
+    key = (df_corr.attrs.get('version'), tuple(df_corr.columns), clusters)
+    return clusterCache.get_or_load(key, lambda: ClusteredCorrelation(df_corr, clusters))
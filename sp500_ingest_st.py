@@ -0,0 +1,98 @@
+import time
+import random
+import logging
+import datetime as dt
+import numpy as np
+import pandas as pd
+from bson.binary import Binary
+from pymongo import UpdateOne
+from data_provider_st import dataProvider
+from sp500_store_st import joinedClosesStore
+
+logger = logging.getLogger(__name__)
+
+def _fetch_closes(tickers, start, end, retries, backoff) -> tuple:
+    pending = list(tickers)
+    fetched = {}
+
+    for attempt in range(retries + 1):
+        try:
+            closes = dataProvider.download(pending, start, end)['Adj Close']
+        except Exception:
+            logger.warning("S&P 500 download of %d tickers failed (attempt %d of %d)", len(pending), attempt + 1, retries + 1,
+                           exc_info = True)
+            closes = pd.DataFrame()
+
+        for ticker in list(pending):
+            if ticker in closes.columns and closes[ticker].notna().any():
+                series = closes[ticker].dropna()
+                fetched[ticker] = (series.index.values.astype('datetime64[ns]').astype(np.int64), series.to_numpy(dtype = np.float64))
+                pending.remove(ticker)
+
+        if not pending or attempt == retries:
+            break
+        time.sleep(backoff * 2 ** attempt + random.uniform(0, backoff))
+
+    if pending:
+        logger.warning("No S&P 500 closes for %d tickers after %d attempts: %s", len(pending), retries + 1, ', '.join(pending))
+    return fetched, pending
+
+class SP500Ingestion:
+    def __init__(self, db, store, batchSize = 50, retries = 3, backoff = 2.0) -> None:
+        self.collection = db['sp500_closes_by_ticker']
+        self.store = store
+        self.batchSize = batchSize
+        self.retries = retries
+        self.backoff = backoff
+
+    def _window(self, start, end) -> dict:
+        return {'start': str(start.date()), 'end': str(end.date())}
+
+    def _completed(self, tickers, window) -> set:
+        cursor = self.collection.find({'_id': {'$in': list(tickers)}, **window}, {'_id': 1})
+        return {document['_id'] for document in cursor}
+
+    def _upsert(self, fetched, window) -> None:
+        if not fetched:
+            return
+        operations = [UpdateOne({'_id': ticker},
+                                {'$set': dict(window, dates = Binary(dates.tobytes()), closes = Binary(closes.tobytes()),
+                                              updatedAt = dt.datetime.now(dt.timezone.utc))},
+                                upsert = True)
+                      for ticker, (dates, closes) in fetched.items()]
+        self.collection.bulk_write(operations, ordered = False)
+
+    def fetch(self, tickers, start, end) -> list:
+        window = self._window(start, end)
+        remaining = [ticker for ticker in tickers if ticker not in self._completed(tickers, window)]
+        if not remaining:
+            return []
+
+        fetched, failed = _fetch_closes(remaining, start, end, self.retries, self.backoff)
+        fetchedTickers = list(fetched)
+        for i in range(0, len(fetchedTickers), self.batchSize):
+            self._upsert({ticker: fetched[ticker] for ticker in fetchedTickers[i:i + self.batchSize]}, window)
+        return failed
+
+    def build(self, tickers, start, end) -> str:
+        documents = {document['_id']: document for document in self.collection.find({'_id': {'$in': list(tickers)}, **self._window(start, end)})}
+        tickers = [ticker for ticker in tickers if ticker in documents]
+        if not tickers:
+            raise LookupError(f"No S&P 500 closes were ingested for {start.date()} to {end.date()}.")
+        series = {ticker: (np.frombuffer(documents[ticker]['dates'], dtype = np.int64),
+                           np.frombuffer(documents[ticker]['closes'], dtype = np.float64)) for ticker in tickers}
+
+        dates = np.unique(np.concatenate([tickerDates for tickerDates, _ in series.values()]))
+        closes = np.full((len(dates), len(tickers)), np.nan, order = 'F')
+        for column, ticker in enumerate(tickers):
+            tickerDates, tickerCloses = series[ticker]
+            closes[np.searchsorted(dates, tickerDates), column] = tickerCloses
+
+        return self.store.save(dates.astype('datetime64[ns]'), tickers, closes)
+
+    def run(self, tickers, start, end) -> list:
+        failed = self.fetch(tickers, start, end)
+        self.build(tickers, start, end)
+        return failed
+
+sp500Ingestion = SP500Ingestion(joinedClosesStore.db, joinedClosesStore)
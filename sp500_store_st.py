@@ -0,0 +1,125 @@
+import io
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+import gridfs
+from stock_db_connector import DatabaseConnector
+
+SP500_STORE_DIR = os.environ.get('SP500_STORE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.stock_store', 'sp500'))
+SP500_FILENAME = 'sp500_joined_closes.npz'
+
+class JoinedClosesStore:
+    def __init__(self, db, storeDir = SP500_STORE_DIR, refreshInterval = 300) -> None:
+        self.db = db
+        self.fs = gridfs.GridFS(db, collection = 'sp500_columnar')
+        self.storeDir = storeDir
+        self.refreshInterval = refreshInterval
+        self.lock = threading.Lock()
+        self.loaded = None
+        self.checkedAt = None
+
+    def _local_paths(self) -> dict:
+        return {name: os.path.join(self.storeDir, f"{name}.npy") for name in ['dates', 'tickers', 'closes']}
+
+    def _local_version(self) -> str:
+        try:
+            with open(os.path.join(self.storeDir, 'version.json')) as versionFile:
+                return json.load(versionFile)['version']
+        except (FileNotFoundError, KeyError, ValueError):
+            return None
+
+    def _remote_version(self) -> str:
+        remote = self.db['sp500_columnar.files'].find_one({'filename': SP500_FILENAME}, {'metadata.version': 1},
+                                                          sort = [('uploadDate', -1)])
+        return remote['metadata']['version'] if remote else None
+
+    def _write_local(self, dates, tickers, closes, version) -> None:
+        os.makedirs(self.storeDir, exist_ok = True)
+        for name, array in zip(['dates', 'tickers', 'closes'], [dates, tickers, np.asfortranarray(closes)]):
+            path = self._local_paths()[name]
+            with open(f"{path}.tmp", 'wb') as arrayFile:
+                np.save(arrayFile, array)
+            os.replace(f"{path}.tmp", path)
+
+        with open(os.path.join(self.storeDir, 'version.json'), 'w') as versionFile:
+            json.dump({'version': version}, versionFile)
+
+    def _read_local(self) -> tuple:
+        paths = self._local_paths()
+        return (np.load(paths['dates']), np.load(paths['tickers']), np.load(paths['closes'], mmap_mode = 'r'))
+
+    def _read_remote(self) -> tuple:
+        remote = self.fs.find_one({'filename': SP500_FILENAME}, sort = [('uploadDate', -1)])
+        if remote is None:
+            return None
+        with np.load(io.BytesIO(remote.read())) as arrays:
+            return arrays['dates'], arrays['tickers'], arrays['closes'], remote.metadata['version']
+
+    def _read_documents(self) -> tuple:
+        df = pd.DataFrame(list(self.db['sp500_joined_closes'].find({}, {'_id': 0})))
+        if df.empty:
+            raise LookupError("No S&P 500 closes are stored yet; run the S&P 500 ingestion first.")
+        dateColumn = 'Date' if 'Date' in df.columns else df.columns[0]
+        dates = pd.to_datetime(df.pop(dateColumn)).values.astype('datetime64[ns]')
+        closes = df.apply(pd.to_numeric, errors = 'coerce').to_numpy(dtype = np.float64)
+        order = np.argsort(dates, kind = 'stable')
+        return dates[order], np.array(df.columns, dtype = str), closes[order]
+
+    def version_of(self, dates, tickers, closes) -> str:
+        digest = hashlib.sha1()
+        for array in [np.ascontiguousarray(dates), np.ascontiguousarray(tickers), np.ascontiguousarray(closes)]:
+            digest.update(array.tobytes())
+        return digest.hexdigest()
+
+    def save(self, dates, tickers, closes) -> str:
+        dates = np.asarray(dates).astype('datetime64[ns]')
+        tickers = np.asarray(tickers, dtype = str)
+        closes = np.asarray(closes, dtype = np.float64)
+        version = self.version_of(dates, tickers, closes)
+
+        buffer = io.BytesIO()
+        np.savez(buffer, dates = dates, tickers = tickers, closes = closes)
+        with self.lock:
+            previous = [remote._id for remote in self.fs.find({'filename': SP500_FILENAME})]
+            self.fs.put(buffer.getvalue(), filename = SP500_FILENAME, metadata = {'version': version})
+            for fileId in previous:
+                self.fs.delete(fileId)
+            self._write_local(dates, tickers, closes, version)
+            self.loaded = None
+
+        return version
+
+    def load(self) -> tuple:
+        now = time.monotonic()
+        with self.lock:
+            if self.loaded is not None and self.checkedAt is not None and now - self.checkedAt < self.refreshInterval:
+                return self.loaded
+
+            remoteVersion = self._remote_version()
+            self.checkedAt = now
+            if self.loaded is not None and self.loaded[3] == remoteVersion:
+                return self.loaded
+
+            if remoteVersion is not None and self._local_version() == remoteVersion:
+                self.loaded = self._read_local() + (remoteVersion,)
+                return self.loaded
+
+            remote = self._read_remote()
+            if remote is not None:
+                self._write_local(*remote)
+                self.loaded = self._read_local() + (remote[3],)
+                return self.loaded
+
+        dates, tickers, closes = self._read_documents()
+        self.save(dates, tickers, closes)
+        return self.load()
+
+    def load_frame(self) -> pd.DataFrame:
+        dates, tickers, closes, _ = self.load()
+        return pd.DataFrame(closes, index = pd.DatetimeIndex(dates, name = 'Date'), columns = tickers, copy = False)
+
+joinedClosesStore = JoinedClosesStore(DatabaseConnector().client["ticker_details"])
@@ -3,9 +3,11 @@ import bs4 as bs
 import datetime as dt
 import pandas as pd
 import requests
-import yfinance as yf
 import plotly.graph_objects as go
 from stock_db_connector import DatabaseConnector
+from sp500_correlation_st import correlationEngine
+from sp500_ingest_st import sp500Ingestion
+from sp500_heatmap_st import clustered_correlation
 
 db_connector = DatabaseConnector()
 client = db_connector.client
@@ -27,49 +29,88 @@ class StandardPoorCorr:
 
         return tickers
 
-    def get_data_from_yahoo() -> None:
+    def get_data_from_yahoo() -> list:
         tickers = StandardPoorCorr.save_sp500_tickers()
 
         start = dt.datetime(2015, 1, 1)
         end = dt.datetime(2022, 12, 31)
 
-        dfs = []
-        for ticker in tickers:
-            df = yf.download(ticker, start, end, progress = False)
-            df.rename(columns = {'Adj Close': ticker}, inplace = True)
-            df.drop(columns = ['Open' ,'High', 'Low', 'Close', 'Volume'], axis = 1, inplace = True)
-            dfs.append(df)
-
-        main_df = pd.concat(dfs, axis = 1)
-        main_df.to_csv('sp500_joined_closes.csv')
+        return sp500Ingestion.run(tickers, start, end)
 
     def visualize_data() -> None:
-        datadb = db['sp500_joined_closes']
-        df = pd.DataFrame(list(datadb.find()))
-        df.drop("_id", axis = 1, inplace = True)
-        
-        for col in df.columns[1:]:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        df_corr = df.corr(numeric_only = True)
-        data = df_corr.values
-
-        fig = go.Figure(data = go.Heatmap(
-            z = data,
-            x = df_corr.columns,
-            y = df_corr.index,
-            hovertemplate = 'Stock 1: %{y}<br>Stock 2: %{x}<br>Correlation: %{z}<extra></extra>',
-            colorscale = 'RdYlGn',
-            zmin = -1,
-            zmax = 1)
-        )
+        periodCol, windowCol, stepCol = st.columns([4, 3, 3])
+        periodOption = periodCol.selectbox("Select a period:", ['Full Period', 'Rolling Window', 'Expanding Window'])
+
+        try:
+            if periodOption == 'Full Period':
+                df_corr = correlationEngine.correlation_frame()
+            else:
+                window = windowCol.select_slider("Window Length (Trading Days):", options = [21, 63, 126, 252], value = 63)
+                step = stepCol.select_slider("Step (Trading Days):", options = [5, 10, 21, 63], value = 21)
+                expanding = periodOption == 'Expanding Window'
+                rolling = correlationEngine.rolling_correlation(window, step, expanding)
+                endDates = rolling.end_dates()
+                endDate = st.select_slider("Window End:", options = endDates, value = endDates[-1])
+                df_corr = rolling.frame(rolling.position(endDate))
+        except LookupError as error:
+            st.write(str(error))
+            return
+
+        viewCol, clusterCol = st.columns([5, 5])
+        viewOption = viewCol.selectbox("Select a view:", ['Clustered Overview', 'Cluster Blocks',
+                                                          'Cluster Detail', 'Full Resolution'])
 
+        if viewOption == 'Full Resolution':
+            fig = go.Figure(data = go.Heatmap(
+                z = df_corr.values,
+                x = df_corr.columns,
+                y = df_corr.index,
+                hovertemplate = 'Stock 1: %{y}<br>Stock 2: %{x}<br>Correlation: %{z}<extra></extra>',
+                colorscale = 'RdYlGn',
+                zmin = -1,
+                zmax = 1)
+            )
+        else:
+            clusters = clusterCol.slider("Number of Clusters:", min_value = 2, max_value = 50, value = 20)
+            clustered = clustered_correlation(df_corr, clusters)
+
+            if viewOption == 'Clustered Overview':
+                fig = clustered.image_figure()
+            elif viewOption == 'Cluster Blocks':
+                fig = clustered.block_figure()
+            else:
+                blockNames = clustered.block_names()
+                rowCol, columnCol = st.columns([5, 5])
+                rowCluster = rowCol.selectbox("Select the Row Cluster:", blockNames)
+                columnCluster = columnCol.selectbox("Select the Column Cluster:", blockNames)
+                fig = clustered.detail_figure(blockNames.index(rowCluster), blockNames.index(columnCluster))
+
+        axisLabels = dict(ticktext = [], tickvals = []) if viewOption in ['Clustered Overview', 'Full Resolution'] else dict()
         fig.update_layout(
             autosize = False,
             width = 1000,
             height = 1000,
-            xaxis = dict(ticktext = [], tickvals = []),
-            yaxis = dict(autorange = 'reversed', ticktext = [], tickvals = [])
+            xaxis = axisLabels,
+            yaxis = dict(autorange = 'reversed', **axisLabels)
+        )
+
+        st.plotly_chart(fig, config = {'displaylogo': False})
+
+        if periodOption != 'Full Period':
+            StandardPoorCorr.visualize_pair(list(df_corr.columns), window, expanding)
+
+    def visualize_pair(tickers, window, expanding) -> None:
+        firstCol, secondCol = st.columns([5, 5])
+        firstStock = firstCol.selectbox("Select the First Stock:", tickers)
+        secondStock = secondCol.selectbox("Select the Second Stock:", tickers, index = min(1, len(tickers) - 1))
+        pairCorr = correlationEngine.pair_correlation(firstStock, secondStock, window, expanding)
+
+        fig = go.Figure(go.Scatter(x = pairCorr.index, y = pairCorr.values, mode = 'lines', name = pairCorr.name,
+                                   hovertemplate = 'Date: %{x}<br>Correlation: %{y:.3f}<extra></extra>'))
+        fig.update_layout(
+            title = f"{'Expanding' if expanding else f'{window}-Day Rolling'} Correlation of {firstStock} and {secondStock}",
+            xaxis_title = 'Date',
+            yaxis = dict(title = 'Correlation', range = [-1, 1])
         )
 
         st.plotly_chart(fig, config = {'displaylogo': False})
@@ -1,35 +1,56 @@
 import streamlit as st
-import yfinance as yf
 import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
 import pytz
-import technical_analysis_module
 from stock_information_st import stock_ticker_list
+from indicator_stream_st import stream_indicator_values
+from strategy_backtest_st import COST_SETTINGS, backtest_signals, periods_per_year
+from strategy_sweep_st import STRATEGIES, SWEEP_METRICS, cached_sweep, rank_results, sweep_figure
 from datetime import datetime
+from functools import cached_property
 from millify import millify
 from plotly.subplots import make_subplots
-from stock_downloader_st import download_stock_data
+from stock_downloader_st import download_multiple_stock_data, download_period_data, fetch_ticker_info
 
-TechnicalAnalysis = technical_analysis_module.TechnicalAnalysis()
+try:
+    import technical_analysis_module
+    TechnicalAnalysis = technical_analysis_module.TechnicalAnalysis()
+except ImportError:
+    from technical_analysis_st import TechnicalAnalysis
 
 class StockAnalyzer:
     def __init__(self, stock, titleStock) -> None:
         self.stock = stock
         self.titleStock = titleStock
-        try:
-            self.companyStock = yf.Ticker(titleStock).info['longName']
-        except:
-            self.companyStock = ('')
-            
-        try:
-            self.mktCap = yf.Ticker(titleStock).info['marketCap']
-        except:
-            self.mktCap = ('')
-            
-        self.dayStock = yf.download(titleStock, period = '5d', progress = False)
         self.etNow = datetime.now(pytz.timezone('US/Eastern')).date()
         self.config = {'displaylogo': False, 'modeBarButtonsToAdd': ['drawline', 'drawopenpath', 'eraseshape']}
+
+    @cached_property
+    def infoDictionary(self) -> dict:
+        try:
+            return fetch_ticker_info(self.titleStock)
+        except:
+            return {}
+
+    @cached_property
+    def companyStock(self) -> str:
+        return self.infoDictionary.get('longName', '')
+
+    @cached_property
+    def mktCap(self):
+        return self.infoDictionary.get('marketCap', '')
+
+    @cached_property
+    def dayStock(self) -> pd.DataFrame:
+        return download_period_data(self.titleStock, '5d')
+
+    @cached_property
+    def timestamps(self) -> pd.DatetimeIndex:
+        for column in ['Datetime', 'Date']:
+            if column in self.stock.columns:
+                return pd.DatetimeIndex(self.stock[column])
+        return pd.DatetimeIndex(self.stock.index)
         
     def stock_prices(self) -> None:
         fig = make_subplots(specs = [[{"secondary_y": True}]])
@@ -92,7 +113,7 @@ class StockAnalyzer:
         if dateRange < 1 and self.stock.index[-1].date() == self.etNow:
             datePeriod = st.select_slider("Select a Date Period:", ['1d', '5d', '10d', '1mo', '3mo', '6mo', 
                                                                     '1y', '2y', '5y', '10y', 'YTD', 'MAX'])
-            yearStock = yf.download(self.titleStock, period = datePeriod, progress = False)
+            yearStock = download_period_data(self.titleStock, datePeriod)
             yearStock['returns'] = (yearStock['Adj Close'] / yearStock['Adj Close'].shift(1)) - 1
             if datePeriod == '1d':
                 dailyVolatility = np.std(self.stock['returns'])
@@ -188,13 +209,17 @@ class StockAnalyzer:
             columns = st.columns([2, 2, 2, 2, 2])
             fig = go.Figure()
 
+            compareData = download_multiple_stock_data(selected_names, self.stock.index[0], self.stock.index[-1])
+
             for name, column in zip(selected_names, columns):
-                stock_data = download_stock_data(name, self.stock.index[0], self.stock.index[-1])
-                fig.add_trace(go.Scatter(x=stock_data.index, y=stock_data['Adj Close'], name=name))
+                stock_data = compareData[name].dropna()
+                if len(stock_data) < 2:
+                    continue
+                fig.add_trace(go.Scatter(x=stock_data.index, y=stock_data, name=name))
 
                 column.metric(label = f"{name}",
-                              value = f"{stock_data['Adj Close'].iloc[-1]:.2f}", 
-                              delta = f"{stock_data['Adj Close'].iloc[-1] - stock_data['Adj Close'].iloc[-2]:.2f}")
+                              value = f"{stock_data.iloc[-1]:.2f}", 
+                              delta = f"{stock_data.iloc[-1] - stock_data.iloc[-2]:.2f}")
 
             fig.update_layout(title='Stock Price Comparison',
                               xaxis_title='Date',
@@ -226,9 +251,16 @@ class StockAnalyzer:
                           newshape = dict(line_color = 'white'))
         st.plotly_chart(fig, use_container_width = True, config = self.config)
 
+    def indicator_frame(self, indicators, **options) -> pd.DataFrame:
+        adjClose, high, low = (self.stock[column].to_numpy(dtype = np.float64) for column in ['Adj Close', 'High', 'Low'])
+        if 'Datetime' in self.stock.columns and len(self.stock) > 0:
+            values, columns = stream_indicator_values(self.titleStock, self.timestamps, adjClose, high, low, indicators, options)
+        else:
+            values, columns = TechnicalAnalysis.indicator_pipeline(adjClose, high, low, indicators, **options)
+        return pd.DataFrame(values.T, index = self.stock.index, columns = columns, copy = False)
+
     def stock_rsi(self) -> None:
-        self.stock['rsi_14'] = TechnicalAnalysis.rsi_calculation(self.stock['Adj Close'], 14)
-        rsi_buy_price, rsi_sell_price = TechnicalAnalysis.implement_rsi(self.stock['Adj Close'][4:], self.stock['rsi_14'][4:])
+        df_rsi = self.indicator_frame(['rsi'], rsi_lookback = 14, rsi_warmup = 4)
         fig = make_subplots(rows = 2, cols = 1, 
                             shared_xaxes = True, 
                             vertical_spacing = 0.1, 
@@ -243,16 +275,16 @@ class StockAnalyzer:
         ), row = 1, col = 1)
 
         fig.add_trace(go.Scatter(
-            x = self.stock.index[4:],
-            y = rsi_buy_price,
+            x = df_rsi.index,
+            y = df_rsi['rsi_buy'],
             mode = 'markers',
             marker = dict(symbol = 'triangle-up', size = 20, color = 'green'),
             name = 'Buy Signal'
         ), row = 1, col = 1)
 
         fig.add_trace(go.Scatter(
-            x = self.stock.index[4:],
-            y = rsi_sell_price,
+            x = df_rsi.index,
+            y = df_rsi['rsi_sell'],
             mode = 'markers',
             marker = dict(symbol = 'triangle-down', size = 20, color = 'red'),
             name = 'Sell Signal'
@@ -266,8 +298,8 @@ class StockAnalyzer:
         )
 
         fig.add_trace(go.Scatter(
-            x = self.stock.index[4:],
-            y = self.stock['rsi_14'][4:],
+            x = df_rsi.index[4:],
+            y = df_rsi['rsi'][4:],
             mode = 'lines',
             name = 'RSI',
             line = dict(color = 'orange', width = 1.5),
@@ -280,19 +312,15 @@ class StockAnalyzer:
         fig.add_shape(type = 'line', x0 = self.stock.index[4], x1 = self.stock.index[-1], y0 = 70, y1 = 70,
                       line = dict(color = 'red', width = 1, dash='dash'), yref = 'y2', row = 2, col = 1)
         st.plotly_chart(fig, use_container_width = True, config = self.config)
+        self.strategy_backtest(df_rsi['rsi_buy'], df_rsi['rsi_sell'], 'RSI')
 
     def stock_macd(self) -> None:
-        df_macd_cpp = TechnicalAnalysis.macd_calculations(self.stock['Adj Close'], 26, 12, 9)
-        macd_buy_price, macd_sell_price = TechnicalAnalysis.implement_macd(self.stock['Adj Close'], df_macd_cpp)
+        df_macd = self.indicator_frame(['macd'], macd_slow = 26, macd_fast = 12, macd_smooth = 9)
         fig = make_subplots(rows = 2, cols = 1, 
                             shared_xaxes = True, 
                             vertical_spacing = 0.1, 
                             row_heights = [0.75, 0.25])
         
-        df_macd = pd.DataFrame(df_macd_cpp).T
-        df_macd = df_macd.rename(columns={0: 'macd', 1: 'signal', 2: 'hist'})
-        df_macd = df_macd.drop(0)
-
         fig.add_trace(go.Scatter(
             x = self.stock.index,
             y = self.stock['Adj Close'],
@@ -302,24 +330,24 @@ class StockAnalyzer:
         ), row = 1, col = 1)
 
         fig.add_trace(go.Scatter(
-            x = self.stock.index,
-            y = macd_buy_price,
+            x = df_macd.index,
+            y = df_macd['macd_buy'],
             mode = 'markers',
             marker = dict(symbol = 'triangle-up', size = 20, color = 'green'),
             name = 'Buy Signal'
         ), row = 1, col = 1)
 
         fig.add_trace(go.Scatter(
-            x = self.stock.index,
-            y = macd_sell_price,
+            x = df_macd.index,
+            y = df_macd['macd_sell'],
             mode = 'markers',
             marker = dict(symbol = 'triangle-down', size = 20, color = 'red'),
             name = 'Sell Signal'
         ), row = 1, col = 1)
 
         fig.add_trace(go.Scatter(
-            x = df_macd.index,
-            y = df_macd['macd'],
+            x = df_macd.index[1:],
+            y = df_macd['macd'][1:],
             mode = 'lines',
             name = 'MACD',
             line = dict(color = 'blue'),
@@ -327,18 +355,18 @@ class StockAnalyzer:
         ), row = 2, col = 1)
 
         fig.add_trace(go.Scatter(
-            x = df_macd.index,
-            y = df_macd['signal'],
+            x = df_macd.index[1:],
+            y = df_macd['signal'][1:],
             mode = 'lines',
             name = 'MACD Signal',
             line = dict(color = 'orange', dash = 'dash'),
             showlegend = False
         ), row = 2, col = 1)
 
-        c = ['red' if cl < 0 else 'green' for cl in df_macd['hist']]
+        c = ['red' if cl < 0 else 'green' for cl in df_macd['hist'][1:]]
         fig.add_trace(go.Bar(
-            x = df_macd.index,
-            y = df_macd['hist'],
+            x = df_macd.index[1:],
+            y = df_macd['hist'][1:],
             marker = dict(color = c),
             name = 'Histogram',
             showlegend = False
@@ -351,11 +379,11 @@ class StockAnalyzer:
             newshape = dict(line_color = 'white')
         )
         st.plotly_chart(fig, use_container_width = True, config = self.config)
+        self.strategy_backtest(df_macd['macd_buy'], df_macd['macd_sell'], 'MACD')
 
     def stock_bollinger(self) -> None:
-        self.stock['sma_20'] = TechnicalAnalysis.sma_calculations(self.stock['Adj Close'], 20)
-        self.stock['upper_bb'], self.stock['lower_bb'] = TechnicalAnalysis.bollinger_bands_calculations(self.stock['Adj Close'], self.stock['sma_20'], 20)
-        bollingerBuyPrice, bollingerSellPrice = TechnicalAnalysis.implement_bollinger(self.stock['Adj Close'], self.stock['lower_bb'], self.stock['upper_bb'])
+        bandWindow = st.select_slider("Select a Band Window:", [20, 50, 100, 200], value = 20)
+        df_bollinger = self.indicator_frame(['bollinger'], bollinger_window = bandWindow)
         fig = go.Figure()
 
         fig.add_trace(go.Scatter(
@@ -367,8 +395,8 @@ class StockAnalyzer:
         ))
     
         fig.add_trace(go.Scatter(
-            x = self.stock.index[20:],
-            y = self.stock['upper_bb'][20:],
+            x = df_bollinger.index[bandWindow:],
+            y = df_bollinger['upper_bb'][bandWindow:],
             mode = 'lines',
             name = 'Upper Band',
             line = dict(color = '#ffa8b5', dash = 'dash'),
@@ -376,8 +404,8 @@ class StockAnalyzer:
         ))
 
         fig.add_trace(go.Scatter(
-            x = self.stock.index[20:],
-            y = self.stock['sma_20'][20:],
+            x = df_bollinger.index[bandWindow:],
+            y = df_bollinger['sma'][bandWindow:],
             mode = 'lines',
             name = 'Middle Band',
             line = dict(color = '#808080', dash = 'dash'),
@@ -385,8 +413,8 @@ class StockAnalyzer:
         ))
 
         fig.add_trace(go.Scatter(
-            x = self.stock.index[20:],
-            y = self.stock['lower_bb'][20:],
+            x = df_bollinger.index[bandWindow:],
+            y = df_bollinger['lower_bb'][bandWindow:],
             mode = 'lines',
             name = 'Lower Band',
             line = dict(color = '#ffa8b5', dash = 'dash'),
@@ -400,29 +428,25 @@ class StockAnalyzer:
         )
 
         fig.add_trace(go.Scatter(
-            x = self.stock.index,
-            y = bollingerBuyPrice,
+            x = df_bollinger.index,
+            y = df_bollinger['bollinger_buy'],
             mode = 'markers',
             marker = dict(symbol = 'triangle-up', size = 20, color = 'green'),
             name = 'Buy Signal'
         ))
 
         fig.add_trace(go.Scatter(
-            x = self.stock.index,
-            y = bollingerSellPrice,
+            x = df_bollinger.index,
+            y = df_bollinger['bollinger_sell'],
             mode = 'markers',
             marker = dict(symbol = 'triangle-down', size = 20, color = 'red'),
             name = 'Sell Signal'
         ))
         st.plotly_chart(fig, use_container_width = True, config = self.config)
+        self.strategy_backtest(df_bollinger['bollinger_buy'], df_bollinger['bollinger_sell'], 'Bollinger Bands')
 
     def stock_donchian(self) -> None:
-        self.stock['upper_db'], self.stock['lower_db'] = TechnicalAnalysis.donchian_breakout_calculations(self.stock['Adj Close'],
-                                                                                                          self.stock['High'],
-                                                                                                          self.stock['Low'], 20)
-        donchianBuyPrice, donchianSellPrice = TechnicalAnalysis.implement_donchian(self.stock['Adj Close'], 
-                                                                                   self.stock['upper_db'], 
-                                                                                   self.stock['lower_db'])
+        df_donchian = self.indicator_frame(['donchian'], donchian_window = 20)
         fig = go.Figure()
 
         fig.add_trace(go.Scatter(
@@ -434,8 +458,8 @@ class StockAnalyzer:
         ))
 
         fig.add_trace(go.Scatter(
-            x = self.stock.index[20:],
-            y = self.stock['upper_db'][20:],
+            x = df_donchian.index[20:],
+            y = df_donchian['upper_dc'][20:],
             mode = 'lines',
             name = 'Upper Channel',
             line = dict(color = '#ffa8b5', dash = 'dash'),
@@ -443,8 +467,8 @@ class StockAnalyzer:
         ))
 
         fig.add_trace(go.Scatter(
-            x = self.stock.index[20:],
-            y = self.stock['lower_db'][20:],
+            x = df_donchian.index[20:],
+            y = df_donchian['lower_dc'][20:],
             mode = 'lines',
             name = 'Lower Channel',
             line = dict(color = '#ffa8b5', dash = 'dash'),
@@ -458,21 +482,58 @@ class StockAnalyzer:
         )
 
         fig.add_trace(go.Scatter(
-            x = self.stock.index,
-            y = donchianBuyPrice,
+            x = df_donchian.index,
+            y = df_donchian['donchian_buy'],
             mode = 'markers',
             marker = dict(symbol = 'triangle-up', size = 20, color = 'green'),
             name = 'Buy Signal'
         ))
 
         fig.add_trace(go.Scatter(
-            x = self.stock.index,
-            y = donchianSellPrice,
+            x = df_donchian.index,
+            y = df_donchian['donchian_sell'],
             mode = 'markers',
             marker = dict(symbol = 'triangle-down', size = 20, color = 'red'),
             name = 'Sell Signal'
         ))
         st.plotly_chart(fig, use_container_width = True, config = self.config)
+        self.strategy_backtest(df_donchian['donchian_buy'], df_donchian['donchian_sell'], 'Donchian Breakout')
+
+    def strategy_backtest(self, buy, sell, strategy) -> None:
+        costBps = st.select_slider("Transaction Cost (bps):", options = COST_SETTINGS, value = 5)
+        backtest = backtest_signals(self.stock['Adj Close'].to_numpy(dtype = np.float64), buy.to_numpy(), sell.to_numpy(),
+                                    costBps = costBps, index = self.timestamps, periodsPerYear = periods_per_year(self.timestamps))
+        metrics = backtest.metrics().iloc[0]
+
+        returnCol, sharpeCol, drawdownCol, hitRateCol = st.columns(4)
+        returnCol.metric(label = "Total Return:", value = f"{metrics['Total Return']:.2%}")
+        sharpeCol.metric(label = "Sharpe Ratio:", value = f"{metrics['Sharpe']:.2f}")
+        drawdownCol.metric(label = "Max Drawdown:", value = f"{metrics['Max Drawdown']:.2%}")
+        hitRateCol.metric(label = f"Hit Rate ({int(metrics['Trades'])} Trades):", value = '-' if np.isnan(metrics['Hit Rate']) else f"{metrics['Hit Rate']:.2%}")
+
+        fig = backtest.figure()
+        fig.update_layout(title = f"{strategy} Backtest for {self.titleStock} ({self.companyStock})",
+                          newshape = dict(line_color = 'white'))
+        st.plotly_chart(fig, use_container_width = True, config = self.config)
+        st.dataframe(backtest.trades().drop(columns = 'Series'), hide_index = True, use_container_width = True)
+
+    def stock_strategy_sweep(self) -> None:
+        strategy = st.selectbox("Strategy:", list(STRATEGIES.keys()))
+        metric = st.selectbox("Rank by:", SWEEP_METRICS)
+        costBps = st.select_slider("Transaction Cost (bps):", options = COST_SETTINGS, value = 5)
+        if len(self.stock.index) < 2:
+            st.write("Not Enough Price History to Run a Parameter Sweep")
+            return
+
+        adjClose, high, low = (self.stock[column].to_numpy(dtype = np.float64) for column in ['Adj Close', 'High', 'Low'])
+        ranked = rank_results(cached_sweep(self.titleStock, self.timestamps, adjClose, high, low, strategy, costBps,
+                                           periods_per_year(self.timestamps)), metric)
+
+        fig = sweep_figure(ranked, strategy, metric)
+        fig.update_layout(title = f"{strategy} Parameter Sweep for {self.titleStock} ({self.companyStock})",
+                          newshape = dict(line_color = 'white'))
+        st.plotly_chart(fig, use_container_width = True, config = self.config)
+        st.dataframe(ranked.head(50), use_container_width = True)
 
     def graph_chooser(self) -> None:
         graphOptions = {
@@ -486,13 +547,14 @@ class StockAnalyzer:
             'MACD Strategy': self.stock_macd,
             'Bollinger Bands Strategy': self.stock_bollinger,
             'Donchian Breakout Strategy': self.stock_donchian,
+            'Strategy Sweep': self.stock_strategy_sweep,
             'Stock Comparer': self.stock_comparer}
 
         graphOptionList = list(graphOptions.keys())
         graphTab1, graphTab2, graphTab3 = st.tabs(['Information Graphs', 'Technical Analysis Graphs',
                                                    'Stock Comparer'])
         selectedGraphOption1 = graphTab1.selectbox("Select an option:", graphOptionList[0:5])
-        selectedGraphOption2 = graphTab2.selectbox("Select an option:", graphOptionList[5:10])
+        selectedGraphOption2 = graphTab2.selectbox("Select an option:", graphOptionList[5:11])
 
         with graphTab1:
             selectedGraphFunction1 = graphOptions.get(selectedGraphOption1)
@@ -503,5 +565,5 @@ class StockAnalyzer:
             selectedGraphFunction2()
 
         with graphTab3:
-            selectedGraphFunction3 = graphOptions.get(graphOptionList[10])
+            selectedGraphFunction3 = graphOptions.get(graphOptionList[11])
             selectedGraphFunction3()
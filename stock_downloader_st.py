@@ -1,41 +1,94 @@
-import yfinance as yf
-import pytz
+import os
+import logging
+import pandas as pd
 from datetime import datetime, timedelta
+from stock_store_st import StockStore, IntradaySessionCache
+from trading_calendar_st import EASTERN, trading_days, previous_trading_day
+from single_flight_st import singleFlight
+from data_provider_st import dataProvider
+from ttl_cache_st import TTLCache
 
-etNow = datetime.now(pytz.timezone('US/Eastern')).date()
+logger = logging.getLogger(__name__)
+
+etNow = datetime.now(EASTERN).date()
+infoCache = TTLCache(maxSize = int(os.environ.get('INFO_CACHE_SIZE', 512)),
+                     ttl = float(os.environ.get('INFO_CACHE_TTL', 900)))
+
+def _fetch_stock_data(userStocks, start, end, interval) -> dict:
+    inputStocks = dataProvider.download(userStocks, start, end, interval = interval)
+    if inputStocks.empty:
+        return {}
+
+    stockFrames = {}
+    for userStock in userStocks:
+        if userStock in inputStocks.columns.get_level_values("Ticker"):
+            stockFrames[userStock] = inputStocks.xs(f"{userStock}", axis=1, level="Ticker").dropna(how = 'all')
+
+    return stockFrames
+
+def fetch_stock_data(userStocks, start, end, interval = '1d') -> dict:
+    key = ('download', tuple(sorted(userStocks)), str(start), str(end), interval)
+    stockFrames, shared = singleFlight.do(key, lambda: _fetch_stock_data(userStocks, start, end, interval))
+    if shared:
+        stockFrames = {userStock: stockFrame.copy() for userStock, stockFrame in stockFrames.items()}
+
+    return stockFrames
+
+def _fetch_period_data(userStock, period) -> pd.DataFrame:
+    inputStock = dataProvider.download([userStock], period = period)
+    if inputStock.empty:
+        return inputStock
+    return inputStock.xs(f"{userStock}", axis=1, level="Ticker")
+
+def download_period_data(userStock, period) -> pd.DataFrame:
+    inputStock, shared = singleFlight.do(('period', userStock, period, '1d'), lambda: _fetch_period_data(userStock, period))
+    return inputStock.copy() if shared else inputStock
+
+def _fetch_ticker_info(userStock) -> dict:
+    infoDictionary, _ = singleFlight.do(('info', userStock), lambda: dataProvider.ticker_attribute(userStock, 'info'))
+    logger.debug("Ticker info cache miss for %s: %s", userStock, ticker_info_cache_stats())
+    return infoDictionary
+
+def fetch_ticker_info(userStock) -> dict:
+    return dict(infoCache.get_or_load(userStock, lambda: _fetch_ticker_info(userStock)))
+
+def ticker_info_cache_stats() -> dict:
+    return infoCache.stats()
+
+stockStore = StockStore(fetch_stock_data)
+sessionCache = IntradaySessionCache(fetch_stock_data)
+
+def _download_window(startDate, endDate) -> tuple:
+    sessions = trading_days(startDate.date(), endDate.date())
+    if not sessions:
+        sessions = [previous_trading_day(startDate.date() + timedelta(days = 1))]
+
+    if len(sessions) == 1 and datetime.now(EASTERN).date() - sessions[0] < timedelta(days = 30):
+        return sessions[0], sessions[0] + timedelta(days = 1), '1m'
+    if len(sessions) == 1:
+        return sessions[0], sessions[0] + timedelta(days = 1), '1d'
+
+    return startDate, endDate, '1d'
+
+def _download(userStocks, startDate, endDate) -> dict:
+    start, end, interval = _download_window(startDate, endDate)
+
+    if interval == '1d':
+        return stockStore.read_many(userStocks, start, end)
+
+    return sessionCache.read_many(userStocks, start)
+
+def download_daily_stock_data(userStock, startDate, endDate) -> pd.DataFrame:
+    return stockStore.read(userStock, startDate, endDate)
 
 def download_stock_data(userStock, startDate, endDate):
-    dateDiff = abs((startDate - endDate).days) - 1
-
-    if dateDiff == 0:
-        if startDate.isoweekday() == 6:
-            start = startDate - timedelta(days = 1)                  
-            end = endDate - timedelta(days = 1)
-            inputStock = yf.download(f"{userStock}", start, end, interval = '1m', progress = False, auto_adjust=False)
-        elif startDate.isoweekday() == 7:
-            start = startDate - timedelta(days = 2)                    
-            end = endDate - timedelta(days = 2)
-            inputStock = yf.download(f"{userStock}", start, end, interval = '1m', progress = False, auto_adjust=False)
-        elif etNow - startDate.date() >= timedelta(days = 30):
-            inputStock = yf.download(f"{userStock}", start, end, progress = False, auto_adjust=False)
-        else:
-            inputStock = yf.download(f"{userStock}", startDate, endDate, interval = '1m', progress = False, auto_adjust=False)
-    elif dateDiff == 1:
-        if startDate.isoweekday() == 6 or startDate.isoweekday() == 7 or endDate.isoweekday() - 1 == 6 or endDate.isoweekday() - 1 == 7:
-            if startDate.isoweekday() == 5:
-                end = endDate - timedelta(days = 1)
-                inputStock = yf.download(f"{userStock}", start, end, interval = '1m', progress = False, auto_adjust=False)
-            else:
-                start = startDate - timedelta(days = 1)                    
-                end = endDate - timedelta(days = 1)
-                inputStock = yf.download(f"{userStock}", start, end, interval = '1m', progress = False, auto_adjust=False)
-        else:
-            inputStock = yf.download(f"{userStock}", startDate, endDate, progress = False, auto_adjust=False)
-    elif dateDiff == 2 and startDate.isoweekday() == 5:
-        end = endDate - timedelta(days = 2)
-        inputStock = yf.download(f"{userStock}", startDate, end, interval = '1m', progress = False, auto_adjust=False)
-    else:
-        inputStock = yf.download(f"{userStock}", startDate, endDate, progress = False, auto_adjust=False)
-
-    inputStock = inputStock.xs(f"{userStock}", axis=1, level="Ticker").reset_index()
-    return inputStock
+    inputStock = _download([userStock], startDate, endDate)[userStock]
+    return inputStock.reset_index()
+
+def download_multiple_stock_data(userStocks, startDate, endDate, column = 'Adj Close'):
+    stockFrames = _download(userStocks, startDate, endDate)
+    columns = {userStock: stockFrame[column] for userStock, stockFrame in stockFrames.items() if not stockFrame.empty}
+    if not columns:
+        return pd.DataFrame(columns = userStocks)
+
+    return pd.concat(columns, axis = 1).sort_index().reindex(columns = userStocks)
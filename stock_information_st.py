@@ -1,19 +1,12 @@
 import streamlit as st
 import pandas as pd
-import yfinance as yf
-from stock_db_connector import DatabaseConnector
-
-db_connector = DatabaseConnector()
-client = db_connector.client
-db = client["ticker_details"]
+from ticker_search_index_st import tickerSearchIndex
+from stock_downloader_st import fetch_ticker_info
+from data_provider_st import dataProvider
+from async_data_st import run_requests, ticker_info_async, news_async
 
 def stock_ticker_list() -> None:
-    data = db['all_ticker_info']
-    df = pd.DataFrame(list(data.find()))
-    df = df.drop("_id", axis = 1)
-
-    df['symbol'] = df['symbol'].str.replace('.', '-', regex = False)
-    ticker_list = list(df['symbol'])
+    ticker_list = tickerSearchIndex.symbols()
     ticker_list.append('^GSPC')
     ticker_list.append('^DJI')
     ticker_list.append('^RUT')
@@ -23,12 +16,18 @@ def stock_ticker_list() -> None:
     return ticker_list
 
 class StockInformation:
-    def __init__(self, stock) -> None:
+    def __init__(self, stock, **attributes) -> None:
         self.stock = stock
+        self.attributes = attributes
+
+    def attribute(self, name):
+        if name in self.attributes:
+            return self.attributes[name]
+        return getattr(self.stock, name)
 
     def stock_major_holders(self) -> None:
         try:
-            majorHolders = pd.DataFrame(self.stock.major_holders)
+            majorHolders = pd.DataFrame(self.attribute('major_holders'))
             majorHolders = majorHolders.reset_index()
             majorHolders.columns = ['Information', 'Percentage']
             st.dataframe(majorHolders, hide_index = True, use_container_width = True)
@@ -37,7 +36,7 @@ class StockInformation:
 
     def stock_institutional_holders(self) -> None:
         try:
-            institutionalHolders = pd.DataFrame(self.stock.institutional_holders)
+            institutionalHolders = pd.DataFrame(self.attribute('institutional_holders'))
             institutionalHolders['Date Reported'] = pd.to_datetime(institutionalHolders['Date Reported']).dt.date
             st.dataframe(institutionalHolders, hide_index = True, use_container_width = True)
         except KeyError:
@@ -45,7 +44,7 @@ class StockInformation:
 
     def stock_mutualfund_holders(self) -> None:
         try:
-            mutualfundHolders = pd.DataFrame(self.stock.mutualfund_holders)
+            mutualfundHolders = pd.DataFrame(self.attribute('mutualfund_holders'))
             mutualfundHolders['Date Reported'] = pd.to_datetime(mutualfundHolders['Date Reported']).dt.date
             st.dataframe(mutualfundHolders, hide_index = True, use_container_width = True)
         except KeyError:
@@ -80,7 +79,7 @@ class StockInformation:
             st.write(" ")
 
     def stock_news(self) -> None:
-        newsList = self.stock.news
+        newsList = self.attribute('news')
         relevantInfo = []
         relatedStocks = []
 
@@ -100,8 +99,10 @@ class StockInformation:
         st.markdown("- " + ", ".join(uniqueTickers))
     
     def stock_info(self) -> None:
-        if self.stock:
-            infoDictionary = self.stock.info
+        if 'info' in self.attributes:
+            infoDictionary = self.attributes['info']
+        elif self.stock:
+            infoDictionary = fetch_ticker_info(self.stock.ticker)
 
         data = {
             'Metric': [],
@@ -157,11 +158,6 @@ class StockInformation:
             StockInformation.stock_splits(self)
 
     def stock_details() -> None:
-        data = db['all_ticker_info']
-        df = pd.DataFrame(list(data.find()))
-        df = df.drop("_id", axis = 1)
-
-        df['symbol'] = df['symbol'].str.replace('.', '-', regex = False)
         detailChoose = st.selectbox("Select an option:", ['Ticker Details', 
                                                           'Filter by Industry', 
                                                           'Filter by Company'])
@@ -186,13 +182,14 @@ class StockInformation:
             elif not details.isascii():
                 st.write(" ")
             else:
-                detail_stock = (df[df['symbol'] == details])
+                detail_stock = tickerSearchIndex.lookup_symbol(details)
                 if detail_stock.empty:
                     st.write("No Company and Industry Information Available for the Ticker")
                 else:
                     st.dataframe(detail_stock[['symbol', 'name', 'industry']], hide_index = True, use_container_width = True)
                 try:
-                    userStock = StockInformation(yf.Ticker(details))
+                    detailRequests = run_requests(info = ticker_info_async(details), news = news_async(details))
+                    userStock = StockInformation(dataProvider.ticker(details), **detailRequests)
                     StockInformation.stock_info(userStock)
                     StockInformation.stock_news(userStock)
                 except:
@@ -200,24 +197,20 @@ class StockInformation:
 
         elif detailChoose == 'Filter by Industry':
             filterCol, searchCol = st.columns([5, 5])
-            df['industry'] = df['industry'].str.lstrip()
-            df['industry'] = df['industry'].str.rstrip()
-            df['industry'] = df['industry'].str.lower()
-            df_sort = sorted(set(df['industry']))[1:]
-
             industry_filter = filterCol.text_input("Filter industries by alphabet (A-Z):").lower()
-            alpha_list = [element for element in df_sort if element.startswith(f"{industry_filter}")]
+            alpha_list = tickerSearchIndex.industries(industry_filter)
             df_alpha_list = pd.DataFrame({'Industry Name': alpha_list}).reset_index(drop = True)
             filterCol.dataframe(df_alpha_list, hide_index = True, use_container_width = True)
             
             industryChoice = searchCol.text_input("Enter an industry name: ").lower()
             if industryChoice:
-                detailIndustry = (df[df['industry'] == industryChoice])
+                detailIndustry = tickerSearchIndex.by_industry(industryChoice)
                 searchCol.dataframe(detailIndustry[['symbol', 'name']], hide_index = True, use_container_width = True)
 
         elif detailChoose == 'Filter by Company':
             company_filter = st.text_input("Filter companies by alphabet (A-Z):").lower()
 
-            filtered_df = df[(df['name'].str.lower()).str.contains(company_filter)]
-            sorted_df = filtered_df.sort_values('name').reset_index(drop = True)
+            sorted_df = tickerSearchIndex.name_contains(company_filter)
+            if sorted_df.empty and company_filter:
+                sorted_df = tickerSearchIndex.name_fuzzy(company_filter)
             st.dataframe(sorted_df[['name', 'symbol']], hide_index = True, use_container_width = True)
@@ -16,6 +16,7 @@ from sklearn.metrics import mean_squared_error
 from keras.models import Sequential
 from keras.layers import Dense, LSTM, GRU
 from keras.optimizers import Adam
+from stock_downloader_st import fetch_ticker_info
 
 tf.random.set_seed(42)
 
@@ -29,7 +30,7 @@ class StockPricePredictor:
         self.stock = stock
         self.titleStock = titleStock
         try:
-            self.companyStock = yf.Ticker(titleStock).info['longName']
+            self.companyStock = fetch_ticker_info(titleStock)['longName']
         except:
             self.companyStock = ('')
         self.config = {'displaylogo': False, 'modeBarButtonsToAdd': ['drawline', 'drawopenpath', 'eraseshape']}
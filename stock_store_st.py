@@ -0,0 +1,264 @@
+import os
+import re
+import json
+import threading
+import numpy as np
+import pandas as pd
+from datetime import date, datetime, timedelta
+from trading_calendar_st import EASTERN, is_session_closed, is_trading_day, previous_trading_day
+
+STORE_DIR = os.environ.get('STOCK_STORE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.stock_store'))
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+SESSION_FILE = re.compile(r'_1m_(\d{4}-\d{2}-\d{2})_')
+
+class StockStore:
+    def __init__(self, fetch, storeDir = STORE_DIR) -> None:
+        self.fetch = fetch
+        self.storeDir = storeDir
+        self.lock = threading.Lock()
+        self.tickerLocks = {}
+        os.makedirs(self.storeDir, exist_ok = True)
+
+    def _ticker_lock(self, ticker, interval) -> threading.Lock:
+        with self.lock:
+            return self.tickerLocks.setdefault((ticker, interval), threading.Lock())
+
+    def _paths(self, ticker, interval) -> tuple:
+        name = f"{ticker.replace('^', '_').replace('/', '_')}_{interval}"
+        base = os.path.join(self.storeDir, name)
+        return f"{base}_dates.npy", f"{base}_values.npy", f"{base}_meta.json"
+
+    def _load(self, ticker, interval) -> tuple:
+        datesPath, valuesPath, metaPath = self._paths(ticker, interval)
+        if not os.path.exists(metaPath):
+            return None, None, None
+
+        with open(metaPath) as metaFile:
+            meta = json.load(metaFile)
+        dates = np.load(datesPath, mmap_mode = 'r')
+        values = np.load(valuesPath, mmap_mode = 'r')
+        return dates, values, meta
+
+    def _save(self, ticker, interval, frame, meta) -> None:
+        datesPath, valuesPath, metaPath = self._paths(ticker, interval)
+        for path, array in [(datesPath, frame.index.values.astype('datetime64[ns]').astype(np.int64)),
+                            (valuesPath, frame[PRICE_COLUMNS].to_numpy(dtype = np.float64))]:
+            tmpPath = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmpPath, 'wb') as tmpFile:
+                np.save(tmpFile, array)
+            os.replace(tmpPath, path)
+
+        tmpPath = f"{metaPath}.{threading.get_ident()}.tmp"
+        with open(tmpPath, 'w') as tmpFile:
+            json.dump(meta, tmpFile)
+        os.replace(tmpPath, metaPath)
+
+    def _to_frame(self, dates, values) -> pd.DataFrame:
+        index = pd.DatetimeIndex(np.asarray(dates).astype('datetime64[ns]'), name = 'Date')
+        return pd.DataFrame(np.array(values), index = index, columns = pd.Index(PRICE_COLUMNS, name = 'Price'))
+
+    def _clean(self, frame) -> pd.DataFrame:
+        frame = frame[PRICE_COLUMNS].dropna(how = 'all')
+        index = pd.DatetimeIndex(frame.index)
+        if index.tz is not None:
+            index = index.tz_convert(EASTERN).tz_localize(None)
+        frame.index = index
+        frame.index.name = 'Date'
+        return frame
+
+    def read(self, ticker, startDate, endDate, interval = '1d') -> pd.DataFrame:
+        return self.read_many([ticker], startDate, endDate, interval)[ticker]
+
+    def _stale(self, stored, frame, coveredEnd) -> bool:
+        if stored is None:
+            return False
+        settled = stored.loc[stored.index < coveredEnd]
+        overlap = settled.index.intersection(frame.index)
+        if overlap.empty:
+            return False
+        columns = ['Close', 'Adj Close']
+        return not np.allclose(settled.loc[overlap, columns].to_numpy(dtype = np.float64),
+                               frame.loc[overlap, columns].to_numpy(dtype = np.float64), rtol = 1e-6, equal_nan = True)
+
+    def _fetch_ranges(self, rangeTickers, interval) -> dict:
+        rangeGroups = {}
+        for ticker, ranges in rangeTickers.items():
+            for tickerRange in ranges:
+                rangeGroups.setdefault(tickerRange, []).append(ticker)
+
+        fetched = {}
+        for tickerRange, groupTickers in rangeGroups.items():
+            frames = self.fetch(groupTickers, tickerRange[0], tickerRange[1], interval)
+            for ticker in groupTickers:
+                frame = frames.get(ticker)
+                fetched[(ticker, tickerRange)] = None if frame is None or frame.empty else self._clean(frame)
+        return fetched
+
+    def read_many(self, tickers, startDate, endDate, interval = '1d') -> dict:
+        start = pd.Timestamp(startDate).normalize()
+        end = pd.Timestamp(endDate).normalize()
+        today = pd.Timestamp(datetime.now(EASTERN).date())
+        tickers = list(dict.fromkeys(tickers))
+        locks = [self._ticker_lock(ticker, interval) for ticker in sorted(tickers)]
+
+        for lock in locks:
+            lock.acquire()
+        try:
+            stored, covered, missing = {}, {}, {}
+            for ticker in tickers:
+                dates, values, meta = self._load(ticker, interval)
+                if meta is None:
+                    stored[ticker] = None
+                    covered[ticker] = (None, None)
+                    missing[ticker] = [(start, end)]
+                    continue
+
+                coveredStart, coveredEnd = pd.Timestamp(meta['start']), pd.Timestamp(meta['end'])
+                stored[ticker] = self._to_frame(dates, values)
+                covered[ticker] = (coveredStart, coveredEnd)
+                settled = stored[ticker].index[stored[ticker].index < coveredEnd]
+                missing[ticker] = []
+                # Each fetch reaches back onto one stored bar so a restated history (splits, dividends) is noticed.
+                if start < coveredStart:
+                    missing[ticker].append((start, coveredStart if settled.empty else settled[0] + pd.Timedelta(days = 1)))
+                if end > coveredEnd:
+                    missing[ticker].append((coveredEnd if settled.empty else settled[-1], end))
+
+            fetched, stale, changed = {ticker: [] for ticker in tickers}, set(), set()
+            for (ticker, (missingStart, missingEnd)), frame in self._fetch_ranges(missing, interval).items():
+                if frame is not None:
+                    if self._stale(stored[ticker], frame, covered[ticker][1]):
+                        stale.add(ticker)
+                    fetched[ticker].append(frame)
+
+                # Empty ranges (holidays, dates before listing) count as covered so they are not requested again.
+                coveredStart, coveredEnd = covered[ticker]
+                coveredStart = missingStart if coveredStart is None else min(coveredStart, missingStart)
+                # Today's bar is still forming, so the covered range stops short of it and the
+                # next read refetches it as part of the tail.
+                coveredEnd = min(missingEnd, today) if coveredEnd is None else max(coveredEnd, min(missingEnd, today))
+                covered[ticker] = (coveredStart, coveredEnd)
+                changed.add(ticker)
+
+            rebuilds = {ticker: [(covered[ticker][0], max(end, covered[ticker][1]))] for ticker in stale}
+            for (ticker, _), frame in self._fetch_ranges(rebuilds, interval).items():
+                if frame is not None:
+                    stored[ticker], fetched[ticker] = None, [frame]
+
+            for ticker in changed:
+                frames = ([stored[ticker]] if stored[ticker] is not None else []) + fetched[ticker]
+                if frames:
+                    frame = pd.concat(frames).sort_index()
+                    stored[ticker] = frame[~frame.index.duplicated(keep = 'last')]
+                else:
+                    stored[ticker] = self._clean(pd.DataFrame(columns = PRICE_COLUMNS, index = pd.DatetimeIndex([]), dtype = np.float64))
+                coveredStart, coveredEnd = covered[ticker]
+                self._save(ticker, interval, stored[ticker], {'start': str(coveredStart.date()), 'end': str(coveredEnd.date())})
+        finally:
+            for lock in locks:
+                lock.release()
+
+        result = {}
+        for ticker in tickers:
+            if stored[ticker] is None:
+                result[ticker] = pd.DataFrame(columns = pd.Index(PRICE_COLUMNS, name = 'Price'), index = pd.DatetimeIndex([], name = 'Date'))
+            else:
+                frame = stored[ticker]
+                result[ticker] = frame.loc[(frame.index >= start) & (frame.index < end)].copy()
+
+        return result
+
+class IntradaySessionCache(StockStore):
+    def __init__(self, fetch, storeDir = os.path.join(STORE_DIR, 'intraday'), settle = timedelta(minutes = 15),
+                 retention = timedelta(days = 30)) -> None:
+        super().__init__(fetch, storeDir)
+        self.settle = settle
+        self.retention = retention
+        self.liveSessions = {}
+        self.prunedOn = None
+
+    def _evict(self) -> None:
+        today = datetime.now(EASTERN).date()
+        currentSession = today if is_trading_day(today) else previous_trading_day(today)
+        cutoff = today - self.retention
+
+        with self.lock:
+            for key in [key for key in self.liveSessions if key[1] < currentSession]:
+                del self.liveSessions[key]
+            if self.prunedOn == today:
+                return
+            self.prunedOn = today
+            for key in [key for key in self.tickerLocks if key[1].startswith('1m_') and date.fromisoformat(key[1][3:]) < cutoff]:
+                del self.tickerLocks[key]
+
+        for name in os.listdir(self.storeDir):
+            match = SESSION_FILE.search(name)
+            if match and date.fromisoformat(match.group(1)) < cutoff:
+                try:
+                    os.remove(os.path.join(self.storeDir, name))
+                except FileNotFoundError:
+                    pass
+
+    def _to_session_frame(self, frame) -> pd.DataFrame:
+        frame = frame.copy()
+        frame.index = frame.index.tz_localize(EASTERN)
+        frame.index.name = 'Datetime'
+        return frame
+
+    def read_many(self, tickers, sessionDate) -> dict:
+        self._evict()
+        interval = f"1m_{sessionDate}"
+        closed = is_session_closed(sessionDate, settle = self.settle)
+        tickers = list(dict.fromkeys(tickers))
+        locks = [self._ticker_lock(ticker, interval) for ticker in sorted(tickers)]
+
+        for lock in locks:
+            lock.acquire()
+        try:
+            sessions, fetchStarts = {}, {}
+            for ticker in tickers:
+                dates, values, meta = self._load(ticker, interval)
+                if meta is not None:
+                    sessions[ticker] = self._to_frame(dates, values)
+                    continue
+
+                live = self.liveSessions.get((ticker, sessionDate))
+                sessions[ticker] = live
+                # The last cached bar may still have been forming, so the tail fetch starts on it.
+                fetchStarts[ticker] = sessionDate if live is None else live.index[-1].to_pydatetime()
+
+            startGroups = {}
+            for ticker, fetchStart in fetchStarts.items():
+                startGroups.setdefault(fetchStart, []).append(ticker)
+
+            for fetchStart, groupTickers in startGroups.items():
+                frames = self.fetch(groupTickers, fetchStart, sessionDate + timedelta(days = 1), '1m')
+                for ticker in groupTickers:
+                    frame = frames.get(ticker)
+                    if frame is None or frame.empty:
+                        continue
+                    frame = pd.concat([sessions[ticker], self._clean(frame)]) if sessions[ticker] is not None else self._clean(frame)
+                    frame = frame.sort_index()
+                    sessions[ticker] = frame[~frame.index.duplicated(keep = 'last')]
+
+            with self.lock:
+                for ticker in fetchStarts:
+                    if sessions[ticker] is None or sessions[ticker].empty:
+                        continue
+                    if closed:
+                        self._save(ticker, interval, sessions[ticker], {'session': str(sessionDate)})
+                        self.liveSessions.pop((ticker, sessionDate), None)
+                    else:
+                        self.liveSessions[(ticker, sessionDate)] = sessions[ticker]
+        finally:
+            for lock in locks:
+                lock.release()
+
+        result = {}
+        for ticker in tickers:
+            if sessions[ticker] is None:
+                result[ticker] = pd.DataFrame(columns = pd.Index(PRICE_COLUMNS, name = 'Price'), index = pd.DatetimeIndex([], name = 'Datetime', tz = EASTERN))
+            else:
+                result[ticker] = self._to_session_frame(sessions[ticker])
+
+        return result
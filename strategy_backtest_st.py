@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from datetime import datetime
+from technical_analysis_st import latch_state
+from trading_calendar_st import REGULAR_CLOSE, REGULAR_OPEN
+
+TRADING_DAYS = 252
+SESSION_LENGTH = datetime.combine(datetime.min, REGULAR_CLOSE) - datetime.combine(datetime.min, REGULAR_OPEN)
+COST_SETTINGS = [0, 1, 2, 5, 10, 20, 50]
+TRADE_COLUMNS = ['Series', 'Side', 'Entry', 'Exit', 'Entry Price', 'Exit Price', 'Bars', 'Return', 'Open']
+
+def _fired(signal) -> np.ndarray:
+    signal = np.asarray(signal)
+    return signal if signal.dtype == bool else ~np.isnan(signal.astype(np.float64))
+
+def signal_candidates(buy, sell) -> np.ndarray:
+    return np.where(_fired(buy), 1, np.where(_fired(sell), -1, 0)).astype(np.int8)
+
+def signal_positions(candidate, allowShort = False) -> np.ndarray:
+    state = latch_state(np.asarray(candidate))
+    target = state if allowShort else state == 1
+    positions = np.zeros(state.shape, dtype = np.float64)
+    positions[..., 1:] = target[..., :-1]
+    return positions
+
+def periods_per_year(index) -> float:
+    index = pd.DatetimeIndex(index)
+    if len(index) < 2:
+        return TRADING_DAYS
+    spacing = pd.Series(index).diff().median()
+    return TRADING_DAYS if spacing >= pd.Timedelta(days = 1) else TRADING_DAYS * (SESSION_LENGTH / spacing)
+
+class Backtest:
+    def __init__(self, prices, positions, costBps = 0.0, index = None, periodsPerYear = TRADING_DAYS) -> None:
+        self.positions = np.atleast_2d(np.asarray(positions, dtype = np.float64))
+        self.prices = np.broadcast_to(np.atleast_2d(np.asarray(prices, dtype = np.float64)), self.positions.shape)
+        self.costBps = costBps
+        self.index = index
+        self.periodsPerYear = periodsPerYear
+
+        self.returns = np.zeros(self.positions.shape)
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            self.returns[:, 1:] = np.nan_to_num(self.prices[:, 1:] / self.prices[:, :-1] - 1, nan = 0.0, posinf = 0.0, neginf = 0.0)
+        self.turnover = np.abs(np.diff(self.positions, axis = 1, prepend = 0.0))
+        self.costs = self.turnover * costBps / 10000
+        self.strategyReturns = self.positions * self.returns - self.costs
+        ruined = np.zeros(self.positions.shape, dtype = bool)
+        ruined[:, 1:] = np.logical_or.accumulate(self.strategyReturns <= -1, axis = 1)[:, :-1]
+        self.strategyReturns = np.where(ruined, 0.0, np.maximum(self.strategyReturns, -1.0))
+        self.equity = np.cumprod(1 + self.strategyReturns, axis = 1)
+        self.drawdown = self.equity / np.maximum.accumulate(self.equity, axis = 1) - 1
+
+    def _trade_arrays(self) -> tuple:
+        held = self.positions
+        rowCount, bars = held.shape
+        previous = np.zeros_like(held)
+        previous[:, 1:] = held[:, :-1]
+        changed = held != previous
+        rows, starts = np.nonzero(changed & (held != 0))
+        changeRows, changes = np.nonzero(changed)
+
+        following = np.searchsorted(changeRows * bars + changes, rows * bars + starts, side = 'right')
+        bounded = np.minimum(following, max(len(changes) - 1, 0))
+        closed = (following < len(changes)) & (changeRows[bounded] == rows) if len(changes) else np.zeros(0, dtype = bool)
+        ends = np.where(closed, changes[bounded] - 1, bars - 1)
+
+        side = held[rows, starts]
+        factors = np.append(np.maximum(1 + held * self.returns, 0.0).ravel(), 1.0)
+        bounds = np.column_stack([rows * bars + starts, rows * bars + ends + 1]).ravel()
+        growth = np.multiply.reduceat(factors, bounds)[::2] if len(bounds) else np.zeros(0)
+        costRate = np.abs(side) * self.costBps / 10000
+        tradeReturns = growth * (1 - costRate) * np.where(closed, 1 - costRate, 1.0) - 1
+        return rows, starts, ends, side, tradeReturns, closed
+
+    def trades(self) -> pd.DataFrame:
+        rows, starts, ends, side, tradeReturns, closed = self._trade_arrays()
+        labels = (lambda positions: positions) if self.index is None else (lambda positions: np.asarray(self.index)[positions])
+        entries = starts - 1
+        known = entries >= 0
+        return pd.DataFrame(dict(zip(TRADE_COLUMNS, [
+            rows, np.where(side > 0, 'Long', 'Short'), pd.Series(labels(np.maximum(entries, 0))).where(known), labels(ends),
+            np.where(known, self.prices[rows, np.maximum(entries, 0)], np.nan), self.prices[rows, ends], ends - starts + 1,
+            tradeReturns, ~closed])))
+
+    def metrics(self) -> pd.DataFrame:
+        rows, _, _, _, tradeReturns, closed = self._trade_arrays()
+        rowCount, bars = self.positions.shape
+        closedTrades = np.bincount(rows[closed], minlength = rowCount)
+        winningTrades = np.bincount(rows[closed], weights = tradeReturns[closed] > 0, minlength = rowCount)
+        mean, std = self.strategyReturns.mean(axis = 1), self.strategyReturns.std(axis = 1)
+
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            return pd.DataFrame({
+                'Sharpe': np.where(std > 0, mean / std * np.sqrt(self.periodsPerYear), np.nan),
+                'Total Return': self.equity[:, -1] - 1,
+                'Annual Return': self.equity[:, -1] ** (self.periodsPerYear / max(bars - 1, 1)) - 1,
+                'Max Drawdown': self.drawdown.min(axis = 1),
+                'Hit Rate': np.where(closedTrades > 0, winningTrades / closedTrades, np.nan),
+                'Trades': np.bincount(rows, minlength = rowCount),
+                'Exposure': np.abs(self.positions).mean(axis = 1),
+                'Costs': self.costs.sum(axis = 1),
+            })
+
+    def figure(self, row = 0) -> go.Figure:
+        index = np.arange(self.positions.shape[1]) if self.index is None else self.index
+        fig = make_subplots(rows = 2, cols = 1, shared_xaxes = True, vertical_spacing = 0.1, row_heights = [0.75, 0.25])
+        fig.add_trace(go.Scatter(x = index, y = self.equity[row], mode = 'lines', name = 'Strategy'), row = 1, col = 1)
+        fig.add_trace(go.Scatter(x = index, y = self.prices[row] / self.prices[row, 0], mode = 'lines', name = 'Buy and Hold',
+                                 line = dict(dash = 'dot')), row = 1, col = 1)
+        fig.add_trace(go.Scatter(x = index, y = self.drawdown[row], mode = 'lines', name = 'Drawdown', fill = 'tozeroy',
+                                 line = dict(color = 'red', width = 1), showlegend = False), row = 2, col = 1)
+        fig.update_layout(yaxis = dict(title = 'Equity'), yaxis2 = dict(title = 'Drawdown', tickformat = '.0%'))
+        return fig
+
+def backtest_signals(prices, buy, sell, costBps = 0.0, allowShort = False, index = None, periodsPerYear = TRADING_DAYS) -> Backtest:
+    return Backtest(prices, signal_positions(signal_candidates(buy, sell), allowShort), costBps = costBps, index = index,
+                    periodsPerYear = periodsPerYear)
@@ -0,0 +1,163 @@
+import os
+import itertools
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from strategy_backtest_st import TRADING_DAYS, Backtest, signal_positions
+from technical_analysis_st import lagged
+from ttl_cache_st import TTLCache
+
+try:
+    import technical_analysis_module
+    TechnicalAnalysis = technical_analysis_module.TechnicalAnalysis()
+except ImportError:
+    from technical_analysis_st import TechnicalAnalysis
+
+RSI_WARMUP = 4
+CHUNK_SIZE = 64
+SWEEP_WORKERS = int(os.environ.get('SWEEP_WORKERS', os.cpu_count() or 1))
+SWEEP_METRICS = ['Sharpe', 'Total Return', 'Max Drawdown', 'Hit Rate']
+
+class IndicatorCache:
+    def __init__(self, close, high, low) -> None:
+        self.close = np.asarray(close, dtype = np.float64)
+        self.high = np.asarray(high, dtype = np.float64)
+        self.low = np.asarray(low, dtype = np.float64)
+        self.values = {}
+
+    def _memo(self, key, calculate) -> np.ndarray:
+        value = self.values.get(key)
+        if value is None:
+            value = self.values[key] = calculate()
+        return value
+
+    def ema(self, span) -> np.ndarray:
+        return self._memo(('ema', span), lambda: pd.Series(self.close).ewm(span = span, adjust = False).mean().to_numpy())
+
+    def macd_line(self, fast, slow) -> np.ndarray:
+        return self._memo(('macd', fast, slow), lambda: self.ema(fast) - self.ema(slow))
+
+    def macd_signal(self, fast, slow, smooth) -> np.ndarray:
+        line = self.macd_line(fast, slow)
+        return self._memo(('signal', fast, slow, smooth), lambda: pd.Series(line).ewm(span = smooth, adjust = False).mean().to_numpy())
+
+    def rsi(self, lookback) -> np.ndarray:
+        return self._memo(('rsi', lookback), lambda: np.asarray(TechnicalAnalysis.rsi_calculation(self.close, lookback)))
+
+    def sma(self, window) -> np.ndarray:
+        return self._memo(('sma', window), lambda: np.asarray(TechnicalAnalysis.sma_calculations(self.close, window)))
+
+    def deviation(self, window) -> np.ndarray:
+        def calculate() -> np.ndarray:
+            upper_band, _ = TechnicalAnalysis.bollinger_bands_calculations(self.close, self.sma(window), window)
+            return (np.asarray(upper_band) - self.sma(window)) / 2
+        return self._memo(('deviation', window), calculate)
+
+    def channels(self, window) -> tuple:
+        return self._memo(('channels', window), lambda: tuple(np.asarray(channel) for channel in
+                          TechnicalAnalysis.donchian_breakout_calculations(self.close, self.high, self.low, window)))
+
+def _column(combos, name) -> np.ndarray:
+    return np.array([combo[name] for combo in combos], dtype = np.float64)[:, None]
+
+def _candidates(buy, sell) -> np.ndarray:
+    return np.where(buy, 1, np.where(sell, -1, 0)).astype(np.int8)
+
+def rsi_candidates(cache, combos) -> np.ndarray:
+    rsi = np.stack([cache.rsi(combo['lookback']) for combo in combos])
+    previous = lagged(rsi)
+    lower, upper = _column(combos, 'lower'), _column(combos, 'upper')
+    ready = np.arange(rsi.shape[1]) >= RSI_WARMUP + 1
+    return _candidates(ready & (previous > lower) & (rsi < lower), ready & (previous < upper) & (rsi > upper))
+
+def macd_candidates(cache, combos) -> np.ndarray:
+    line = np.stack([cache.macd_line(combo['fast'], combo['slow']) for combo in combos])
+    signal = np.stack([cache.macd_signal(combo['fast'], combo['slow'], combo['smooth']) for combo in combos])
+    return _candidates(line > signal, line < signal)
+
+def bollinger_candidates(cache, combos) -> np.ndarray:
+    sma = np.stack([cache.sma(combo['window']) for combo in combos])
+    deviation = np.stack([cache.deviation(combo['window']) for combo in combos]) * _column(combos, 'width')
+    upper_bb, lower_bb = sma + deviation, sma - deviation
+    price, previous = cache.close, lagged(cache.close)
+    return _candidates((previous > lagged(lower_bb)) & (price < lower_bb), (previous < lagged(upper_bb)) & (price > upper_bb))
+
+def donchian_candidates(cache, combos) -> np.ndarray:
+    upper_dc = lagged(np.stack([cache.channels(combo['window'])[0] for combo in combos]))
+    lower_dc = lagged(np.stack([cache.channels(combo['window'])[1] for combo in combos]))
+    price, previous = cache.close, lagged(cache.close)
+    return _candidates((price > upper_dc) & (previous <= upper_dc), (price < lower_dc) & (previous >= lower_dc))
+
+STRATEGIES = {
+    'RSI': {
+        'grid': {'lookback': list(range(6, 31, 2)), 'lower': [20, 25, 30, 35, 40], 'upper': [60, 65, 70, 75, 80]},
+        'valid': lambda combo: combo['lower'] < combo['upper'],
+        'prepare': lambda cache, combos: [partial(cache.rsi, lookback) for lookback in {combo['lookback'] for combo in combos}],
+        'candidates': rsi_candidates,
+        'axes': ('lookback', 'lower'),
+    },
+    'MACD': {
+        'grid': {'fast': list(range(6, 21, 2)), 'slow': list(range(20, 51, 5)), 'smooth': [5, 7, 9, 11, 13]},
+        'valid': lambda combo: combo['fast'] < combo['slow'],
+        'prepare': lambda cache, combos: [partial(cache.macd_line, *pair) for pair in {(combo['fast'], combo['slow']) for combo in combos}],
+        'candidates': macd_candidates,
+        'axes': ('fast', 'slow'),
+    },
+    'Bollinger Bands': {
+        'grid': {'window': list(range(10, 101, 5)), 'width': [1.0, 1.5, 2.0, 2.5, 3.0]},
+        'valid': lambda combo: True,
+        'prepare': lambda cache, combos: [partial(cache.deviation, window) for window in {combo['window'] for combo in combos}],
+        'candidates': bollinger_candidates,
+        'axes': ('window', 'width'),
+    },
+    'Donchian Breakout': {
+        'grid': {'window': list(range(5, 121, 5))},
+        'valid': lambda combo: True,
+        'prepare': lambda cache, combos: [partial(cache.channels, window) for window in {combo['window'] for combo in combos}],
+        'candidates': donchian_candidates,
+        'axes': ('window', None),
+    },
+}
+
+def parameter_grid(strategy, grid = None) -> list:
+    spec = STRATEGIES[strategy]
+    grid = grid or spec['grid']
+    combos = (dict(zip(grid.keys(), values)) for values in itertools.product(*grid.values()))
+    return [combo for combo in combos if spec['valid'](combo)]
+
+def run_sweep(strategy, close, high, low, grid = None, costBps = 0.0, workers = SWEEP_WORKERS, periodsPerYear = TRADING_DAYS) -> pd.DataFrame:
+    spec = STRATEGIES[strategy]
+    combos = parameter_grid(strategy, grid)
+    cache = IndicatorCache(close, high, low)
+    chunks = [combos[start:start + CHUNK_SIZE] for start in range(0, len(combos), CHUNK_SIZE)]
+
+    with ThreadPoolExecutor(max_workers = max(1, workers)) as pool:
+        list(pool.map(lambda prepare: prepare(), spec['prepare'](cache, combos)))
+        metrics = list(pool.map(lambda chunk: Backtest(cache.close, signal_positions(spec['candidates'](cache, chunk)), costBps,
+                                                       periodsPerYear = periodsPerYear).metrics(), chunks))
+
+    return pd.concat([pd.DataFrame(combos), pd.concat(metrics, ignore_index = True)], axis = 1)
+
+def rank_results(results, metric) -> pd.DataFrame:
+    ranked = results.sort_values(metric, ascending = False, na_position = 'last', kind = 'stable')
+    return ranked.reset_index(drop = True).rename(index = lambda position: position + 1)
+
+sweepCache = TTLCache(maxSize = 16, ttl = 3600)
+
+def cached_sweep(ticker, index, close, high, low, strategy, costBps = 0.0, periodsPerYear = TRADING_DAYS) -> pd.DataFrame:
+    key = (ticker, strategy, costBps, periodsPerYear, str(index[0]), str(index[-1]), len(index), float(close[-1]))
+    return sweepCache.get_or_load(key, lambda: run_sweep(strategy, close, high, low, costBps = costBps, periodsPerYear = periodsPerYear))
+
+def sweep_figure(results, strategy, metric) -> go.Figure:
+    x, y = STRATEGIES[strategy]['axes']
+    if y is None:
+        best = results.groupby(x)[metric].max()
+        return go.Figure(go.Scatter(x = best.index, y = best.to_numpy(), mode = 'lines+markers',
+                                    hovertemplate = f"{x}: %{{x}}<br>{metric}: %{{y:.3f}}<extra></extra>"))
+
+    table = results.pivot_table(index = y, columns = x, values = metric, aggfunc = 'max')
+    return go.Figure(go.Heatmap(z = table.to_numpy(), x = table.columns.astype(str), y = table.index.astype(str),
+                                hovertemplate = f"{x}: %{{x}}<br>{y}: %{{y}}<br>{metric}: %{{z:.3f}}<extra></extra>",
+                                colorscale = 'RdYlGn'))
@@ -1,5 +1,4 @@
 import streamlit as st
-import yfinance as yf
 import pytz
 from datetime import date, datetime, timedelta
 from stock_analyzer_st import StockAnalyzer
@@ -7,7 +6,9 @@ from stock_information_st import StockInformation
 from standard_poor_corr_st import StandardPoorCorr
 from us_economy_st import USEconomy
 from stock_price_predict_st import StockPricePredictor
-from stock_downloader_st import download_stock_data
+from stock_downloader_st import download_stock_data, download_daily_stock_data
+from data_provider_st import dataProvider
+from async_data_st import run_requests, holders_async
 
 etNow = datetime.now(pytz.timezone('US/Eastern')).date()
 
@@ -73,7 +74,8 @@ def holder_info():
         elif not userStock.isascii():
             st.write(" ")
         else:
-            holderStock = StockInformation(yf.Ticker(userStock))
+            holders = run_requests(holders = holders_async(userStock))['holders']
+            holderStock = StockInformation(dataProvider.ticker(userStock), **holders)
             StockInformation.holder_chooser(holderStock)
     except ValueError:
         st.write("No Information Available for the Ticker.")
@@ -87,7 +89,7 @@ def div_or_split():
         elif not userStock.isascii():
             st.write(" ")
         else:
-            divSplitStock = StockInformation(yf.Ticker(userStock))
+            divSplitStock = StockInformation(dataProvider.ticker(userStock))
             StockInformation.div_spl_chooser(divSplitStock)
     except ValueError:
         st.write("No Information Available for the Ticker.")
@@ -101,7 +103,7 @@ def stock_analyst_recommendations():
         elif not userStock.isascii():
             st.write(" ")
         else:
-            recomStock = StockInformation(yf.Ticker(userStock))
+            recomStock = StockInformation(dataProvider.ticker(userStock))
             StockInformation.stock_recommendations(recomStock)
     except ValueError:
         st.write("No Information Available for the Ticker.")
@@ -137,7 +139,7 @@ def stock_price_predictor():
     elif not userStock.isascii():
         st.write(" ")
     else:
-        inputStock = yf.download(userStock, '2021-01-01', end, progress = False)
+        inputStock = download_daily_stock_data(userStock, '2021-01-01', end)
         if inputStock.empty:
             st.write("No Information Available for the Ticker.")
         else:
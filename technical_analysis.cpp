@@ -1,190 +1,977 @@
 #include <pybind11/pybind11.h>
-#include <pybind11/stl.h>  
+#include <pybind11/numpy.h>
+#include <pybind11/stl.h>
+#include <atomic>
+#include <thread>
 #include "technical_analysis.h"
 namespace py = pybind11;
 
-vector<double> TechnicalAnalysis::rsi_calculation(const vector<double>& data, int lookback) {
-    vector<double> returns(data.size(), 0.0);
-    vector<double> up(data.size(), 0.0);
-    vector<double> down(data.size(), 0.0);
-    
-    for (size_t i = 1; i < data.size(); ++i) {
-        returns[i] = data[i] - data[i - 1];
-        if (returns[i] < 0) {
-            down[i] = -returns[i];
+using double_array = py::array_t<double, py::array::c_style | py::array::forcecast>;
+
+void TechnicalAnalysis::rsi_calculation(const double* data, size_t n, int lookback, double* rsi) {
+    double alpha = 2.0 / (lookback + 1);
+    double up_ewm = 0.0;
+    double down_ewm = 0.0;
+
+    for (size_t i = 0; i < n; ++i) {
+        double up = 0.0;
+        double down = 0.0;
+        if (i > 0) {
+            double change = data[i] - data[i - 1];
+            if (change < 0) {
+                down = -change;
+            } else {
+                up = change;
+            }
+            up_ewm = alpha * up + (1 - alpha) * up_ewm;
+            down_ewm = alpha * down + (1 - alpha) * down_ewm;
+        }
+        rsi[i] = 100 - (100 / (1 + up_ewm / down_ewm));
+    }
+}
+
+void TechnicalAnalysis::macd_calculations(const double* data, size_t n, int slow, int fast, int smooth, double* macd, double* signal, double* hist) {
+    exponential_moving_average(data, n, fast, macd);
+    exponential_moving_average(data, n, slow, hist);
+    for (size_t i = 0; i < n; ++i) {
+        macd[i] -= hist[i];
+    }
+
+    exponential_moving_average(macd, n, smooth, signal);
+    for (size_t i = 0; i < n; ++i) {
+        hist[i] = macd[i] - signal[i];
+    }
+}
+
+void TechnicalAnalysis::sma_calculations(const double* data, size_t n, int window, double* sma) {
+    fill(sma, sma + n, 0.0);
+    if (window <= 0 || n < static_cast<size_t>(window)) {
+        return;
+    }
+
+    double sum = accumulate(data, data + window, 0.0);
+    for (size_t i = window; i < n; ++i) {
+        sma[i] = sum / window;
+        sum += data[i] - data[i - window];
+    }
+}
+
+template <typename Emit>
+static void sliding_moments(const double* data, size_t n, size_t window, Emit emit) {
+    if (window == 0 || n < window) {
+        return;
+    }
+
+    double mean = 0.0;
+    double m2 = 0.0;
+    for (size_t i = window - 1; i < n; ++i) {
+        if ((i + 1) % window == 0) {
+            mean = accumulate(data + i + 1 - window, data + i + 1, 0.0) / window;
+            m2 = 0.0;
+            for (size_t j = i + 1 - window; j <= i; ++j) {
+                m2 += (data[j] - mean) * (data[j] - mean);
+            }
         } else {
-            up[i] = returns[i];
+            double added = data[i];
+            double removed = data[i - window];
+            double previous_mean = mean;
+            mean += (added - removed) / window;
+            m2 = max(0.0, m2 + (added - removed) * (added - mean + removed - previous_mean));
         }
+        emit(i, mean, m2);
     }
+}
 
-    vector<double> up_ewm = exponential_moving_average(up, lookback);
-    vector<double> down_ewm = exponential_moving_average(down, lookback);
+void TechnicalAnalysis::rolling_std(const double* data, size_t n, int window, double* std) {
+    fill(std, std + n, 0.0);
+    if (window <= 0) {
+        return;
+    }
 
-    vector<double> rs(up_ewm.size());
-    transform(up_ewm.begin(), up_ewm.end(), down_ewm.begin(), rs.begin(), [](double u, double d) { return u / d; });
+    sliding_moments(data, n, window, [&](size_t i, double, double m2) {
+        std[i] = sqrt(m2 / window);
+    });
+}
 
-    vector<double> rsi(rs.size());
-    transform(rs.begin(), rs.end(), rsi.begin(), [](double r) { return 100 - (100 / (1 + r)); });
+void TechnicalAnalysis::bollinger_bands_calculations(const double* data, const double* sma, size_t n, int window, double* upper_band, double* lower_band) {
+    copy(sma, sma + n, upper_band);
+    copy(sma, sma + n, lower_band);
+    if (window <= 0) {
+        return;
+    }
 
-    return vector<double>(rsi.begin(), rsi.end());
+    sliding_moments(data, n, window, [&](size_t i, double mean, double m2) {
+        if (i < static_cast<size_t>(window)) {
+            return;
+        }
+        double deviation = sqrt((m2 + window * (mean - sma[i]) * (mean - sma[i])) / window);
+        upper_band[i] = sma[i] + 2 * deviation;
+        lower_band[i] = sma[i] - 2 * deviation;
+    });
 }
 
-vector<vector<double>> TechnicalAnalysis::macd_calculations(const vector<double>& data, int slow, int fast, int smooth) {
-    vector<double> exp1 = exponential_moving_average(data, fast);
-    vector<double> exp2 = exponential_moving_average(data, slow);
-    vector<double> macd(data.size());
-    transform(exp1.begin(), exp1.end(), exp2.begin(), macd.begin(), minus<double>());
+template <typename Dominates, typename Emit>
+static void sliding_extremum(const double* data, size_t n, size_t window, Dominates dominates, Emit emit) {
+    if (window == 0) {
+        return;
+    }
 
-    vector<double> signal = exponential_moving_average(macd, smooth);
-    vector<double> hist(macd.size());
-    transform(macd.begin(), macd.end(), signal.begin(), hist.begin(), minus<double>());
+    vector<size_t> candidates(min(n, window) + 1);
+    size_t capacity = candidates.size();
+    size_t head = 0;
+    size_t count = 0;
+    for (size_t i = 0; i < n; ++i) {
+        if (count > 0 && candidates[head] + window <= i) {
+            head = (head + 1) % capacity;
+            --count;
+        }
+        while (count > 0 && !dominates(data[candidates[(head + count - 1) % capacity]], data[i])) {
+            --count;
+        }
+        candidates[(head + count) % capacity] = i;
+        ++count;
+        emit(i, data[candidates[head]]);
+    }
+}
 
-    return {macd, signal, hist};
+static bool dominates_max(double kept, double value) {
+    return kept > value;
 }
 
-vector<double> TechnicalAnalysis::sma_calculations(const vector<double>& data, int window) {
-    vector<double> sma(data.size(), 0.0);
-    double sum = accumulate(data.begin(), data.begin() + window, 0.0);
-    for (size_t i = window; i < data.size(); ++i) {
-        sma[i] = sum / window;
-        sum += data[i] - data[i - window];
+static bool dominates_min(double kept, double value) {
+    return kept < value;
+}
+
+void TechnicalAnalysis::rolling_max(const double* data, size_t n, int window, double* out) {
+    fill(out, out + n, 0.0);
+    if (window <= 0) {
+        return;
     }
-    return sma;
+
+    sliding_extremum(data, n, window, dominates_max, [&](size_t i, double extreme) {
+        if (i + 1 >= static_cast<size_t>(window)) {
+            out[i] = extreme;
+        }
+    });
 }
 
-pair<vector<double>, vector<double>> TechnicalAnalysis::bollinger_bands_calculations(const vector<double>& data, const vector<double>& sma, int window) {
-    vector<double> std(data.size(), 0.0);
-    for (size_t i = window; i < data.size(); ++i) {
-        double sum = 0.0;
-        for (size_t j = i - window + 1; j <= i; ++j) {
-            sum += pow(data[j] - sma[i], 2);
+void TechnicalAnalysis::rolling_min(const double* data, size_t n, int window, double* out) {
+    fill(out, out + n, 0.0);
+    if (window <= 0) {
+        return;
+    }
+
+    sliding_extremum(data, n, window, dominates_min, [&](size_t i, double extreme) {
+        if (i + 1 >= static_cast<size_t>(window)) {
+            out[i] = extreme;
         }
-        std[i] = sqrt(sum / window);
+    });
+}
+
+void TechnicalAnalysis::williams_r(const double* data, const double* high_prices, const double* low_prices, size_t n, int window, double* percent_r) {
+    fill(percent_r, percent_r + n, nan(""));
+    if (window <= 0 || n < static_cast<size_t>(window)) {
+        return;
+    }
+
+    vector<double> lowest(n);
+    rolling_min(low_prices, n, window, lowest.data());
+    rolling_max(high_prices, n, window, percent_r);
+    for (size_t i = 0; i < n; ++i) {
+        percent_r[i] = i + 1 >= static_cast<size_t>(window) ? -100 * (percent_r[i] - data[i]) / (percent_r[i] - lowest[i]) : nan("");
+    }
+}
+
+void TechnicalAnalysis::stochastic_oscillator(const double* data, const double* high_prices, const double* low_prices, size_t n, int k_window, int d_window, double* percent_k, double* percent_d) {
+    fill(percent_k, percent_k + n, nan(""));
+    fill(percent_d, percent_d + n, nan(""));
+    if (k_window <= 0 || d_window <= 0 || n < static_cast<size_t>(k_window)) {
+        return;
     }
-    
-    vector<double> upper_band(sma.size()), lower_band(sma.size());
-    transform(sma.begin(), sma.end(), std.begin(), upper_band.begin(), [](double m, double s) { return m + 2 * s; });
-    transform(sma.begin(), sma.end(), std.begin(), lower_band.begin(), [](double m, double s) { return m - 2 * s; });
 
-    return {upper_band, lower_band};
+    rolling_max(high_prices, n, k_window, percent_k);
+    rolling_min(low_prices, n, k_window, percent_d);
+    for (size_t i = 0; i < n; ++i) {
+        percent_k[i] = i + 1 >= static_cast<size_t>(k_window) ? 100 * (data[i] - percent_d[i]) / (percent_k[i] - percent_d[i]) : nan("");
+    }
+
+    double sum = 0.0;
+    size_t missing = 0;
+    size_t first = k_window - 1;
+    fill(percent_d, percent_d + first, nan(""));
+    for (size_t i = first; i < n; ++i) {
+        if (isnan(percent_k[i])) {
+            ++missing;
+        } else {
+            sum += percent_k[i];
+        }
+        if (i >= first + d_window) {
+            if (isnan(percent_k[i - d_window])) {
+                --missing;
+            } else {
+                sum -= percent_k[i - d_window];
+            }
+        }
+        percent_d[i] = i + 1 >= first + d_window && missing == 0 ? sum / d_window : nan("");
+    }
 }
 
-pair<vector<double>, vector<double>> TechnicalAnalysis::donchian_breakout_calculations(const vector<double>& data, const vector<double>& high_prices, const vector<double>& low_prices, int window) {
-    vector<double> upper_channel(data.size(), 0.0);
-    vector<double> lower_channel(data.size(), 0.0);
-    
-    for (size_t i = window - 1; i < data.size(); ++i) {
-        upper_channel[i] = *max_element(high_prices.begin() + i - window + 1, high_prices.begin() + i + 1);
-        lower_channel[i] = *min_element(low_prices.begin() + i - window + 1, low_prices.begin() + i + 1);
+void TechnicalAnalysis::rolling_drawdown(const double* data, size_t n, int window, double* drawdown) {
+    fill(drawdown, drawdown + n, nan(""));
+    if (window <= 0) {
+        return;
     }
 
-    return {upper_channel, lower_channel};
+    sliding_extremum(data, n, window, dominates_max, [&](size_t i, double peak) {
+        drawdown[i] = data[i] / peak - 1;
+    });
+}
+
+void TechnicalAnalysis::donchian_breakout_calculations(const double* high_prices, const double* low_prices, size_t n, int window, double* upper_channel, double* lower_channel) {
+    rolling_max(high_prices, n, window, upper_channel);
+    rolling_min(low_prices, n, window, lower_channel);
 }
 
-pair<vector<double>, vector<double>> TechnicalAnalysis::implement_rsi(const vector<double>& data, const vector<double>& rsi) {
-    vector<double> rsi_buy_price(data.size(), nan(""));
-    vector<double> rsi_sell_price(data.size(), nan(""));
-    vector<int> rsi_signal(data.size(), 0);
+void TechnicalAnalysis::implement_rsi(const double* data, const double* rsi, size_t n, double* buy_price, double* sell_price) {
+    fill(buy_price, buy_price + n, nan(""));
+    fill(sell_price, sell_price + n, nan(""));
     int signal = 0;
 
-    for (size_t i = 1; i < rsi.size(); ++i) {
+    for (size_t i = 1; i < n; ++i) {
         if (rsi[i - 1] > 30 && rsi[i] < 30 && signal != 1) {
-            rsi_buy_price[i] = data[i];
+            buy_price[i] = data[i];
             signal = 1;
-            rsi_signal[i] = signal;
         } else if (rsi[i - 1] < 70 && rsi[i] > 70 && signal != -1) {
-            rsi_sell_price[i] = data[i];
+            sell_price[i] = data[i];
             signal = -1;
-            rsi_signal[i] = signal;
         }
     }
-
-    return {rsi_buy_price, rsi_sell_price};
 }
 
-pair<vector<double>, vector<double>> TechnicalAnalysis::implement_macd(const vector<double>& data, const vector<vector<double>>& data_macd) {
-    vector<double> macd_buy_price(data.size(), nan(""));
-    vector<double> macd_sell_price(data.size(), nan(""));
-    vector<int> macd_signal(data.size(), 0);
+void TechnicalAnalysis::implement_macd(const double* data, const double* macd, const double* signal_line, size_t n, double* buy_price, double* sell_price) {
+    fill(buy_price, buy_price + n, nan(""));
+    fill(sell_price, sell_price + n, nan(""));
     int signal = 0;
 
-    for (size_t i = 0; i < data_macd[0].size(); ++i) {
-        if (data_macd[0][i] > data_macd[1][i] && signal != 1) {
-            macd_buy_price[i] = data[i];
+    for (size_t i = 0; i < n; ++i) {
+        if (macd[i] > signal_line[i] && signal != 1) {
+            buy_price[i] = data[i];
             signal = 1;
-            macd_signal[i] = signal;
-        } else if (data_macd[0][i] < data_macd[1][i] && signal != -1) {
-            macd_sell_price[i] = data[i];
+        } else if (macd[i] < signal_line[i] && signal != -1) {
+            sell_price[i] = data[i];
             signal = -1;
-            macd_signal[i] = signal;
         }
     }
-
-    return {macd_buy_price, macd_sell_price};
 }
 
-pair<vector<double>, vector<double>> TechnicalAnalysis::implement_bollinger(const vector<double>& data, const vector<double>& lower_bb, const vector<double>& upper_bb) {
-    vector<double> bollinger_buy_price(data.size(), nan(""));
-    vector<double> bollinger_sell_price(data.size(), nan(""));
-    vector<int> bollinger_signal(data.size(), 0);
+void TechnicalAnalysis::implement_bollinger(const double* data, const double* lower_bb, const double* upper_bb, size_t n, double* buy_price, double* sell_price) {
+    fill(buy_price, buy_price + n, nan(""));
+    fill(sell_price, sell_price + n, nan(""));
     int signal = 0;
 
-    for (size_t i = 1; i < data.size(); ++i) {
+    for (size_t i = 1; i < n; ++i) {
         if (data[i - 1] > lower_bb[i - 1] && data[i] < lower_bb[i] && signal != 1) {
-            bollinger_buy_price[i] = data[i];
+            buy_price[i] = data[i];
             signal = 1;
-            bollinger_signal[i] = signal;
         } else if (data[i - 1] < upper_bb[i - 1] && data[i] > upper_bb[i] && signal != -1) {
-            bollinger_sell_price[i] = data[i];
+            sell_price[i] = data[i];
             signal = -1;
-            bollinger_signal[i] = signal;
         }
     }
-
-    return {bollinger_buy_price, bollinger_sell_price};
 }
 
-pair<vector<double>, vector<double>> TechnicalAnalysis::implement_donchian(const vector<double>& data, const vector<double>& upper_channel, const vector<double>& lower_channel) {
-    vector<double> donchian_buy_price(data.size(), nan(""));
-    vector<double> donchian_sell_price(data.size(), nan(""));
-    vector<int> donchian_signal(data.size(), 0);
+void TechnicalAnalysis::implement_donchian(const double* data, const double* upper_channel, const double* lower_channel, size_t n, double* buy_price, double* sell_price) {
+    fill(buy_price, buy_price + n, nan(""));
+    fill(sell_price, sell_price + n, nan(""));
     int signal = 0;
 
-    for (size_t i = 1; i < data.size(); ++i) {
+    for (size_t i = 1; i < n; ++i) {
         if (data[i] > upper_channel[i - 1] && data[i - 1] <= upper_channel[i - 1] && signal != 1) {
-            donchian_buy_price[i] = data[i];
+            buy_price[i] = data[i];
             signal = 1;
-            donchian_signal[i] = signal;
         } else if (data[i] < lower_channel[i - 1] && data[i - 1] >= lower_channel[i - 1] && signal != -1) {
-            donchian_sell_price[i] = data[i];
+            sell_price[i] = data[i];
             signal = -1;
-            donchian_signal[i] = signal;
         }
     }
-
-    return {donchian_buy_price, donchian_sell_price};
 }
 
-vector<double> TechnicalAnalysis::exponential_moving_average(const vector<double>& data, int period) {
-    vector<double> ewm(data.size(), 0.0);
+void TechnicalAnalysis::exponential_moving_average(const double* data, size_t n, int period, double* ewm) {
+    if (n == 0) {
+        return;
+    }
+
     double alpha = 2.0 / (period + 1);
     ewm[0] = data[0];
-    for (size_t i = 1; i < data.size(); ++i) {
+    for (size_t i = 1; i < n; ++i) {
         ewm[i] = alpha * data[i] + (1 - alpha) * ewm[i - 1];
     }
-    return ewm;
+}
+
+ExponentialAverage::ExponentialAverage(int period) : alpha(2.0 / (period + 1)), current(0.0), started(false) {}
+
+inline double ExponentialAverage::update(double value) {
+    current = started ? alpha * value + (1 - alpha) * current : value;
+    started = true;
+    return current;
+}
+
+RelativeStrength::RelativeStrength(int lookback) : up_ewm(lookback), down_ewm(lookback), previous(0.0), started(false) {}
+
+inline double RelativeStrength::update(double price) {
+    double up = 0.0;
+    double down = 0.0;
+    if (started) {
+        double change = price - previous;
+        if (change < 0) {
+            down = -change;
+        } else {
+            up = change;
+        }
+    }
+    previous = price;
+    started = true;
+    return 100 - (100 / (1 + up_ewm.update(up) / down_ewm.update(down)));
+}
+
+ConvergenceDivergence::ConvergenceDivergence(int slow, int fast, int smooth) : fast_ewm(fast), slow_ewm(slow), signal_ewm(smooth) {}
+
+inline void ConvergenceDivergence::update(double price, double& macd, double& signal, double& hist) {
+    macd = fast_ewm.update(price);
+    macd -= slow_ewm.update(price);
+    signal = signal_ewm.update(macd);
+    hist = macd - signal;
+}
+
+RollingBands::RollingBands(int window) : window(max(window, 1)), values(max(window, 1), 0.0), seen(0), position_of_next(0), sum(0.0), mean(0.0), m2(0.0) {}
+
+inline void RollingBands::update(double price, double& sma, double& upper_band, double& lower_band) {
+    size_t i = seen++;
+    size_t position = i < window ? i : position_of_next;
+    double removed = values[position];
+    values[position] = price;
+    position_of_next = position + 1 == window ? 0 : position + 1;
+
+    sma = 0.0;
+    if (i < window) {
+        sum += price;
+    } else {
+        sma = sum / window;
+        sum += price - removed;
+    }
+
+    if (i + 1 >= window) {
+        if (position_of_next == 0) {
+            mean = 0.0;
+            for (size_t k = 0; k < window; ++k) {
+                mean += values[k];
+            }
+            mean /= window;
+            m2 = 0.0;
+            for (size_t k = 0; k < window; ++k) {
+                m2 += (values[k] - mean) * (values[k] - mean);
+            }
+        } else {
+            double previous_mean = mean;
+            mean += (price - removed) / window;
+            m2 = max(0.0, m2 + (price - removed) * (price - mean + removed - previous_mean));
+        }
+    }
+
+    upper_band = sma;
+    lower_band = sma;
+    if (i >= window) {
+        double deviation = sqrt((m2 + window * (mean - sma) * (mean - sma)) / window);
+        upper_band = sma + 2 * deviation;
+        lower_band = sma - 2 * deviation;
+    }
+}
+
+MonotonicWindow::MonotonicWindow(int window, bool maximum) : window(max(window, 1)), maximum(maximum), candidates(max(window, 1) + 1), head(0), count(0), seen(0) {}
+
+inline double MonotonicWindow::update(double value) {
+    size_t i = seen++;
+    size_t capacity = candidates.size();
+    if (count > 0 && candidates[head].first + window <= i) {
+        head = head + 1 == capacity ? 0 : head + 1;
+        --count;
+    }
+    size_t tail = head + count >= capacity ? head + count - capacity : head + count;
+    while (count > 0) {
+        size_t last = tail == 0 ? capacity - 1 : tail - 1;
+        double kept = candidates[last].second;
+        if (maximum ? kept > value : kept < value) {
+            break;
+        }
+        tail = last;
+        --count;
+    }
+    candidates[tail] = {i, value};
+    ++count;
+    return candidates[head].second;
+}
+
+RollingExtrema::RollingExtrema(int window) : window(max(window, 1)), seen(0), highest(window, true), lowest(window, false) {}
+
+inline void RollingExtrema::update(double high, double low, double& upper_channel, double& lower_channel) {
+    double upper = highest.update(high);
+    double lower = lowest.update(low);
+    bool ready = ++seen >= window;
+    upper_channel = ready ? upper : 0.0;
+    lower_channel = ready ? lower : 0.0;
+}
+
+vector<string> TechnicalAnalysis::pipeline_columns(const vector<string>& indicators) {
+    vector<string> columns;
+    for (const string& indicator : indicators) {
+        if (indicator == "rsi") {
+            columns.insert(columns.end(), {"rsi", "rsi_buy", "rsi_sell"});
+        } else if (indicator == "macd") {
+            columns.insert(columns.end(), {"macd", "signal", "hist", "macd_buy", "macd_sell"});
+        } else if (indicator == "bollinger") {
+            columns.insert(columns.end(), {"sma", "upper_bb", "lower_bb", "bollinger_buy", "bollinger_sell"});
+        } else if (indicator == "donchian") {
+            columns.insert(columns.end(), {"upper_dc", "lower_dc", "donchian_buy", "donchian_sell"});
+        } else {
+            throw invalid_argument("unknown indicator: " + indicator);
+        }
+    }
+    return columns;
+}
+
+IndicatorPipeline::IndicatorPipeline(const vector<string>& indicators, const PipelineOptions& options)
+    : names(TechnicalAnalysis::pipeline_columns(indicators)), options(options), rsi_row(-1), macd_row(-1), bollinger_row(-1), donchian_row(-1),
+      rsi(options.rsi_lookback), macd(options.macd_slow, options.macd_fast, options.macd_smooth), bands(options.bollinger_window),
+      channels(options.donchian_window), seen(0), rsi_signal(0), macd_signal(0), bollinger_signal(0), donchian_signal(0),
+      previous_price(0.0), previous_rsi(0.0), previous_lower_bb(0.0), previous_upper_bb(0.0), previous_upper_dc(0.0), previous_lower_dc(0.0) {
+    long row = 0;
+    for (const string& indicator : indicators) {
+        if (indicator == "rsi") {
+            rsi_row = row;
+        } else if (indicator == "macd") {
+            macd_row = row;
+        } else if (indicator == "bollinger") {
+            bollinger_row = row;
+        } else {
+            donchian_row = row;
+        }
+        row += TechnicalAnalysis::pipeline_columns({indicator}).size();
+    }
+}
+
+const vector<string>& IndicatorPipeline::columns() const {
+    return names;
+}
+
+size_t IndicatorPipeline::bars() const {
+    return seen;
+}
+
+bool IndicatorPipeline::needs_high_low() const {
+    return donchian_row >= 0;
+}
+
+void IndicatorPipeline::update(const double* data, const double* high_prices, const double* low_prices, size_t n, double* values) {
+    double* rsi_out = rsi_row >= 0 ? values + rsi_row * n : nullptr;
+    double* macd_out = macd_row >= 0 ? values + macd_row * n : nullptr;
+    double* bollinger_out = bollinger_row >= 0 ? values + bollinger_row * n : nullptr;
+    double* donchian_out = donchian_row >= 0 ? values + donchian_row * n : nullptr;
+    size_t rsi_start = static_cast<size_t>(max(options.rsi_warmup, 0)) + 1;
+    const double missing = nan("");
+
+    for (size_t i = 0; i < n; ++i) {
+        double price = data[i];
+
+        if (rsi_out) {
+            double value = rsi.update(price);
+            double buy = missing, sell = missing;
+            if (seen >= rsi_start) {
+                if (previous_rsi > 30 && value < 30 && rsi_signal != 1) {
+                    buy = price;
+                    rsi_signal = 1;
+                } else if (previous_rsi < 70 && value > 70 && rsi_signal != -1) {
+                    sell = price;
+                    rsi_signal = -1;
+                }
+            }
+            rsi_out[i] = value;
+            rsi_out[n + i] = buy;
+            rsi_out[2 * n + i] = sell;
+            previous_rsi = value;
+        }
+
+        if (macd_out) {
+            double line, signal, hist;
+            double buy = missing, sell = missing;
+            macd.update(price, line, signal, hist);
+            if (line > signal && macd_signal != 1) {
+                buy = price;
+                macd_signal = 1;
+            } else if (line < signal && macd_signal != -1) {
+                sell = price;
+                macd_signal = -1;
+            }
+            macd_out[i] = line;
+            macd_out[n + i] = signal;
+            macd_out[2 * n + i] = hist;
+            macd_out[3 * n + i] = buy;
+            macd_out[4 * n + i] = sell;
+        }
+
+        if (bollinger_out) {
+            double sma, upper_bb, lower_bb;
+            double buy = missing, sell = missing;
+            bands.update(price, sma, upper_bb, lower_bb);
+            if (seen > 0) {
+                if (previous_price > previous_lower_bb && price < lower_bb && bollinger_signal != 1) {
+                    buy = price;
+                    bollinger_signal = 1;
+                } else if (previous_price < previous_upper_bb && price > upper_bb && bollinger_signal != -1) {
+                    sell = price;
+                    bollinger_signal = -1;
+                }
+            }
+            bollinger_out[i] = sma;
+            bollinger_out[n + i] = upper_bb;
+            bollinger_out[2 * n + i] = lower_bb;
+            bollinger_out[3 * n + i] = buy;
+            bollinger_out[4 * n + i] = sell;
+            previous_lower_bb = lower_bb;
+            previous_upper_bb = upper_bb;
+        }
+
+        if (donchian_out) {
+            double upper_dc, lower_dc;
+            double buy = missing, sell = missing;
+            channels.update(high_prices[i], low_prices[i], upper_dc, lower_dc);
+            if (seen > 0) {
+                if (price > previous_upper_dc && previous_price <= previous_upper_dc && donchian_signal != 1) {
+                    buy = price;
+                    donchian_signal = 1;
+                } else if (price < previous_lower_dc && previous_price >= previous_lower_dc && donchian_signal != -1) {
+                    sell = price;
+                    donchian_signal = -1;
+                }
+            }
+            donchian_out[i] = upper_dc;
+            donchian_out[n + i] = lower_dc;
+            donchian_out[2 * n + i] = buy;
+            donchian_out[3 * n + i] = sell;
+            previous_upper_dc = upper_dc;
+            previous_lower_dc = lower_dc;
+        }
+
+        previous_price = price;
+        ++seen;
+    }
+}
+
+void TechnicalAnalysis::indicator_pipeline(const double* data, const double* high_prices, const double* low_prices, size_t n, const vector<string>& indicators, const PipelineOptions& options, double* values) {
+    IndicatorPipeline pipeline(indicators, options);
+    pipeline.update(data, high_prices, low_prices, n, values);
+}
+
+template <typename Kernel>
+static void parallel_rows(size_t rows, int threads, Kernel kernel) {
+    size_t workers = threads > 0 ? static_cast<size_t>(threads) : max(1u, thread::hardware_concurrency());
+    workers = min(workers, rows);
+    if (workers <= 1) {
+        for (size_t row = 0; row < rows; ++row) {
+            kernel(row);
+        }
+        return;
+    }
+
+    atomic<size_t> next_row(0);
+    vector<thread> pool;
+    for (size_t worker = 0; worker < workers; ++worker) {
+        pool.emplace_back([&]() {
+            for (size_t row = next_row++; row < rows; row = next_row++) {
+                kernel(row);
+            }
+        });
+    }
+    for (thread& worker : pool) {
+        worker.join();
+    }
+}
+
+void TechnicalAnalysis::batch_rsi(const double* prices, size_t rows, size_t n, int lookback, double* rsi, int threads) {
+    parallel_rows(rows, threads, [&](size_t row) {
+        rsi_calculation(prices + row * n, n, lookback, rsi + row * n);
+    });
+}
+
+void TechnicalAnalysis::batch_macd(const double* prices, size_t rows, size_t n, int slow, int fast, int smooth, double* lines, int threads) {
+    parallel_rows(rows, threads, [&](size_t row) {
+        double* macd = lines + row * 3 * n;
+        macd_calculations(prices + row * n, n, slow, fast, smooth, macd, macd + n, macd + 2 * n);
+    });
+}
+
+void TechnicalAnalysis::batch_sma(const double* prices, size_t rows, size_t n, int window, double* sma, int threads) {
+    parallel_rows(rows, threads, [&](size_t row) {
+        sma_calculations(prices + row * n, n, window, sma + row * n);
+    });
+}
+
+void TechnicalAnalysis::batch_bollinger_bands(const double* prices, const double* sma, size_t rows, size_t n, int window, double* upper_band, double* lower_band, int threads) {
+    parallel_rows(rows, threads, [&](size_t row) {
+        bollinger_bands_calculations(prices + row * n, sma + row * n, n, window, upper_band + row * n, lower_band + row * n);
+    });
+}
+
+void TechnicalAnalysis::batch_donchian_breakout(const double* high_prices, const double* low_prices, size_t rows, size_t n, int window, double* upper_channel, double* lower_channel, int threads) {
+    parallel_rows(rows, threads, [&](size_t row) {
+        donchian_breakout_calculations(high_prices + row * n, low_prices + row * n, n, window, upper_channel + row * n, lower_channel + row * n);
+    });
+}
+
+static size_t series_length(const double_array& data) {
+    if (data.ndim() != 1) {
+        throw py::value_error("expected a one-dimensional array");
+    }
+    return static_cast<size_t>(data.shape(0));
+}
+
+static void check_length(const double_array& values, size_t n) {
+    if (series_length(values) != n) {
+        throw py::value_error("input arrays must have the same length");
+    }
+}
+
+static pair<size_t, size_t> matrix_shape(const double_array& prices) {
+    if (prices.ndim() != 2) {
+        throw py::value_error("expected a two-dimensional array of shape (tickers, time)");
+    }
+    return {static_cast<size_t>(prices.shape(0)), static_cast<size_t>(prices.shape(1))};
+}
+
+static void check_shape(const double_array& values, const pair<size_t, size_t>& shape) {
+    if (matrix_shape(values) != shape) {
+        throw py::value_error("input matrices must have the same shape");
+    }
+}
+
+static py::tuple price_pair(const vector<size_t>& shape, const function<void(double*, double*)>& calculate) {
+    double_array first(shape), second(shape);
+    calculate(first.mutable_data(), second.mutable_data());
+    return py::make_tuple(first, second);
+}
+
+static PipelineOptions pipeline_options(int rsi_lookback, int rsi_warmup, int macd_slow, int macd_fast, int macd_smooth, int bollinger_window, int donchian_window) {
+    PipelineOptions options;
+    options.rsi_lookback = rsi_lookback;
+    options.rsi_warmup = rsi_warmup;
+    options.macd_slow = macd_slow;
+    options.macd_fast = macd_fast;
+    options.macd_smooth = macd_smooth;
+    options.bollinger_window = bollinger_window;
+    options.donchian_window = donchian_window;
+    return options;
+}
+
+static pair<double_array, double_array> high_low_arrays(bool needed, const py::object& high_prices, const py::object& low_prices, size_t n) {
+    if (!needed) {
+        return {double_array(0), double_array(0)};
+    }
+    if (high_prices.is_none() || low_prices.is_none()) {
+        throw py::value_error("donchian needs high_prices and low_prices");
+    }
+    double_array high = high_prices.cast<double_array>();
+    double_array low = low_prices.cast<double_array>();
+    check_length(high, n);
+    check_length(low, n);
+    return {high, low};
+}
+
+template <typename Stream>
+static void copyable(py::class_<Stream>& stream) {
+    stream.def("__copy__", [](const Stream& self) { return Stream(self); })
+          .def("__deepcopy__", [](const Stream& self, py::dict) { return Stream(self); });
 }
 
 PYBIND11_MODULE(technical_analysis_module, m) {
     py::class_<TechnicalAnalysis>(m, "TechnicalAnalysis")
         .def(py::init<>())
-        .def("rsi_calculation", &TechnicalAnalysis::rsi_calculation)
-        .def("macd_calculations", &TechnicalAnalysis::macd_calculations)
-        .def("sma_calculations", &TechnicalAnalysis::sma_calculations)
-        .def("bollinger_bands_calculations", &TechnicalAnalysis::bollinger_bands_calculations)
-        .def("donchian_breakout_calculations", &TechnicalAnalysis::donchian_breakout_calculations)
-        .def("implement_rsi", &TechnicalAnalysis::implement_rsi)
-        .def("implement_macd", &TechnicalAnalysis::implement_macd)
-        .def("implement_bollinger", &TechnicalAnalysis::implement_bollinger)
-        .def("implement_donchian", &TechnicalAnalysis::implement_donchian);
+        .def("rsi_calculation", [](TechnicalAnalysis& self, const double_array& data, int lookback) {
+            size_t n = series_length(data);
+            double_array rsi(n);
+            self.rsi_calculation(data.data(), n, lookback, rsi.mutable_data());
+            return rsi;
+        })
+        .def("macd_calculations", [](TechnicalAnalysis& self, const double_array& data, int slow, int fast, int smooth) {
+            size_t n = series_length(data);
+            double_array result({static_cast<size_t>(3), n});
+            double* lines = result.mutable_data();
+            self.macd_calculations(data.data(), n, slow, fast, smooth, lines, lines + n, lines + 2 * n);
+            return result;
+        })
+        .def("sma_calculations", [](TechnicalAnalysis& self, const double_array& data, int window) {
+            size_t n = series_length(data);
+            double_array sma(n);
+            self.sma_calculations(data.data(), n, window, sma.mutable_data());
+            return sma;
+        })
+        .def("bollinger_bands_calculations", [](TechnicalAnalysis& self, const double_array& data, const double_array& sma, int window) {
+            size_t n = series_length(data);
+            check_length(sma, n);
+            return price_pair({n}, [&](double* upper_band, double* lower_band) {
+                self.bollinger_bands_calculations(data.data(), sma.data(), n, window, upper_band, lower_band);
+            });
+        })
+        .def("rolling_std", [](TechnicalAnalysis& self, const double_array& data, int window) {
+            size_t n = series_length(data);
+            double_array std(n);
+            self.rolling_std(data.data(), n, window, std.mutable_data());
+            return std;
+        })
+        .def("rolling_max", [](TechnicalAnalysis& self, const double_array& data, int window) {
+            size_t n = series_length(data);
+            double_array out(n);
+            self.rolling_max(data.data(), n, window, out.mutable_data());
+            return out;
+        })
+        .def("rolling_min", [](TechnicalAnalysis& self, const double_array& data, int window) {
+            size_t n = series_length(data);
+            double_array out(n);
+            self.rolling_min(data.data(), n, window, out.mutable_data());
+            return out;
+        })
+        .def("williams_r", [](TechnicalAnalysis& self, const double_array& data, const double_array& high_prices, const double_array& low_prices, int window) {
+            size_t n = series_length(data);
+            check_length(high_prices, n);
+            check_length(low_prices, n);
+            double_array percent_r(n);
+            self.williams_r(data.data(), high_prices.data(), low_prices.data(), n, window, percent_r.mutable_data());
+            return percent_r;
+        })
+        .def("stochastic_oscillator", [](TechnicalAnalysis& self, const double_array& data, const double_array& high_prices, const double_array& low_prices, int k_window, int d_window) {
+            size_t n = series_length(data);
+            check_length(high_prices, n);
+            check_length(low_prices, n);
+            return price_pair({n}, [&](double* percent_k, double* percent_d) {
+                self.stochastic_oscillator(data.data(), high_prices.data(), low_prices.data(), n, k_window, d_window, percent_k, percent_d);
+            });
+        })
+        .def("rolling_drawdown", [](TechnicalAnalysis& self, const double_array& data, int window) {
+            size_t n = series_length(data);
+            double_array drawdown(n);
+            self.rolling_drawdown(data.data(), n, window, drawdown.mutable_data());
+            return drawdown;
+        })
+        .def("donchian_breakout_calculations", [](TechnicalAnalysis& self, const double_array& data, const double_array& high_prices, const double_array& low_prices, int window) {
+            size_t n = series_length(data);
+            check_length(high_prices, n);
+            check_length(low_prices, n);
+            return price_pair({n}, [&](double* upper_channel, double* lower_channel) {
+                self.donchian_breakout_calculations(high_prices.data(), low_prices.data(), n, window, upper_channel, lower_channel);
+            });
+        })
+        .def("batch_rsi", [](TechnicalAnalysis& self, const double_array& prices, int lookback, int threads) {
+            auto [rows, n] = matrix_shape(prices);
+            double_array rsi({rows, n});
+            double* out = rsi.mutable_data();
+            {
+                py::gil_scoped_release release;
+                self.batch_rsi(prices.data(), rows, n, lookback, out, threads);
+            }
+            return rsi;
+        }, py::arg("prices"), py::arg("lookback"), py::arg("threads") = 0)
+        .def("batch_macd", [](TechnicalAnalysis& self, const double_array& prices, int slow, int fast, int smooth, int threads) {
+            auto [rows, n] = matrix_shape(prices);
+            double_array lines({rows, static_cast<size_t>(3), n});
+            double* out = lines.mutable_data();
+            {
+                py::gil_scoped_release release;
+                self.batch_macd(prices.data(), rows, n, slow, fast, smooth, out, threads);
+            }
+            return lines;
+        }, py::arg("prices"), py::arg("slow"), py::arg("fast"), py::arg("smooth"), py::arg("threads") = 0)
+        .def("batch_sma", [](TechnicalAnalysis& self, const double_array& prices, int window, int threads) {
+            auto [rows, n] = matrix_shape(prices);
+            double_array sma({rows, n});
+            double* out = sma.mutable_data();
+            {
+                py::gil_scoped_release release;
+                self.batch_sma(prices.data(), rows, n, window, out, threads);
+            }
+            return sma;
+        }, py::arg("prices"), py::arg("window"), py::arg("threads") = 0)
+        .def("batch_bollinger_bands", [](TechnicalAnalysis& self, const double_array& prices, const double_array& sma, int window, int threads) {
+            auto shape = matrix_shape(prices);
+            check_shape(sma, shape);
+            return price_pair({shape.first, shape.second}, [&](double* upper_band, double* lower_band) {
+                py::gil_scoped_release release;
+                self.batch_bollinger_bands(prices.data(), sma.data(), shape.first, shape.second, window, upper_band, lower_band, threads);
+            });
+        }, py::arg("prices"), py::arg("sma"), py::arg("window"), py::arg("threads") = 0)
+        .def("batch_donchian_breakout", [](TechnicalAnalysis& self, const double_array& prices, const double_array& high_prices, const double_array& low_prices, int window, int threads) {
+            auto shape = matrix_shape(prices);
+            check_shape(high_prices, shape);
+            check_shape(low_prices, shape);
+            return price_pair({shape.first, shape.second}, [&](double* upper_channel, double* lower_channel) {
+                py::gil_scoped_release release;
+                self.batch_donchian_breakout(high_prices.data(), low_prices.data(), shape.first, shape.second, window, upper_channel, lower_channel, threads);
+            });
+        }, py::arg("prices"), py::arg("high_prices"), py::arg("low_prices"), py::arg("window"), py::arg("threads") = 0)
+        .def("indicator_pipeline", [](TechnicalAnalysis& self, const double_array& data, py::object high_prices, py::object low_prices,
+                                      const vector<string>& indicators, int rsi_lookback, int rsi_warmup, int macd_slow, int macd_fast,
+                                      int macd_smooth, int bollinger_window, int donchian_window) {
+            size_t n = series_length(data);
+            vector<string> columns = TechnicalAnalysis::pipeline_columns(indicators);
+            bool donchian = find(indicators.begin(), indicators.end(), "donchian") != indicators.end();
+            auto [high, low] = high_low_arrays(donchian, high_prices, low_prices, n);
+            PipelineOptions options = pipeline_options(rsi_lookback, rsi_warmup, macd_slow, macd_fast, macd_smooth, bollinger_window, donchian_window);
+
+            double_array values({columns.size(), n});
+            double* out = values.mutable_data();
+            {
+                py::gil_scoped_release release;
+                self.indicator_pipeline(data.data(), high.data(), low.data(), n, indicators, options, out);
+            }
+            return py::make_tuple(values, columns);
+        }, py::arg("data"), py::arg("high_prices") = py::none(), py::arg("low_prices") = py::none(),
+           py::arg("indicators") = vector<string>{"rsi", "macd", "bollinger", "donchian"}, py::arg("rsi_lookback") = 14,
+           py::arg("rsi_warmup") = 4, py::arg("macd_slow") = 26, py::arg("macd_fast") = 12, py::arg("macd_smooth") = 9,
+           py::arg("bollinger_window") = 20, py::arg("donchian_window") = 20)
+        .def("implement_rsi", [](TechnicalAnalysis& self, const double_array& data, const double_array& rsi) {
+            size_t n = series_length(data);
+            check_length(rsi, n);
+            return price_pair({n}, [&](double* buy_price, double* sell_price) {
+                self.implement_rsi(data.data(), rsi.data(), n, buy_price, sell_price);
+            });
+        })
+        .def("implement_macd", [](TechnicalAnalysis& self, const double_array& data, const double_array& data_macd) {
+            size_t n = series_length(data);
+            if (data_macd.ndim() != 2 || data_macd.shape(0) < 2 || static_cast<size_t>(data_macd.shape(1)) != n) {
+                throw py::value_error("expected macd lines of shape (3, len(data))");
+            }
+            return price_pair({n}, [&](double* buy_price, double* sell_price) {
+                self.implement_macd(data.data(), data_macd.data(), data_macd.data() + n, n, buy_price, sell_price);
+            });
+        })
+        .def("implement_bollinger", [](TechnicalAnalysis& self, const double_array& data, const double_array& lower_bb, const double_array& upper_bb) {
+            size_t n = series_length(data);
+            check_length(lower_bb, n);
+            check_length(upper_bb, n);
+            return price_pair({n}, [&](double* buy_price, double* sell_price) {
+                self.implement_bollinger(data.data(), lower_bb.data(), upper_bb.data(), n, buy_price, sell_price);
+            });
+        })
+        .def("implement_donchian", [](TechnicalAnalysis& self, const double_array& data, const double_array& upper_channel, const double_array& lower_channel) {
+            size_t n = series_length(data);
+            check_length(upper_channel, n);
+            check_length(lower_channel, n);
+            return price_pair({n}, [&](double* buy_price, double* sell_price) {
+                self.implement_donchian(data.data(), upper_channel.data(), lower_channel.data(), n, buy_price, sell_price);
+            });
+        });
+
+    py::class_<RelativeStrength> streaming_rsi(m, "StreamingRSI");
+    streaming_rsi
+        .def(py::init<int>(), py::arg("lookback") = 14)
+        .def("update", &RelativeStrength::update, py::arg("price"))
+        .def("update_batch", [](RelativeStrength& self, const double_array& prices) {
+            size_t n = series_length(prices);
+            double_array rsi(n);
+            const double* in = prices.data();
+            double* out = rsi.mutable_data();
+            for (size_t i = 0; i < n; ++i) {
+                out[i] = self.update(in[i]);
+            }
+            return rsi;
+        }, py::arg("prices"));
+    copyable(streaming_rsi);
+
+    py::class_<ConvergenceDivergence> streaming_macd(m, "StreamingMACD");
+    streaming_macd
+        .def(py::init<int, int, int>(), py::arg("slow") = 26, py::arg("fast") = 12, py::arg("smooth") = 9)
+        .def("update", [](ConvergenceDivergence& self, double price) {
+            double macd, signal, hist;
+            self.update(price, macd, signal, hist);
+            return py::make_tuple(macd, signal, hist);
+        }, py::arg("price"))
+        .def("update_batch", [](ConvergenceDivergence& self, const double_array& prices) {
+            size_t n = series_length(prices);
+            double_array lines({static_cast<size_t>(3), n});
+            const double* in = prices.data();
+            double* out = lines.mutable_data();
+            for (size_t i = 0; i < n; ++i) {
+                self.update(in[i], out[i], out[n + i], out[2 * n + i]);
+            }
+            return lines;
+        }, py::arg("prices"));
+    copyable(streaming_macd);
+
+    py::class_<RollingBands> streaming_bollinger(m, "StreamingBollinger");
+    streaming_bollinger
+        .def(py::init<int>(), py::arg("window") = 20)
+        .def("update", [](RollingBands& self, double price) {
+            double sma, upper_band, lower_band;
+            self.update(price, sma, upper_band, lower_band);
+            return py::make_tuple(sma, upper_band, lower_band);
+        }, py::arg("price"))
+        .def("update_batch", [](RollingBands& self, const double_array& prices) {
+            size_t n = series_length(prices);
+            double_array bands({static_cast<size_t>(3), n});
+            const double* in = prices.data();
+            double* out = bands.mutable_data();
+            for (size_t i = 0; i < n; ++i) {
+                self.update(in[i], out[i], out[n + i], out[2 * n + i]);
+            }
+            return bands;
+        }, py::arg("prices"));
+    copyable(streaming_bollinger);
+
+    py::class_<RollingExtrema> streaming_extrema(m, "StreamingExtrema");
+    streaming_extrema
+        .def(py::init<int>(), py::arg("window") = 20)
+        .def("update", [](RollingExtrema& self, double high, double low) {
+            double upper_channel, lower_channel;
+            self.update(high, low, upper_channel, lower_channel);
+            return py::make_tuple(upper_channel, lower_channel);
+        }, py::arg("high"), py::arg("low"))
+        .def("update_batch", [](RollingExtrema& self, const double_array& high_prices, const double_array& low_prices) {
+            size_t n = series_length(high_prices);
+            check_length(low_prices, n);
+            double_array channels({static_cast<size_t>(2), n});
+            const double* high = high_prices.data();
+            const double* low = low_prices.data();
+            double* out = channels.mutable_data();
+            for (size_t i = 0; i < n; ++i) {
+                self.update(high[i], low[i], out[i], out[n + i]);
+            }
+            return channels;
+        }, py::arg("high_prices"), py::arg("low_prices"));
+    copyable(streaming_extrema);
+
+    py::class_<IndicatorPipeline> streaming_indicators(m, "StreamingIndicators");
+    streaming_indicators
+        .def(py::init([](const vector<string>& indicators, int rsi_lookback, int rsi_warmup, int macd_slow, int macd_fast,
+                         int macd_smooth, int bollinger_window, int donchian_window) {
+            return IndicatorPipeline(indicators, pipeline_options(rsi_lookback, rsi_warmup, macd_slow, macd_fast, macd_smooth,
+                                                                  bollinger_window, donchian_window));
+        }), py::arg("indicators") = vector<string>{"rsi", "macd", "bollinger", "donchian"}, py::arg("rsi_lookback") = 14,
+            py::arg("rsi_warmup") = 4, py::arg("macd_slow") = 26, py::arg("macd_fast") = 12, py::arg("macd_smooth") = 9,
+            py::arg("bollinger_window") = 20, py::arg("donchian_window") = 20)
+        .def_property_readonly("columns", &IndicatorPipeline::columns)
+        .def_property_readonly("bars", &IndicatorPipeline::bars)
+        .def("update_batch", [](IndicatorPipeline& self, const double_array& data, py::object high_prices, py::object low_prices) {
+            size_t n = series_length(data);
+            auto [high, low] = high_low_arrays(self.needs_high_low(), high_prices, low_prices, n);
+            double_array values({self.columns().size(), n});
+            double* out = values.mutable_data();
+            {
+                py::gil_scoped_release release;
+                self.update(data.data(), high.data(), low.data(), n, out);
+            }
+            return values;
+        }, py::arg("data"), py::arg("high_prices") = py::none(), py::arg("low_prices") = py::none())
+        .def("update", [](IndicatorPipeline& self, double price, double high, double low) {
+            double_array values(self.columns().size());
+            self.update(&price, &high, &low, 1, values.mutable_data());
+            return values;
+        }, py::arg("price"), py::arg("high") = nan(""), py::arg("low") = nan(""));
+    copyable(streaming_indicators);
 }
@@ -7,23 +7,156 @@
 #include <numeric>
 #include <algorithm>
 #include <limits>
+#include <functional>
+#include <string>
+#include <stdexcept>
 
 using namespace std;
 
+class ExponentialAverage {
+    public:
+        explicit ExponentialAverage(int period);
+        double update(double value);
+
+    private:
+        double alpha;
+        double current;
+        bool started;
+};
+
+class RelativeStrength {
+    public:
+        explicit RelativeStrength(int lookback);
+        double update(double price);
+
+    private:
+        ExponentialAverage up_ewm;
+        ExponentialAverage down_ewm;
+        double previous;
+        bool started;
+};
+
+class ConvergenceDivergence {
+    public:
+        ConvergenceDivergence(int slow, int fast, int smooth);
+        void update(double price, double& macd, double& signal, double& hist);
+
+    private:
+        ExponentialAverage fast_ewm;
+        ExponentialAverage slow_ewm;
+        ExponentialAverage signal_ewm;
+};
+
+class RollingBands {
+    public:
+        explicit RollingBands(int window);
+        void update(double price, double& sma, double& upper_band, double& lower_band);
+
+    private:
+        size_t window;
+        vector<double> values;
+        size_t seen;
+        size_t position_of_next;
+        double sum;
+        double mean;
+        double m2;
+};
+
+class MonotonicWindow {
+    public:
+        MonotonicWindow(int window, bool maximum);
+        double update(double value);
+
+    private:
+        size_t window;
+        bool maximum;
+        vector<pair<size_t, double>> candidates;
+        size_t head;
+        size_t count;
+        size_t seen;
+};
+
+class RollingExtrema {
+    public:
+        explicit RollingExtrema(int window);
+        void update(double high, double low, double& upper_channel, double& lower_channel);
+
+    private:
+        size_t window;
+        size_t seen;
+        MonotonicWindow highest;
+        MonotonicWindow lowest;
+};
+
+struct PipelineOptions {
+    int rsi_lookback = 14;
+    int rsi_warmup = 4;
+    int macd_slow = 26;
+    int macd_fast = 12;
+    int macd_smooth = 9;
+    int bollinger_window = 20;
+    int donchian_window = 20;
+};
+
+class IndicatorPipeline {
+    public:
+        IndicatorPipeline(const vector<string>& indicators, const PipelineOptions& options);
+        const vector<string>& columns() const;
+        size_t bars() const;
+        bool needs_high_low() const;
+        void update(const double* data, const double* high_prices, const double* low_prices, size_t n, double* values);
+
+    private:
+        vector<string> names;
+        PipelineOptions options;
+        long rsi_row;
+        long macd_row;
+        long bollinger_row;
+        long donchian_row;
+        RelativeStrength rsi;
+        ConvergenceDivergence macd;
+        RollingBands bands;
+        RollingExtrema channels;
+        size_t seen;
+        int rsi_signal;
+        int macd_signal;
+        int bollinger_signal;
+        int donchian_signal;
+        double previous_price;
+        double previous_rsi;
+        double previous_lower_bb;
+        double previous_upper_bb;
+        double previous_upper_dc;
+        double previous_lower_dc;
+};
+
 class TechnicalAnalysis {
     public:
-        vector<double> rsi_calculation(const vector<double>& data, int lookback);
-        vector<vector<double>> macd_calculations(const vector<double>& data, int slow, int fast, int smooth);
-        vector<double> sma_calculations(const vector<double>& data, int window);
-        pair<vector<double>, vector<double>> bollinger_bands_calculations(const vector<double>& data, const vector<double>& sma, int window);
-        pair<vector<double>, vector<double>> donchian_breakout_calculations(const vector<double>& data, const vector<double>& high_prices, const vector<double>& low_prices, int window);
-        pair<vector<double>, vector<double>> implement_rsi(const vector<double>& data, const vector<double>& rsi);
-        pair<vector<double>, vector<double>> implement_macd(const vector<double>& data, const vector<vector<double>>& data_macd);
-        pair<vector<double>, vector<double>> implement_bollinger(const vector<double>& data, const vector<double>& lower_bb, const vector<double>& upper_bb);
-        pair<vector<double>, vector<double>> implement_donchian(const vector<double>& data, const vector<double>& upper_channel, const vector<double>& lower_channel);
+        void rsi_calculation(const double* data, size_t n, int lookback, double* rsi);
+        void macd_calculations(const double* data, size_t n, int slow, int fast, int smooth, double* macd, double* signal, double* hist);
+        void sma_calculations(const double* data, size_t n, int window, double* sma);
+        void rolling_std(const double* data, size_t n, int window, double* std);
+        void bollinger_bands_calculations(const double* data, const double* sma, size_t n, int window, double* upper_band, double* lower_band);
+        void rolling_max(const double* data, size_t n, int window, double* out);
+        void rolling_min(const double* data, size_t n, int window, double* out);
+        void williams_r(const double* data, const double* high_prices, const double* low_prices, size_t n, int window, double* percent_r);
+        void stochastic_oscillator(const double* data, const double* high_prices, const double* low_prices, size_t n, int k_window, int d_window, double* percent_k, double* percent_d);
+        void rolling_drawdown(const double* data, size_t n, int window, double* drawdown);
+        void donchian_breakout_calculations(const double* high_prices, const double* low_prices, size_t n, int window, double* upper_channel, double* lower_channel);
+        void batch_rsi(const double* prices, size_t rows, size_t n, int lookback, double* rsi, int threads);
+        void batch_macd(const double* prices, size_t rows, size_t n, int slow, int fast, int smooth, double* lines, int threads);
+        void batch_sma(const double* prices, size_t rows, size_t n, int window, double* sma, int threads);
+        void batch_bollinger_bands(const double* prices, const double* sma, size_t rows, size_t n, int window, double* upper_band, double* lower_band, int threads);
+        void batch_donchian_breakout(const double* high_prices, const double* low_prices, size_t rows, size_t n, int window, double* upper_channel, double* lower_channel, int threads);
+        static vector<string> pipeline_columns(const vector<string>& indicators);
+        void indicator_pipeline(const double* data, const double* high_prices, const double* low_prices, size_t n, const vector<string>& indicators, const PipelineOptions& options, double* values);
+        void implement_rsi(const double* data, const double* rsi, size_t n, double* buy_price, double* sell_price);
+        void implement_macd(const double* data, const double* macd, const double* signal_line, size_t n, double* buy_price, double* sell_price);
+        void implement_bollinger(const double* data, const double* lower_bb, const double* upper_bb, size_t n, double* buy_price, double* sell_price);
+        void implement_donchian(const double* data, const double* upper_channel, const double* lower_channel, size_t n, double* buy_price, double* sell_price);
 
     private:
-        vector<double> exponential_moving_average(const vector<double>& data, int period);
+        void exponential_moving_average(const double* data, size_t n, int period, double* ewm);
 };
 
 #endif
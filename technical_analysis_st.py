@@ -1,194 +1,244 @@
 import pandas as pd
 import numpy as np
 
+INDICATORS = ['rsi', 'macd', 'bollinger', 'donchian']
+PIPELINE_COLUMNS = {
+    'rsi': ['rsi', 'rsi_buy', 'rsi_sell'],
+    'macd': ['macd', 'signal', 'hist', 'macd_buy', 'macd_sell'],
+    'bollinger': ['sma', 'upper_bb', 'lower_bb', 'bollinger_buy', 'bollinger_sell'],
+    'donchian': ['upper_dc', 'lower_dc', 'donchian_buy', 'donchian_sell'],
+}
+
+def _prices(values) -> np.ndarray:
+    return np.asarray(values, dtype = np.float64)
+
+def _along_time(values, calculate) -> np.ndarray:
+    frame = pd.DataFrame(np.atleast_2d(values).T)
+    return calculate(frame).to_numpy(dtype = np.float64).T.reshape(values.shape)
+
+def _ewm(values, period) -> np.ndarray:
+    return _along_time(values, lambda frame: frame.ewm(alpha = 2.0 / (period + 1), adjust = False).mean())
+
+def _block_sums(current, previous) -> np.ndarray:
+    sums = np.cumsum(current, axis = -1)
+    sums[..., :-1] += np.flip(np.cumsum(np.flip(previous, -1), axis = -1), -1)[..., 1:]
+    return sums
+
+def _rolling_moments(values, window) -> tuple:
+    size = values.shape[-1]
+    blocks = -(-size // window)
+    padded = np.full(values.shape[:-1] + (blocks * window,), np.nan)
+    padded[..., :size] = values
+    grid = padded.reshape(values.shape[:-1] + (blocks, window))
+    shift = grid[..., :1]
+    current = grid - shift
+    previous = np.full_like(grid, np.nan)
+    previous[..., 1:, :] = grid[..., :-1, :] - shift[..., 1:, :]
+
+    mean = _block_sums(current, previous) / window
+    variance = np.maximum(_block_sums(current * current, previous * previous) / window - mean * mean, 0.0)
+    trim = lambda blocked: blocked.reshape(values.shape[:-1] + (blocks * window,))[..., :size]
+    return trim(mean + shift), trim(variance)
+
+def _ready(values, first) -> np.ndarray:
+    return np.arange(values.shape[-1]) >= first
+
+def lagged(values) -> np.ndarray:
+    previous = np.empty_like(values)
+    previous[..., :1] = np.nan
+    previous[..., 1:] = values[..., :-1]
+    return previous
+
+def latch_state(candidate) -> np.ndarray:
+    lastPosition = np.maximum.accumulate(np.where(candidate != 0, np.arange(candidate.shape[-1]), -1), axis = -1)
+    state = np.take_along_axis(candidate, np.maximum(lastPosition, 0), axis = -1)
+    return np.where(lastPosition >= 0, state, 0).astype(candidate.dtype)
+
+def latch_signals(candidate) -> np.ndarray:
+    previous = np.zeros_like(candidate)
+    previous[..., 1:] = latch_state(candidate)[..., :-1]
+    return (candidate != 0) & (candidate != previous)
+
+def signal_prices(data, buy, sell) -> tuple:
+    candidate = np.where(buy, 1, np.where(sell, -1, 0)).astype(np.int8)
+    emitted = latch_signals(candidate)
+    return np.where(emitted & (candidate == 1), data, np.nan), np.where(emitted & (candidate == -1), data, np.nan)
+
 class TechnicalAnalysis:
-    def rsi_calculation(data, lookback) -> pd.DataFrame:
-        returns = data.diff()
-        up = []
-        down = []
-
-        for i in range(len(returns)):
-            if returns[i] < 0:
-                up.append(0)
-                down.append(returns[i])
-            else:
-                up.append(returns[i])
-                down.append(0)
-        
-        up_series = pd.Series(up)
-        down_series = pd.Series(down).abs()
-        
-        up_ewm = up_series.ewm(com = lookback - 1, adjust = False).mean()
-        down_ewm = down_series.ewm(com = lookback - 1, adjust = False).mean()
-
-        rs = up_ewm / down_ewm
-        rsi = 100 - (100 / (1 + rs))
-        rsi_df = pd.DataFrame(rsi).rename(columns = {0: 'rsi'}).set_index(data.index)
-        rsi_df = rsi_df.dropna()
-
-        return rsi_df[3:]
-
-    def macd_calculations(data, slow, fast, smooth) -> pd.DataFrame:
-        exp1 = data.ewm(span = fast, adjust = False).mean()
-        exp2 = data.ewm(span = slow, adjust = False).mean()
-        macd = pd.DataFrame(exp1 - exp2).rename(columns = {'Adj Close': 'macd'})
-        signal = pd.DataFrame(macd.ewm(span = smooth, adjust = False).mean()).rename(columns = {'macd':'signal'})
-        hist = pd.DataFrame(macd['macd'] - signal['signal']).rename(columns = {0:'hist'})
-        frames =  [macd, signal, hist]
-        macdInfoDf = pd.concat(frames, join = 'inner', axis = 1)
-        
-        return macdInfoDf
-
-    def sma_calculations(data, window) -> pd.DataFrame:
-        sma = data.rolling(window = window).mean()
-        
+    def rsi_calculation(data, lookback) -> np.ndarray:
+        data = _prices(data)
+        change = np.zeros_like(data)
+        change[..., 1:] = np.diff(data, axis = -1)
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            rs = _ewm(np.maximum(change, 0.0), lookback) / _ewm(np.maximum(-change, 0.0), lookback)
+            return 100 - (100 / (1 + rs))
+
+    def macd_calculations(data, slow, fast, smooth) -> np.ndarray:
+        data = _prices(data)
+        macd = _ewm(data, fast) - _ewm(data, slow)
+        signal = _ewm(macd, smooth)
+        return np.stack([macd, signal, macd - signal], axis = -2)
+
+    def sma_calculations(data, window) -> np.ndarray:
+        data = _prices(data)
+        sma = np.zeros_like(data)
+        if window <= 0 or data.shape[-1] < window:
+            return sma
+        mean, _ = _rolling_moments(data, window)
+        sma[..., window:] = mean[..., window - 1:-1]
         return sma
 
-    def bollinger_bands_calculations(data, sma, window) -> pd.DataFrame:
-        std = data.rolling(window = window).std()
-        upper_band = sma + std * 2
-        lower_band = sma - std * 2
-
-        return upper_band, lower_band
+    def rolling_std(data, window) -> np.ndarray:
+        data = _prices(data)
+        if window <= 0:
+            return np.zeros_like(data)
+        _, variance = _rolling_moments(data, window)
+        return np.where(_ready(data, window - 1), np.sqrt(variance), 0.0)
+
+    def bollinger_bands_calculations(data, sma, window) -> tuple:
+        data, sma = _prices(data), _prices(sma)
+        if window <= 0:
+            return sma.copy(), sma.copy()
+        mean, variance = _rolling_moments(data, window)
+        deviation = np.sqrt(variance + (mean - sma) ** 2)
+        ready = _ready(data, window)
+        return np.where(ready, sma + 2 * deviation, sma), np.where(ready, sma - 2 * deviation, sma)
+
+    def rolling_max(data, window) -> np.ndarray:
+        data = _prices(data)
+        if window <= 0:
+            return np.zeros_like(data)
+        return np.where(_ready(data, window - 1), _along_time(data, lambda frame: frame.rolling(window).max()), 0.0)
+
+    def rolling_min(data, window) -> np.ndarray:
+        data = _prices(data)
+        if window <= 0:
+            return np.zeros_like(data)
+        return np.where(_ready(data, window - 1), _along_time(data, lambda frame: frame.rolling(window).min()), 0.0)
+
+    def williams_r(data, high_prices, low_prices, window) -> np.ndarray:
+        data = _prices(data)
+        if window <= 0 or data.shape[-1] < window:
+            return np.full_like(data, np.nan)
+        highest, lowest = TechnicalAnalysis.rolling_max(high_prices, window), TechnicalAnalysis.rolling_min(low_prices, window)
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            return np.where(_ready(data, window - 1), -100 * (highest - data) / (highest - lowest), np.nan)
+
+    def stochastic_oscillator(data, high_prices, low_prices, k_window, d_window) -> tuple:
+        data = _prices(data)
+        if k_window <= 0 or d_window <= 0 or data.shape[-1] < k_window:
+            return np.full_like(data, np.nan), np.full_like(data, np.nan)
+        highest, lowest = TechnicalAnalysis.rolling_max(high_prices, k_window), TechnicalAnalysis.rolling_min(low_prices, k_window)
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            percent_k = np.where(_ready(data, k_window - 1), 100 * (data - lowest) / (highest - lowest), np.nan)
+        return percent_k, _along_time(percent_k, lambda frame: frame.rolling(d_window).mean())
+
+    def rolling_drawdown(data, window) -> np.ndarray:
+        data = _prices(data)
+        if window <= 0:
+            return np.full_like(data, np.nan)
+        return data / _along_time(data, lambda frame: frame.rolling(window, min_periods = 1).max()) - 1
 
     def donchian_breakout_calculations(data, high_prices, low_prices, window) -> tuple:
-        upper_channel = high_prices.rolling(window = window).max()
-        lower_channel = low_prices.rolling(window = window).min()
-    
-        return upper_channel, lower_channel
-
-    def implement_rsi(data, rsi) -> tuple:    
-        rsi_buy_price = []
-        rsi_sell_price = []
-        rsi_signal = []
-        signal = 0
-
-        for i in range(len(rsi)):
-            if rsi[i - 1] > 30 and rsi[i] < 30:
-                if signal != 1:
-                    rsi_buy_price.append(data[i])
-                    rsi_sell_price.append(np.nan)
-                    signal = 1
-                    rsi_signal.append(signal)
-                else:
-                    rsi_buy_price.append(np.nan)
-                    rsi_sell_price.append(np.nan)
-                    rsi_signal.append(0)
-            elif rsi[i - 1] < 70 and rsi[i] > 70:
-                if signal != -1:
-                    rsi_buy_price.append(np.nan)
-                    rsi_sell_price.append(data[i])
-                    signal = -1
-                    rsi_signal.append(signal)
-                else:
-                    rsi_buy_price.append(np.nan)
-                    rsi_sell_price.append(np.nan)
-                    rsi_signal.append(0)
-            else:
-                rsi_buy_price.append(np.nan)
-                rsi_sell_price.append(np.nan)
-                rsi_signal.append(0)
-                
-        return rsi_buy_price, rsi_sell_price
-
-    def implement_macd(data, data_macd) -> tuple:    
-        macd_buy_price = []
-        macd_sell_price = []
-        macd_signal = []
-        signal = 0
-
-        for i in range(len(data_macd)):
-            if data_macd['macd'][i] > data_macd['signal'][i]:
-                if signal != 1:
-                    macd_buy_price.append(data[i])
-                    macd_sell_price.append(np.nan)
-                    signal = 1
-                    macd_signal.append(signal)
-                else:
-                    macd_buy_price.append(np.nan)
-                    macd_sell_price.append(np.nan)
-                    macd_signal.append(0)
-            elif data_macd['macd'][i] < data_macd['signal'][i]:
-                if signal != -1:
-                    macd_buy_price.append(np.nan)
-                    macd_sell_price.append(data[i])
-                    signal = -1
-                    macd_signal.append(signal)
-                else:
-                    macd_buy_price.append(np.nan)
-                    macd_sell_price.append(np.nan)
-                    macd_signal.append(0)
-            else:
-                macd_buy_price.append(np.nan)
-                macd_sell_price.append(np.nan)
-                macd_signal.append(0)
-                
-        return macd_buy_price, macd_sell_price
-    
+        return TechnicalAnalysis.rolling_max(high_prices, window), TechnicalAnalysis.rolling_min(low_prices, window)
+
+    def batch_rsi(prices, lookback, threads = 0) -> np.ndarray:
+        return TechnicalAnalysis.rsi_calculation(prices, lookback)
+
+    def batch_macd(prices, slow, fast, smooth, threads = 0) -> np.ndarray:
+        return TechnicalAnalysis.macd_calculations(prices, slow, fast, smooth)
+
+    def batch_sma(prices, window, threads = 0) -> np.ndarray:
+        return TechnicalAnalysis.sma_calculations(prices, window)
+
+    def batch_bollinger_bands(prices, sma, window, threads = 0) -> tuple:
+        return TechnicalAnalysis.bollinger_bands_calculations(prices, sma, window)
+
+    def batch_donchian_breakout(prices, high_prices, low_prices, window, threads = 0) -> tuple:
+        return TechnicalAnalysis.donchian_breakout_calculations(prices, high_prices, low_prices, window)
+
+    def implement_rsi(data, rsi, warmup = 0) -> tuple:
+        data, rsi = _prices(data), _prices(rsi)
+        previous = lagged(rsi)
+        ready = _ready(data, warmup + 1)
+        return signal_prices(data, ready & (previous > 30) & (rsi < 30), ready & (previous < 70) & (rsi > 70))
+
+    def implement_macd(data, data_macd) -> tuple:
+        data, lines = _prices(data), _prices(data_macd)
+        if lines.ndim != 2 or len(lines) < 2 or lines.shape[1] != len(data):
+            raise ValueError('expected macd lines of shape (3, len(data))')
+        return signal_prices(data, lines[0] > lines[1], lines[0] < lines[1])
+
     def implement_bollinger(data, lower_bb, upper_bb) -> tuple:
-        bollinger_buy_price = []
-        bollinger_sell_price = []
-        bollinger_signal = []
-        signal = 0
-        
-        for i in range(len(data)):
-            if data[i - 1] > lower_bb[i - 1] and data[i] < lower_bb[i]:
-                if signal != 1:
-                    bollinger_buy_price.append(data[i])
-                    bollinger_sell_price.append(np.nan)
-                    signal = 1
-                    bollinger_signal.append(signal)
-                else:
-                    bollinger_buy_price.append(np.nan)
-                    bollinger_sell_price.append(np.nan)
-                    bollinger_signal.append(0)
-            elif data[i - 1] < upper_bb[i - 1] and data[i] > upper_bb[i]:
-                if signal != -1:
-                    bollinger_buy_price.append(np.nan)
-                    bollinger_sell_price.append(data[i])
-                    signal = -1
-                    bollinger_signal.append(signal)
-                else:
-                    bollinger_buy_price.append(np.nan)
-                    bollinger_sell_price.append(np.nan)
-                    bollinger_signal.append(0)
-            else:
-                bollinger_buy_price.append(np.nan)
-                bollinger_sell_price.append(np.nan)
-                bollinger_signal.append(0)
-                
-        return bollinger_buy_price, bollinger_sell_price
+        data, lower_bb, upper_bb = _prices(data), _prices(lower_bb), _prices(upper_bb)
+        previous = lagged(data)
+        return signal_prices(data, (previous > lagged(lower_bb)) & (data < lower_bb),
+                             (previous < lagged(upper_bb)) & (data > upper_bb))
 
     def implement_donchian(data, upper_channel, lower_channel) -> tuple:
-        donchian_buy_price = []
-        donchian_sell_price = []
-        donchian_signal = []
-        signal = 0
-
-        for i in range(len(data)):
-            if data[i] > upper_channel[i - 1] and data[i - 1] <= upper_channel[i - 1]:
-                if signal != 1:
-                    donchian_buy_price.append(data[i])
-                    donchian_sell_price.append(np.nan)
-                    signal = 1
-                    donchian_signal.append(signal)
-                else:
-                    donchian_buy_price.append(np.nan)
-                    donchian_sell_price.append(np.nan)
-                    donchian_signal.append(0)
-            elif data[i] < lower_channel[i - 1] and data[i - 1] >= lower_channel[i - 1]:
-                if signal != -1:
-                    donchian_buy_price.append(np.nan)
-                    donchian_sell_price.append(data[i])
-                    signal = -1
-                    donchian_signal.append(signal)
-                else:
-                    donchian_buy_price.append(np.nan)
-                    donchian_sell_price.append(np.nan)
-                    donchian_signal.append(0)
+        data, upper_channel, lower_channel = _prices(data), _prices(upper_channel), _prices(lower_channel)
+        previous, upper, lower = lagged(data), lagged(upper_channel), lagged(lower_channel)
+        return signal_prices(data, (data > upper) & (previous <= upper), (data < lower) & (previous >= lower))
+
+    def pipeline_columns(indicators) -> list:
+        for indicator in indicators:
+            if indicator not in PIPELINE_COLUMNS:
+                raise ValueError(f"unknown indicator: {indicator}")
+        return [column for indicator in indicators for column in PIPELINE_COLUMNS[indicator]]
+
+    def indicator_pipeline(data, high_prices = None, low_prices = None, indicators = INDICATORS, rsi_lookback = 14,
+                           rsi_warmup = 4, macd_slow = 26, macd_fast = 12, macd_smooth = 9, bollinger_window = 20,
+                           donchian_window = 20) -> tuple:
+        data = _prices(data)
+        columns = TechnicalAnalysis.pipeline_columns(indicators)
+        values = np.empty((len(columns), len(data)))
+        row = 0
+        for indicator in indicators:
+            if indicator == 'rsi':
+                rsi = TechnicalAnalysis.rsi_calculation(data, rsi_lookback)
+                block = [rsi, *TechnicalAnalysis.implement_rsi(data, rsi, max(rsi_warmup, 0))]
+            elif indicator == 'macd':
+                lines = TechnicalAnalysis.macd_calculations(data, macd_slow, macd_fast, macd_smooth)
+                block = [*lines, *TechnicalAnalysis.implement_macd(data, lines)]
+            elif indicator == 'bollinger':
+                window = max(bollinger_window, 1)
+                sma = TechnicalAnalysis.sma_calculations(data, window)
+                upper_bb, lower_bb = TechnicalAnalysis.bollinger_bands_calculations(data, sma, window)
+                block = [sma, upper_bb, lower_bb, *TechnicalAnalysis.implement_bollinger(data, lower_bb, upper_bb)]
             else:
-                donchian_buy_price.append(np.nan)
-                donchian_sell_price.append(np.nan)
-                donchian_signal.append(0)
-
-        return donchian_buy_price, donchian_sell_price
+                if high_prices is None or low_prices is None:
+                    raise ValueError('donchian needs high_prices and low_prices')
+                upper_dc, lower_dc = TechnicalAnalysis.donchian_breakout_calculations(data, high_prices, low_prices, max(donchian_window, 1))
+                block = [upper_dc, lower_dc, *TechnicalAnalysis.implement_donchian(data, upper_dc, lower_dc)]
+
+            for offset, column in enumerate(block):
+                values[row + offset] = column
+            row += len(block)
+
+        return values, columns
+
+class StreamingIndicators:
+    def __init__(self, indicators = INDICATORS, **options) -> None:
+        self.indicators = list(indicators)
+        self.options = options
+        self.columns = TechnicalAnalysis.pipeline_columns(self.indicators)
+        self.history = np.empty((3, 0))
+
+    @property
+    def bars(self) -> int:
+        return self.history.shape[1]
+
+    def update_batch(self, data, high_prices = None, low_prices = None) -> np.ndarray:
+        data = _prices(data)
+        missing = np.full_like(data, np.nan)
+        high = missing if high_prices is None else _prices(high_prices)
+        low = missing if low_prices is None else _prices(low_prices)
+        if 'donchian' in self.indicators and (high_prices is None or low_prices is None):
+            raise ValueError('donchian needs high_prices and low_prices')
+
+        self.history = np.hstack([self.history, np.vstack([data, high, low])])
+        values, _ = TechnicalAnalysis.indicator_pipeline(*self.history, self.indicators, **self.options)
+        return values[:, self.bars - len(data):]
+
+    def update(self, price, high = np.nan, low = np.nan) -> np.ndarray:
+        return self.update_batch([price], [high], [low])[:, 0]
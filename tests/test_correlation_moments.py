@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from correlation_moments_st import ANCHOR_WINDOWS, CHECKPOINT_ROWS, CorrelationMoments, RollingCorrelation, pair_correlation
+
+# Moments are accumulated on first-valid-shifted prices, so float64 results agree with pandas to well within 1e-9.
+TOLERANCE = 1e-9
+MATRIX_TOLERANCE = 1e-6
+
+def _closes(rows = 1200, columns = 12, seed = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (rows, columns)), axis = 0))
+    closes[:150, :3] = np.nan
+    closes[rng.random((rows, columns)) < 0.02] = np.nan
+    return closes
+
+def _rolling(closes, window, step, expanding = False) -> RollingCorrelation:
+    dates = pd.bdate_range('2015-01-01', periods = len(closes)).values
+    tickers = np.array([f"T{column}" for column in range(closes.shape[1])])
+    return RollingCorrelation(dates, tickers, closes, 'test', window, step, expanding)
+
+def test_full_history_matches_dataframe_corr():
+    closes = _closes()
+    expected = pd.DataFrame(closes).corr().to_numpy()
+    np.testing.assert_allclose(CorrelationMoments.from_closes(closes).correlation(), expected, atol = TOLERANCE)
+
+def test_update_matches_single_pass():
+    closes = _closes()
+    moments = CorrelationMoments.from_closes(closes[:400], shift = CorrelationMoments.from_closes(closes).shift)
+    moments.update(closes[400:])
+    np.testing.assert_allclose(moments.correlation(), pd.DataFrame(closes).corr().to_numpy(), atol = TOLERANCE)
+
+@pytest.mark.parametrize('window, step', [(21, 5), (63, 1), (252, 21)])
+def test_rolling_windows_match_dataframe_corr(window, step):
+    closes = _closes()
+    rolling = _rolling(closes, window, step)
+    frame = pd.DataFrame(closes)
+    for position in list(range(len(rolling.ends))) + [min(3 * ANCHOR_WINDOWS + 1, len(rolling.ends) - 1), 0, len(rolling.ends) - 1]:
+        start, end = rolling.starts[position], rolling.ends[position]
+        expected = frame.iloc[start:end].corr(min_periods = 2).to_numpy()
+        np.testing.assert_allclose(rolling.moments(position).correlation(), expected, atol = TOLERANCE)
+        np.testing.assert_allclose(rolling.frame(position).to_numpy(), expected, atol = MATRIX_TOLERANCE)
+
+def test_expanding_windows_use_checkpoints():
+    closes = _closes(rows = 2 * CHECKPOINT_ROWS + 100)
+    rolling = _rolling(closes, 21, 10, expanding = True)
+    assert len(rolling.checkpoints) == 2
+    frame = pd.DataFrame(closes)
+    for position in [0, len(rolling.ends) // 2, len(rolling.ends) - 1, 1]:
+        expected = frame.iloc[:rolling.ends[position]].corr(min_periods = 2).to_numpy()
+        np.testing.assert_allclose(rolling.moments(position).correlation(), expected, atol = TOLERANCE)
+
+@pytest.mark.parametrize('window, expanding', [(21, False), (63, True)])
+def test_pair_correlation_matches_rolling_corr(window, expanding):
+    closes = _closes(columns = 2)
+    first, second = pd.Series(closes[:, 0]), pd.Series(closes[:, 1])
+    if expanding:
+        expected = first.expanding(min_periods = 2).corr(second)
+    else:
+        expected = first.rolling(window, min_periods = 2).corr(second)
+    expected[np.arange(len(expected)) < window - 1] = np.nan
+
+    result = pair_correlation(closes[:, 0], closes[:, 1], window, expanding)
+    valid = ~np.isnan(expected.to_numpy())
+    assert np.array_equal(np.isnan(result), ~valid)
+    np.testing.assert_allclose(result[valid], expected.to_numpy()[valid], atol = TOLERANCE)
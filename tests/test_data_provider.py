@@ -0,0 +1,54 @@
+import os
+import threading
+import pytest
+
+pytest.importorskip('streamlit')
+pytest.importorskip('yfinance')
+
+from data_provider_st import DataProvider, RecordingDataProvider, ReplayDataProvider
+
+class UnpicklableError(Exception):
+    def __init__(self, message) -> None:
+        super().__init__(message)
+        self.lock = threading.Lock()
+
+class FakeProvider(DataProvider):
+    def download(self, tickers, start = None, end = None, interval = '1d', period = None):
+        raise UnpicklableError('download failed')
+
+    def ticker_attribute(self, ticker, name):
+        raise KeyError(name)
+
+    def get_series(self, seriesId, **kwargs):
+        return [seriesId, kwargs]
+
+    def search(self, text, **kwargs):
+        return [text]
+
+def test_data_provider_is_abstract():
+    with pytest.raises(TypeError):
+        DataProvider()
+
+def test_recorded_responses_replay(tmp_path):
+    recorder = RecordingDataProvider(FakeProvider(), str(tmp_path))
+    replayer = ReplayDataProvider(str(tmp_path))
+
+    assert recorder.get_series('UNRATE', observation_start = '1/1/1970') == ['UNRATE', {'observation_start': '1/1/1970'}]
+    assert replayer.get_series('UNRATE', observation_start = '1/1/1970') == ['UNRATE', {'observation_start': '1/1/1970'}]
+
+    with pytest.raises(KeyError):
+        recorder.ticker_attribute('A', 'news')
+    with pytest.raises(KeyError):
+        replayer.ticker_attribute('A', 'news')
+
+    with pytest.raises(LookupError):
+        replayer.search('unrecorded')
+
+def test_unpicklable_error_is_recorded_by_type_and_message(tmp_path):
+    recorder = RecordingDataProvider(FakeProvider(), str(tmp_path))
+    with pytest.raises(UnpicklableError):
+        recorder.download(['A'])
+
+    with pytest.raises(RuntimeError, match = 'UnpicklableError: download failed'):
+        ReplayDataProvider(str(tmp_path)).download(['A'])
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names if name.endswith('.tmp')]
@@ -0,0 +1,64 @@
+import sys
+import types
+from datetime import date, datetime, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('streamlit')
+pytest.importorskip('yfinance')
+pytest.importorskip('plotly')
+pytest.importorskip('millify')
+
+SESSION = date(2024, 3, 15)
+
+def _minute_bars(tickers, start, end, interval) -> dict:
+    index = pd.date_range(datetime(2024, 3, 15, 9, 30), periods = 390, freq = 'min')
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 0.05, len(index)))
+    frame = pd.DataFrame({'Open': close, 'High': close + 0.1, 'Low': close - 0.1, 'Close': close,
+                          'Adj Close': close, 'Volume': 1000.0}, index = index)
+    return {ticker: frame for ticker in tickers}
+
+@pytest.fixture
+def modules(monkeypatch, tmp_path):
+    # stock_information_st connects to the ticker catalog on import; the analyzer only needs the ticker list.
+    monkeypatch.setitem(sys.modules, 'stock_information_st', types.SimpleNamespace(stock_ticker_list = lambda: []))
+    import indicator_stream_st
+    import stock_analyzer_st
+    import stock_downloader_st
+    from stock_store_st import IntradaySessionCache
+
+    monkeypatch.setattr(indicator_stream_st.st, 'session_state', {})
+    monkeypatch.setattr(stock_downloader_st, 'sessionCache', IntradaySessionCache(_minute_bars, storeDir = str(tmp_path)))
+    monkeypatch.setattr(stock_downloader_st, '_download_window',
+                        lambda startDate, endDate: (SESSION, SESSION + timedelta(days = 1), '1m'))
+    return indicator_stream_st, stock_analyzer_st, stock_downloader_st
+
+def test_intraday_indicator_frame_reuses_stream(modules, monkeypatch):
+    indicator_stream_st, stock_analyzer_st, stock_downloader_st = modules
+    created = []
+
+    class CountingStream(indicator_stream_st.IndicatorStream):
+        def __init__(self, *args) -> None:
+            super().__init__(*args)
+            created.append(self)
+
+    monkeypatch.setattr(indicator_stream_st, 'IndicatorStream', CountingStream)
+    startDate = datetime.combine(SESSION, datetime.min.time())
+
+    stock = stock_downloader_st.download_stock_data('TEST', startDate, startDate)
+    assert 'Datetime' in stock.columns
+    first = stock_analyzer_st.StockAnalyzer(stock, 'TEST').indicator_frame(['rsi'], rsi_lookback = 14, rsi_warmup = 4)
+    assert len(created) == 1
+    assert list(indicator_stream_st.st.session_state.values()) == created
+
+    stock = stock_downloader_st.download_stock_data('TEST', startDate, startDate)
+    second = stock_analyzer_st.StockAnalyzer(stock, 'TEST').indicator_frame(['rsi'], rsi_lookback = 14, rsi_warmup = 4)
+    assert len(created) == 1
+    assert created[0].size == len(stock) - 1
+    pd.testing.assert_frame_equal(first, second)
+
+    adjClose, high, low = (stock[column].to_numpy(dtype = np.float64) for column in ['Adj Close', 'High', 'Low'])
+    values, columns = stock_analyzer_st.TechnicalAnalysis.indicator_pipeline(adjClose, high, low, ['rsi'],
+                                                                               rsi_lookback = 14, rsi_warmup = 4)
+    np.testing.assert_allclose(second[columns].to_numpy().T, values, equal_nan = True)
@@ -0,0 +1,65 @@
+import time
+import threading
+import pytest
+from single_flight_st import SingleFlight
+
+def _concurrent(flight, key, function, callers) -> list:
+    results, errors = [], []
+    barrier = threading.Barrier(callers)
+
+    def call() -> None:
+        barrier.wait()
+        try:
+            results.append(flight.do(key, function))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target = call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+def test_concurrent_calls_share_one_execution():
+    flight, release, calls = SingleFlight(), threading.Event(), []
+
+    def slow() -> int:
+        calls.append(1)
+        release.wait(5)
+        return 42
+
+    threads, results, errors = _concurrent(flight, 'key', slow, 5)
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1 and not errors
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(value == 42 for value, _ in results)
+    assert flight.calls == {}
+
+def test_errors_propagate_to_every_caller():
+    flight, release = SingleFlight(), threading.Event()
+
+    def failing() -> None:
+        release.wait(5)
+        raise ValueError('provider down')
+
+    threads, results, errors = _concurrent(flight, 'key', failing, 3)
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert not results
+    assert len(errors) == 3 and all(isinstance(error, ValueError) for error in errors)
+    assert flight.calls == {}
+
+def test_keys_are_independent_and_calls_rerun_afterwards():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == (1, False)
+    assert flight.do('b', lambda: 2) == (2, False)
+    assert flight.do('a', lambda: 3) == (3, False)
+    with pytest.raises(KeyError):
+        flight.do('c', lambda: {}['missing'])
+    assert flight.do('c', lambda: 4) == (4, False)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from stock_store_st import PRICE_COLUMNS, StockStore
+
+DAYS = pd.bdate_range('2020-01-01', '2020-12-31')
+
+class FakeProvider:
+    def __init__(self) -> None:
+        self.calls = []
+        self.adjustment = 1.0
+        self.listed = {}
+
+    def __call__(self, tickers, start, end, interval):
+        self.calls.append((tuple(tickers), str(pd.Timestamp(start).date()), str(pd.Timestamp(end).date())))
+        frames = {}
+        for ticker in tickers:
+            index = DAYS[(DAYS >= pd.Timestamp(start)) & (DAYS < pd.Timestamp(end)) & (DAYS >= self.listed.get(ticker, DAYS[0]))]
+            if len(index):
+                close = 100.0 + DAYS.get_indexer(index)
+                frame = pd.DataFrame({column: close for column in PRICE_COLUMNS}, index = index)
+                frame['Adj Close'] = close * self.adjustment
+                frames[ticker] = frame
+        return frames
+
+@pytest.fixture
+def provider():
+    return FakeProvider()
+
+@pytest.fixture
+def store(provider, tmp_path):
+    return StockStore(provider, storeDir = str(tmp_path))
+
+def test_only_uncovered_ranges_are_fetched(store, provider):
+    assert len(store.read('A', '2020-03-02', '2020-04-01')) == 22
+    assert provider.calls == [(('A',), '2020-03-02', '2020-04-01')]
+
+    provider.calls.clear()
+    frame = store.read('A', '2020-02-03', '2020-05-01')
+    assert provider.calls == [(('A',), '2020-02-03', '2020-03-03'), (('A',), '2020-03-31', '2020-05-01')]
+    assert frame.index.equals(DAYS[(DAYS >= '2020-02-03') & (DAYS < '2020-05-01')])
+
+    provider.calls.clear()
+    store.read('A', '2020-02-10', '2020-04-15')
+    assert provider.calls == []
+
+def test_grouped_fetch_for_tickers_sharing_a_range(store, provider):
+    frames = store.read_many(['A', 'B'], '2020-03-02', '2020-04-01')
+    assert provider.calls == [(('A', 'B'), '2020-03-02', '2020-04-01')]
+    assert {ticker: len(frame) for ticker, frame in frames.items()} == {'A': 22, 'B': 22}
+
+def test_restated_history_is_refetched(store, provider):
+    store.read('A', '2020-03-02', '2020-04-01')
+    provider.adjustment = 0.5
+    provider.calls.clear()
+
+    frame = store.read('A', '2020-03-02', '2020-05-01')
+    assert provider.calls[-1] == (('A',), '2020-03-02', '2020-05-01')
+    np.testing.assert_allclose(frame['Adj Close'], frame['Close'] * 0.5)
+
+def test_empty_ranges_count_as_covered(store, provider):
+    provider.listed['NEW'] = pd.Timestamp('2020-06-01')
+    assert store.read('NEW', '2020-01-02', '2020-03-02').empty
+    provider.calls.clear()
+    assert store.read('NEW', '2020-01-02', '2020-03-02').empty
+    assert provider.calls == []
+
+    frame = store.read('NEW', '2020-01-02', '2020-07-01')
+    assert provider.calls == [(('NEW',), '2020-03-02', '2020-07-01')]
+    assert frame.index[0] == pd.Timestamp('2020-06-01')
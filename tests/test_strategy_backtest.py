@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from strategy_backtest_st import TRADING_DAYS, Backtest, periods_per_year, signal_candidates, signal_positions
+
+def _reference(prices, positions, costBps) -> tuple:
+    equity, value, returns, trades = [], 1.0, [], []
+    previous, trade = 0.0, None
+    for bar in range(len(prices)):
+        change = prices[bar] / prices[bar - 1] - 1 if bar else 0.0
+        position = positions[bar]
+        cost = abs(position - previous) * costBps / 10000
+        barReturn = max(position * change - cost, -1.0) if value > 0 else 0.0
+        value *= 1 + barReturn
+        returns.append(barReturn)
+        equity.append(value)
+
+        if trade is not None and position != trade['side']:
+            trade['growth'] *= 1 - abs(trade['side']) * costBps / 10000
+            trades.append(trade)
+            trade = None
+        if trade is None and position != 0:
+            trade = {'side': position, 'start': bar, 'growth': 1 - abs(position) * costBps / 10000}
+        if trade is not None:
+            trade['growth'] *= max(1 + position * change, 0.0)
+            trade['end'] = bar
+        previous = position
+    if trade is not None:
+        trades.append(trade)
+    return np.array(equity), np.array(returns), trades
+
+@pytest.mark.parametrize('allowShort, costBps', [(False, 0), (False, 10), (True, 5)])
+def test_backtest_matches_per_bar_loop(allowShort, costBps):
+    rng = np.random.default_rng(3)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+    candidate = rng.choice([-1, 0, 0, 0, 0, 1], size = 400).astype(np.int8)
+    positions = signal_positions(candidate, allowShort)
+
+    index = pd.bdate_range('2020-01-01', periods = 400)
+    backtest = Backtest(prices, positions, costBps, index = index)
+    equity, returns, trades = _reference(prices, positions, costBps)
+
+    np.testing.assert_allclose(backtest.equity[0], equity, rtol = 1e-12)
+    metrics = backtest.metrics().iloc[0]
+    assert metrics['Total Return'] == pytest.approx(equity[-1] - 1, rel = 1e-12)
+    assert metrics['Sharpe'] == pytest.approx(returns.mean() / returns.std() * np.sqrt(TRADING_DAYS), rel = 1e-9)
+    assert metrics['Max Drawdown'] == pytest.approx((equity / np.maximum.accumulate(equity) - 1).min(), rel = 1e-12)
+    assert metrics['Trades'] == len(trades)
+
+    table = backtest.trades()
+    np.testing.assert_allclose(table['Return'], [trade['growth'] - 1 for trade in trades], rtol = 1e-10)
+    assert list(table['Side']) == ['Long' if trade['side'] > 0 else 'Short' for trade in trades]
+    assert list(table['Entry']) == [index[trade['start'] - 1] for trade in trades]
+    np.testing.assert_allclose(table['Entry Price'], [prices[trade['start'] - 1] for trade in trades])
+    np.testing.assert_allclose(table['Exit Price'], [prices[trade['end']] for trade in trades])
+
+def test_short_ruin_stops_the_equity_curve():
+    backtest = Backtest(np.array([10.0, 10.0, 25.0, 30.0, 20.0]), np.array([0.0, -1.0, -1.0, -1.0, -1.0]))
+    np.testing.assert_array_equal(backtest.equity[0], [1.0, 1.0, 0.0, 0.0, 0.0])
+    assert not np.isnan(backtest.metrics().to_numpy(dtype = np.float64)[0, :3]).any()
+    assert backtest.trades()['Return'].iloc[0] == -1.0
+
+def test_position_open_at_first_bar_has_no_entry():
+    trades = Backtest(np.array([10.0, 11.0, 12.0]), np.array([1.0, 1.0, 0.0]), index = pd.bdate_range('2020-01-01', periods = 3)).trades()
+    assert pd.isna(trades['Entry'].iloc[0]) and np.isnan(trades['Entry Price'].iloc[0])
+
+def test_signal_candidates_prefer_buy():
+    buy = np.array([np.nan, 1.0, np.nan, 2.0])
+    sell = np.array([np.nan, 1.0, 3.0, np.nan])
+    np.testing.assert_array_equal(signal_candidates(buy, sell), [0, 1, -1, 1])
+
+def test_periods_per_year_follows_bar_spacing():
+    assert periods_per_year(pd.bdate_range('2020-01-01', periods = 10)) == TRADING_DAYS
+    assert periods_per_year(pd.date_range('2024-03-15 09:30', periods = 60, freq = 'min', tz = 'US/Eastern')) == TRADING_DAYS * 390
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmark_technical_analysis import benchmark_cases, parity, synthetic_prices
+from technical_analysis_st import StreamingIndicators, TechnicalAnalysis
+
+@pytest.fixture(scope = 'module')
+def prices():
+    return synthetic_prices(3000, seed = 7)
+
+def test_fallback_matches_pandas_rolling(prices):
+    close, high, low = prices
+    series = pd.Series(close)
+    for window in [5, 20, 200]:
+        sma = TechnicalAnalysis.sma_calculations(close, window)
+        np.testing.assert_allclose(sma[window:], series.rolling(window).mean().shift(1).to_numpy()[window:], rtol = 1e-12)
+        assert not sma[:window].any()
+        np.testing.assert_allclose(TechnicalAnalysis.rolling_std(close, window)[window - 1:],
+                                   series.rolling(window).std(ddof = 0).to_numpy()[window - 1:], rtol = 1e-9)
+        upper, lower = TechnicalAnalysis.donchian_breakout_calculations(close, high, low, window)
+        np.testing.assert_array_equal(upper[window - 1:], pd.Series(high).rolling(window).max().to_numpy()[window - 1:])
+        np.testing.assert_array_equal(lower[window - 1:], pd.Series(low).rolling(window).min().to_numpy()[window - 1:])
+
+def test_fallback_rsi_and_macd_match_pandas_ewm(prices):
+    close, _, _ = prices
+    series = pd.Series(close)
+    change = series.diff().fillna(0.0)
+    gain = change.clip(lower = 0).ewm(alpha = 2 / 15, adjust = False).mean()
+    loss = (-change).clip(lower = 0).ewm(alpha = 2 / 15, adjust = False).mean()
+    np.testing.assert_allclose(TechnicalAnalysis.rsi_calculation(close, 14)[1:], (100 - 100 / (1 + gain / loss)).to_numpy()[1:], rtol = 1e-10)
+
+    macd, signal, hist = TechnicalAnalysis.macd_calculations(close, 26, 12, 9)
+    expected = series.ewm(span = 12, adjust = False).mean() - series.ewm(span = 26, adjust = False).mean()
+    np.testing.assert_allclose(macd, expected.to_numpy(), rtol = 1e-10)
+    np.testing.assert_allclose(hist, macd - signal)
+
+def test_batch_rows_match_single_series(prices):
+    close, _, _ = prices
+    matrix = close[:2000].reshape(4, 500)
+    batch = TechnicalAnalysis.batch_sma(matrix, 20)
+    for row in range(4):
+        np.testing.assert_allclose(batch[row], TechnicalAnalysis.sma_calculations(matrix[row], 20))
+
+def test_streaming_matches_pipeline(prices):
+    close, high, low = prices
+    expected, columns = TechnicalAnalysis.indicator_pipeline(close[:600], high[:600], low[:600])
+    stream = StreamingIndicators()
+    first = stream.update_batch(close[:550], high[:550], low[:550])
+    rest = np.column_stack([stream.update(close[bar], high[bar], low[bar]) for bar in range(550, 600)])
+    assert list(stream.columns) == list(columns)
+    np.testing.assert_allclose(np.hstack([first, rest]), expected, equal_nan = True)
+
+@pytest.mark.parametrize('window', [20, 200])
+def test_native_matches_fallback(prices, window):
+    native = pytest.importorskip('technical_analysis_module').TechnicalAnalysis()
+    close, high, low = prices
+    for function, caseArgs, kwargs in benchmark_cases(close, high, low, window):
+        args = caseArgs()
+        ok, difference = parity(getattr(native, function)(*args, **kwargs), getattr(TechnicalAnalysis, function)(*args, **kwargs))
+        assert ok, (function, difference)
@@ -0,0 +1,31 @@
+from datetime import date, datetime, timedelta
+from trading_calendar_st import (EASTERN, early_closes, is_session_closed, is_trading_day, market_holidays,
+                                 previous_trading_day, session_open_close, trading_days)
+
+def test_2024_holidays():
+    assert market_holidays(2024) == frozenset([
+        date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 19), date(2024, 3, 29), date(2024, 5, 27),
+        date(2024, 6, 19), date(2024, 7, 4), date(2024, 9, 2), date(2024, 11, 28), date(2024, 12, 25)])
+
+def test_observed_holidays_and_special_closures():
+    assert date(2021, 12, 24) in market_holidays(2021)
+    assert date(2022, 12, 31) not in market_holidays(2022)
+    assert date(2023, 1, 2) in market_holidays(2023)
+    assert date(2025, 1, 9) in market_holidays(2025)
+    assert date(2012, 10, 29) in market_holidays(2012)
+
+def test_early_closes():
+    assert early_closes(2024) == frozenset([date(2024, 7, 3), date(2024, 11, 29), date(2024, 12, 24)])
+    _, close = session_open_close(date(2024, 11, 29))
+    assert close == EASTERN.localize(datetime(2024, 11, 29, 13, 0))
+
+def test_trading_days_skip_weekends_and_holidays():
+    assert trading_days(date(2024, 3, 27), date(2024, 4, 3)) == [date(2024, 3, 27), date(2024, 3, 28), date(2024, 4, 1), date(2024, 4, 2)]
+    assert not is_trading_day(date(2024, 3, 30))
+    assert previous_trading_day(date(2024, 4, 1)) == date(2024, 3, 28)
+
+def test_session_closed_respects_settle():
+    closeTime = EASTERN.localize(datetime(2024, 3, 15, 16, 0))
+    assert not is_session_closed(date(2024, 3, 15), now = closeTime - timedelta(minutes = 1))
+    assert is_session_closed(date(2024, 3, 15), now = closeTime)
+    assert not is_session_closed(date(2024, 3, 15), now = closeTime + timedelta(minutes = 5), settle = timedelta(minutes = 15))
@@ -0,0 +1,45 @@
+import pytest
+import ttl_cache_st
+from ttl_cache_st import TTLCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache_st.time, 'monotonic', lambda: now[0])
+    return now
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(maxSize = 4, ttl = 10)
+    cache.set('a', 1)
+    clock[0] += 9.9
+    assert cache.get('a') == 1
+    clock[0] += 0.2
+    assert cache.get('a') is None
+    assert cache.stats()['size'] == 0
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(maxSize = 2, ttl = 10)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+def test_get_or_load_counts_hits_and_misses(clock):
+    cache = TTLCache(maxSize = 4, ttl = 10)
+    loads = []
+    load = lambda: loads.append(1) or len(loads)
+    assert cache.get_or_load('a', load) == 1
+    assert cache.get_or_load('a', load) == 1
+    clock[0] += 11
+    assert cache.get_or_load('a', load) == 2
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'size': 1, 'maxSize': 4, 'ttl': 10}
+
+def test_falsy_values_are_cached(clock):
+    cache = TTLCache(maxSize = 4, ttl = 10)
+    loads = []
+    assert cache.get_or_load('empty', lambda: loads.append(1) or {}) == {}
+    assert cache.get_or_load('empty', lambda: loads.append(1) or {}) == {}
+    assert len(loads) == 1
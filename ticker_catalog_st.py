@@ -0,0 +1,37 @@
+import pandas as pd
+from pymongo import DESCENDING
+from pymongo.errors import OperationFailure
+from stock_db_connector import DatabaseConnector
+
+class TickerCatalog:
+    def __init__(self, collection) -> None:
+        self.collection = collection
+        self.indexesReady = False
+
+    def ensure_indexes(self) -> None:
+        if self.indexesReady:
+            return
+
+        try:
+            self.collection.create_index([('updatedAt', DESCENDING)])
+        except OperationFailure:
+            pass
+        self.indexesReady = True
+
+    def find(self, fields = ('symbol', 'name', 'industry')) -> pd.DataFrame:
+        projection = {field: 1 for field in fields}
+        projection['_id'] = 0
+        df = pd.DataFrame(list(self.collection.find({}, projection)), columns = list(fields))
+        if 'symbol' in df.columns:
+            df['symbol'] = df['symbol'].str.replace('.', '-', regex = False)
+        return df
+
+    def _latest(self, field):
+        document = self.collection.find_one({field: {'$exists': True}}, {field: 1}, sort = [(field, DESCENDING)])
+        return document[field] if document else None
+
+    def signature(self) -> tuple:
+        self.ensure_indexes()
+        return self.collection.estimated_document_count(), self._latest('_id'), self._latest('updatedAt')
+
+tickerCatalog = TickerCatalog(DatabaseConnector().client["ticker_details"]['all_ticker_info'])
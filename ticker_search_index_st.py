@@ -0,0 +1,99 @@
+import time
+import threading
+import difflib
+import numpy as np
+import pandas as pd
+from bisect import bisect_left, bisect_right
+from ticker_catalog_st import tickerCatalog
+
+class SearchSnapshot:
+    def __init__(self, df) -> None:
+        df = df.fillna('').astype(str)
+        df = df.sort_values('name', kind = 'stable').reset_index(drop = True)
+        df['industry_key'] = df['industry'].str.strip().str.lower()
+        lowerNames = df['name'].str.lower().tolist()
+
+        trigrams = {}
+        for position, name in enumerate(lowerNames):
+            for start in range(len(name) - 2):
+                trigrams.setdefault(name[start:start + 3], set()).add(position)
+
+        industryMembers = {}
+        for position, industry in enumerate(df['industry_key']):
+            if industry:
+                industryMembers.setdefault(industry, []).append(position)
+
+        self.columns = {field: df[field].to_numpy() for field in ['symbol', 'name', 'industry']}
+        self.lowerNames = lowerNames
+        self.nameTrigrams = trigrams
+        self.symbolKeys = sorted((symbol.upper(), position) for position, symbol in enumerate(df['symbol']))
+        self.industryKeys = sorted(industryMembers)
+        self.industryMembers = industryMembers
+
+    def rows(self, positions, fields) -> pd.DataFrame:
+        positions = np.sort(np.fromiter(positions, dtype = np.intp))
+        return pd.DataFrame({field: self.columns[field][positions] for field in fields})
+
+class TickerSearchIndex:
+    def __init__(self, catalog, refreshInterval = 300) -> None:
+        self.catalog = catalog
+        self.refreshInterval = refreshInterval
+        self.lock = threading.Lock()
+        self.checkedAt = None
+        self.signature = None
+        self.snapshot = SearchSnapshot(pd.DataFrame(columns = ['symbol', 'name', 'industry']))
+
+    def refresh(self, force = False) -> SearchSnapshot:
+        now = time.monotonic()
+        if not force and self.checkedAt is not None and now - self.checkedAt < self.refreshInterval:
+            return self.snapshot
+
+        with self.lock:
+            if not force and self.checkedAt is not None and now - self.checkedAt < self.refreshInterval:
+                return self.snapshot
+            signature = self.catalog.signature()
+            if force or signature != self.signature:
+                self.snapshot = SearchSnapshot(self.catalog.find())
+                self.signature = signature
+            self.checkedAt = now
+            return self.snapshot
+
+    def symbols(self) -> list:
+        snapshot = self.refresh()
+        return [symbol for symbol, _ in snapshot.symbolKeys]
+
+    def lookup_symbol(self, symbol, fields = ('symbol', 'name', 'industry')) -> pd.DataFrame:
+        snapshot = self.refresh()
+        symbol = symbol.upper()
+        start = bisect_left(snapshot.symbolKeys, (symbol,))
+        end = bisect_right(snapshot.symbolKeys, (symbol, len(snapshot.symbolKeys)))
+        return snapshot.rows([position for _, position in snapshot.symbolKeys[start:end]], fields)
+
+    def name_contains(self, text, fields = ('name', 'symbol')) -> pd.DataFrame:
+        snapshot = self.refresh()
+        text = text.lower()
+        if len(text) < 3:
+            positions = [position for position, name in enumerate(snapshot.lowerNames) if text in name]
+        else:
+            candidates = set.intersection(*(snapshot.nameTrigrams.get(text[start:start + 3], set())
+                                            for start in range(len(text) - 2)))
+            positions = [position for position in candidates if text in snapshot.lowerNames[position]]
+        return snapshot.rows(positions, fields)
+
+    def name_fuzzy(self, text, fields = ('name', 'symbol'), limit = 10, cutoff = 0.6) -> pd.DataFrame:
+        snapshot = self.refresh()
+        matches = difflib.get_close_matches(text.lower(), snapshot.lowerNames, n = limit, cutoff = cutoff)
+        matched = set(matches)
+        return snapshot.rows([position for position, name in enumerate(snapshot.lowerNames) if name in matched][:limit], fields)
+
+    def industries(self, prefix = '') -> list:
+        snapshot = self.refresh()
+        start = bisect_left(snapshot.industryKeys, prefix)
+        end = bisect_left(snapshot.industryKeys, prefix + '\uffff')
+        return snapshot.industryKeys[start:end]
+
+    def by_industry(self, industry, fields = ('symbol', 'name')) -> pd.DataFrame:
+        snapshot = self.refresh()
+        return snapshot.rows(snapshot.industryMembers.get(industry.strip().lower(), []), fields)
+
+tickerSearchIndex = TickerSearchIndex(tickerCatalog)
@@ -0,0 +1,95 @@
+import pytz
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+
+EASTERN = pytz.timezone('US/Eastern')
+REGULAR_OPEN = time(9, 30)
+REGULAR_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+SPECIAL_CLOSURES = frozenset([
+    date(2001, 9, 11), date(2001, 9, 12), date(2001, 9, 13), date(2001, 9, 14),
+    date(2004, 6, 11), date(2007, 1, 2), date(2012, 10, 29), date(2012, 10, 30),
+    date(2018, 12, 5), date(2025, 1, 9)])
+
+def _nth_weekday(year, month, weekday, n) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days = (weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+def _last_weekday(year, month, weekday) -> date:
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days = 1)
+    return last - timedelta(days = (last.weekday() - weekday) % 7)
+
+def _observed(holiday) -> date:
+    if holiday.weekday() == 5:
+        return holiday - timedelta(days = 1)
+    if holiday.weekday() == 6:
+        return holiday + timedelta(days = 1)
+    return holiday
+
+def _easter(year) -> date:
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+@lru_cache(maxsize = None)
+def market_holidays(year) -> frozenset:
+    holidays = set()
+
+    newYear = date(year, 1, 1)
+    if newYear.weekday() != 5:
+        holidays.add(_observed(newYear))
+    if year >= 1998:
+        holidays.add(_nth_weekday(year, 1, 0, 3))
+    holidays.add(_nth_weekday(year, 2, 0, 3))
+    holidays.add(_easter(year) - timedelta(days = 2))
+    holidays.add(_last_weekday(year, 5, 0))
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))
+    holidays.add(_observed(date(year, 7, 4)))
+    holidays.add(_nth_weekday(year, 9, 0, 1))
+    holidays.add(_nth_weekday(year, 11, 3, 4))
+    holidays.add(_observed(date(year, 12, 25)))
+    holidays.update(closure for closure in SPECIAL_CLOSURES if closure.year == year)
+
+    return frozenset(holidays)
+
+@lru_cache(maxsize = None)
+def early_closes(year) -> frozenset:
+    candidates = [date(year, 7, 3), _nth_weekday(year, 11, 3, 4) + timedelta(days = 1), date(year, 12, 24)]
+    return frozenset(day for day in candidates if day.weekday() < 5 and day not in market_holidays(year))
+
+def is_trading_day(day) -> bool:
+    return day.weekday() < 5 and day not in market_holidays(day.year)
+
+def trading_days(start, end) -> list:
+    days = []
+    day = start
+    while day < end:
+        if is_trading_day(day):
+            days.append(day)
+        day += timedelta(days = 1)
+    return days
+
+def previous_trading_day(day) -> date:
+    day -= timedelta(days = 1)
+    while not is_trading_day(day):
+        day -= timedelta(days = 1)
+    return day
+
+def session_open_close(day) -> tuple:
+    close = EARLY_CLOSE if day in early_closes(day.year) else REGULAR_CLOSE
+    return EASTERN.localize(datetime.combine(day, REGULAR_OPEN)), EASTERN.localize(datetime.combine(day, close))
+
+def is_session_closed(day, now = None, settle = timedelta(0)) -> bool:
+    if now is None:
+        now = datetime.now(EASTERN)
+    return now >= session_open_close(day)[1] + settle
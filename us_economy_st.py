@@ -3,9 +3,10 @@ import pandas as pd
 import plotly.graph_objects as go
 import time
 from plotly.subplots import make_subplots
-from fredapi import Fred
+from data_provider_st import dataProvider
+from async_data_st import run_requests, fred_series_async, fred_search_async
 
-fred = Fred(api_key = st.secrets['API_KEY'])
+fred = dataProvider
 
 class USEconomy:
     def recession_periods() -> list:
@@ -170,14 +171,18 @@ class USEconomy:
 
 
     def unemployment_rate() -> None:
-        unemploymentData = fred.get_series('UNRATE', observation_start = '1/1/1970')
-        txUnemploymentData = fred.get_series('TXUR', observation_start = '1/1/1975')
+        unemploymentRequests = run_requests(
+            unemployment = fred_series_async('UNRATE', observation_start = '1/1/1970'),
+            txUnemployment = fred_series_async('TXUR', observation_start = '1/1/1975'),
+            unempState = fred_search_async('unemployment rate state', filter = ('frequency', 'Monthly')))
+        unemploymentData = unemploymentRequests['unemployment']
+        txUnemploymentData = unemploymentRequests['txUnemployment']
 
         unemploymentDf = pd.DataFrame(unemploymentData).dropna(how = 'all')
         unemploymentDf.index = pd.to_datetime(unemploymentDf.index)
         unemploymentDf.columns = ['unemployment_rate']
 
-        unempStateDf = fred.search('unemployment rate state', filter = ('frequency', 'Monthly'))
+        unempStateDf = unemploymentRequests['unempState']
         unempStateDf = unempStateDf.query('seasonal_adjustment == "Seasonally Adjusted" and units == "Percent"')
         unempStateDf = unempStateDf.loc[unempStateDf['title'].str.startswith('Unemployment Rate in')]
         unempStateDf = unempStateDf[~unempStateDf['title'].str.contains(',')]
@@ -356,8 +361,10 @@ class USEconomy:
                                                                                                'eraseshape']})
 
         if interestOption == 'Market Yield on U.S. Treasury Securities':
-            marketYieldUSTres1Data = fred.get_series('DGS1', observation_start = '1/1/1970')
-            marketYieldUSTres10Data = fred.get_series('DGS10', observation_start = '1/1/1970')
+            marketYieldRequests = run_requests(tres1 = fred_series_async('DGS1', observation_start = '1/1/1970'),
+                                               tres10 = fred_series_async('DGS10', observation_start = '1/1/1970'))
+            marketYieldUSTres1Data = marketYieldRequests['tres1']
+            marketYieldUSTres10Data = marketYieldRequests['tres10']
             mktYieldTres1Df = pd.DataFrame(marketYieldUSTres1Data).dropna(how = 'all')
             mktYieldTres1Df.index = pd.to_datetime(mktYieldTres1Df.index)
             mktYieldTres1Df.columns = ['myuts1']
@@ -388,22 +395,26 @@ class USEconomy:
                                                                                                'eraseshape']})
 
         if interestOption == 'Secured Overnight Financing Rate':
-            sofrData = fred.get_series('SOFR', observation_start = '3/4/2018')            
+            sofrRequests = run_requests(sofr = fred_series_async('SOFR', observation_start = '3/4/2018'),
+                                        sofr30 = fred_series_async('SOFR30DAYAVG', observation_start = '2/5/2018'),
+                                        sofr90 = fred_series_async('SOFR90DAYAVG', observation_start = '2/5/2018'),
+                                        sofr180 = fred_series_async('SOFR180DAYAVG', observation_start = '2/5/2018'))
+            sofrData = sofrRequests['sofr']
             sofrDf = pd.DataFrame(sofrData).dropna(how = 'all')
             sofrDf.index = pd.to_datetime(sofrDf.index)
             sofrDf.columns = ['sofr']
             
-            sofr30Data = fred.get_series('SOFR30DAYAVG', observation_start = '2/5/2018')
+            sofr30Data = sofrRequests['sofr30']
             sofr30Df = pd.DataFrame(sofr30Data).dropna(how = 'all')
             sofr30Df.index = pd.to_datetime(sofr30Df.index)
             sofr30Df.columns = ['sofr30']
 
-            sofr90Data = fred.get_series('SOFR90DAYAVG', observation_start = '2/5/2018')
+            sofr90Data = sofrRequests['sofr90']
             sofr90Df = pd.DataFrame(sofr90Data).dropna(how = 'all')
             sofr90Df.index = pd.to_datetime(sofr90Df.index)
             sofr90Df.columns = ['sofr90']
 
-            sofr180Data = fred.get_series('SOFR180DAYAVG', observation_start = '2/5/2018')
+            sofr180Data = sofrRequests['sofr180']
             sofr180Df = pd.DataFrame(sofr180Data).dropna(how = 'all')
             sofr180Df.index = pd.to_datetime(sofr180Df.index)
             sofr180Df.columns = ['sofr180']
@@ -498,12 +509,14 @@ class USEconomy:
                                                                                                'eraseshape']})
 
     def mortgage_rates() -> None:
-        mortgage15Data = fred.get_series('MORTGAGE15US', observation_start = '1/1/1992')
+        mortgageRequests = run_requests(mort15 = fred_series_async('MORTGAGE15US', observation_start = '1/1/1992'),
+                                        mort30 = fred_series_async('MORTGAGE30US', observation_start = '1/1/1992'))
+        mortgage15Data = mortgageRequests['mort15']
         mortgage15Df = pd.DataFrame(mortgage15Data).dropna(how = 'all')
         mortgage15Df.index = pd.to_datetime(mortgage15Df.index)
         mortgage15Df.columns = ['mort15']
 
-        mortgage30Data = fred.get_series('MORTGAGE30US', observation_start = '1/1/1992')
+        mortgage30Data = mortgageRequests['mort30']
         mortgage30Df = pd.DataFrame(mortgage30Data).dropna(how = 'all')
         mortgage30Df.index = pd.to_datetime(mortgage30Df.index)
         mortgage30Df.columns = ['mort30']